@@ -4,9 +4,14 @@
 
 from importlib import import_module
 
-from taskgraph.config import validate_graph_config
 from taskgraph.util import schema
 
+from mozilla_taskgraph.config import validate_graph_config
+from mozilla_taskgraph.payload_builders import (
+    referenced_implementations,
+    register_payload_builders,
+)
+
 # Schemas for YAML files should use dashed identifiers by default. If there are
 # components of the schema for which there is a good reason to use another format,
 # exceptions can be added here.
@@ -18,14 +23,21 @@ schema.EXCEPTED_SCHEMA_IDENTIFIERS.extend(
 
 
 def register(graph_config):
+    modules = [
+        "actions",
+        "config",
+        "morph",
+        "parameters",
+        "verify",
+    ]
+    if graph_config.get("lazy-payload-builders"):
+        # Only pay for the payload builders (and schemas) actually used.
+        register_payload_builders(referenced_implementations(graph_config))
+    else:
+        modules.append("worker_types")
+
     # Import modules to register decorated functions
-    _import_modules(
-        [
-            "actions",
-            "config",
-            "worker_types",
-        ]
-    )
+    _import_modules(modules)
 
     validate_graph_config(graph_config._config)
 
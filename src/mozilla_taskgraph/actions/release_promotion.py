@@ -1,14 +1,239 @@
+import copy
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+
+from taskcluster.exceptions import TaskclusterRestFailure
 from taskgraph.decision import taskgraph_decision
+from taskgraph.generator import Kind, TaskGraphGenerator
 from taskgraph.parameters import Parameters
+from taskgraph.task import Task
 from taskgraph.taskgraph import TaskGraph
 from taskgraph.util.python_path import find_object
-from taskgraph.util.taskcluster import get_artifact
+from taskgraph.util.taskcluster import (
+    CONCURRENCY,
+    get_artifact,
+    get_taskcluster_client,
+)
 from taskgraph.util.taskgraph import (
     find_decision_task,
     find_existing_tasks_from_previous_kinds,
 )
 
 from mozilla_taskgraph.actions import make_action_available
+from mozilla_taskgraph.util.existing_tasks import write_existing_tasks_artifact
+from mozilla_taskgraph.util.graph_snapshot import (
+    fetch_snapshot,
+    snapshot_name,
+    write_graph_snapshot,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ReusedKind(Kind):
+    """A kind whose tasks are copied from a previous graph.
+
+    Instances are picklable, so they can be loaded by the parallel loader.
+    """
+
+    tasks: tuple = ()
+
+    def load_tasks(self, parameters, kind_dependencies_tasks, write_artifacts):
+        logger.info(f"Loading tasks for kind {self.name} from previous graph")
+        tasks = []
+        for task in self.tasks:
+            task_dict = copy.deepcopy(task.to_json())
+            task_dict.pop("task_id", None)
+            tasks.append(Task.from_json(task_dict))
+        return tasks
+
+
+def find_reusable_kinds(full_task_graph, reuse_kinds, existing_tasks, do_not_optimize):
+    """Return the tasks of the ``reuse_kinds`` that can be copied from a graph.
+
+    A kind is only reusable if every one of its tasks in ``full_task_graph``
+    is going to be replaced by an existing task, and none of them are listed
+    in ``do_not_optimize``. Other kinds are logged and regenerated.
+
+    Args:
+        full_task_graph (TaskGraph): The combined graph of previous decisions.
+        reuse_kinds (list): Names of the kinds to reuse.
+        existing_tasks (dict): Mapping of label to taskId of reused tasks.
+        do_not_optimize (list): Labels of tasks that must be re-run.
+
+    Returns:
+        dict: Mapping of kind name to the tuple of tasks to reuse.
+    """
+    reuse_kinds = set(reuse_kinds)
+    tasks_by_kind = {}
+    for task in full_task_graph.tasks.values():
+        if task.kind in reuse_kinds:
+            tasks_by_kind.setdefault(task.kind, []).append(task)
+
+    do_not_optimize = set(do_not_optimize)
+    reusable = {}
+    for kind in sorted(reuse_kinds):
+        tasks = tasks_by_kind.get(kind)
+        if not tasks:
+            logger.warning(f"Not reusing kind {kind}: not in the previous graph(s)")
+        elif any(t.label not in existing_tasks for t in tasks):
+            logger.warning(f"Not reusing kind {kind}: some tasks are not reused")
+        elif any(t.label in do_not_optimize for t in tasks):
+            logger.warning(
+                f"Not reusing kind {kind}: some tasks are in do_not_optimize"
+            )
+        else:
+            reusable[kind] = tuple(tasks)
+    return reusable
+
+
+# ``reuse_previous_kinds`` wraps the private ``TaskGraphGenerator._load_kinds``
+# and re-creates the ``Kind`` objects it yields, so both must still look the
+# way they did when it was written.
+LOAD_KINDS_PARAMETERS = ("self", "graph_config", "target_kinds")
+KIND_FIELDS = ("name", "path", "config", "graph_config")
+
+
+def can_reuse_kinds():
+    """Return whether taskgraph's kind loading can be wrapped to reuse kinds."""
+    load_kinds = getattr(TaskGraphGenerator, "_load_kinds", None)
+    if load_kinds is None:
+        return False
+    parameters = tuple(inspect.signature(load_kinds).parameters)
+    kind_fields = tuple(f.name for f in fields(Kind))
+    return parameters == LOAD_KINDS_PARAMETERS and kind_fields == KIND_FIELDS
+
+
+@contextmanager
+def reuse_previous_kinds(
+    full_task_graph, reuse_kinds, existing_tasks, do_not_optimize=()
+):
+    """Load the given kinds from a previous graph instead of generating them.
+
+    Every task of such a kind is going to be replaced by an existing task
+    during optimization anyway, so there is no point in running the kind's
+    transforms again. While this context manager is active, the kinds loaded
+    by ``TaskGraphGenerator`` are wrapped in a ``ReusedKind`` which returns
+    the tasks from ``full_task_graph`` instead.
+
+    Note that a reused kind contains exactly the tasks of the previous graph.
+    Tasks that the kind would newly generate for this graph (e.g because they
+    depend on the promotion flavor) are not created, so only kinds whose tasks
+    are the same across flavors should be reused.
+
+    As this relies on taskgraph internals, no kind is reused (and a warning is
+    logged) if they changed in an unsupported taskgraph version.
+
+    Args:
+        full_task_graph (TaskGraph): The combined graph of previous decisions.
+        reuse_kinds (list): Names of the kinds to reuse.
+        existing_tasks (dict): Mapping of label to taskId of reused tasks.
+        do_not_optimize (list): Labels of tasks that must be re-run.
+
+    Yields:
+        set: Names of the kinds that are reused.
+    """
+    if not can_reuse_kinds():
+        logger.warning(
+            "Not reusing any kind: unsupported TaskGraphGenerator._load_kinds "
+            "or Kind in this version of taskgraph"
+        )
+        yield set()
+        return
+
+    reusable = find_reusable_kinds(
+        full_task_graph, reuse_kinds, existing_tasks, do_not_optimize
+    )
+    orig_load_kinds = TaskGraphGenerator._load_kinds
+
+    def load_kinds(self, graph_config, target_kinds=None):
+        for kind in orig_load_kinds(self, graph_config, target_kinds):
+            if kind.name in reusable:
+                kind = ReusedKind(
+                    kind.name,
+                    kind.path,
+                    kind.config,
+                    kind.graph_config,
+                    reusable[kind.name],
+                )
+            yield kind
+
+    TaskGraphGenerator._load_kinds = load_kinds
+    try:
+        yield set(reusable)
+    finally:
+        TaskGraphGenerator._load_kinds = orig_load_kinds
+
+
+FULL_TASK_GRAPH = "public/full-task-graph.json"
+
+# Artifacts that must exist on every task listed in ``previous_graph_ids``.
+PREVIOUS_GRAPH_ARTIFACTS = (
+    FULL_TASK_GRAPH,
+    "public/label-to-taskid.json",
+)
+
+
+def _check_artifact(task_id, path):
+    """Return an error message if the given artifact is unusable, else None."""
+    queue = get_taskcluster_client("queue")
+    try:
+        info = queue.latestArtifactInfo(task_id, path)
+    except TaskclusterRestFailure as e:
+        if e.status_code != 404:
+            raise
+        if path in PREVIOUS_GRAPH_ARTIFACTS:
+            return f"{task_id} is missing {path}; is it a decision or action task?"
+        return f"{task_id} is missing {path}"
+
+    expires = info.get("expires")
+    if expires:
+        expires = datetime.fromisoformat(expires.replace("Z", "+00:00"))
+        if expires <= datetime.now(timezone.utc):
+            return f"{path} from {task_id} expired at {info['expires']}"
+    return None
+
+
+def preflight(graph_config, input, previous_graph_ids):
+    """Validate release promotion inputs before doing any heavy work.
+
+    The existence (and expiry) of every artifact needed from the previous
+    graphs is checked concurrently using lightweight metadata requests. All
+    problems are collected and reported in a single exception.
+
+    Args:
+        graph_config (GraphConfig): The graph configuration.
+        input (dict): The action input.
+        previous_graph_ids (list): taskIds of the previous graphs.
+
+    Raises:
+        Exception: If any of the inputs are invalid.
+    """
+    errors = []
+    flavor = input["release_promotion_flavor"]
+    flavors = graph_config["release-promotion"]["flavors"]
+    if flavor not in flavors:
+        errors.append(
+            f"Unknown release promotion flavor '{flavor}'! "
+            f"Valid flavors are: {', '.join(sorted(flavors))}"
+        )
+
+    checks = [(previous_graph_ids[0], "public/parameters.yml")]
+    for graph_id in previous_graph_ids:
+        checks.extend((graph_id, path) for path in PREVIOUS_GRAPH_ARTIFACTS)
+
+    with ThreadPoolExecutor(max_workers=min(CONCURRENCY, len(checks))) as e:
+        errors.extend(
+            error for error in e.map(lambda c: _check_artifact(*c), checks) if error
+        )
+
+    if errors:
+        raise Exception("Release promotion preflight failed:\n  " + "\n  ".join(errors))
 
 
 @make_action_available(
@@ -71,6 +296,17 @@ from mozilla_taskgraph.actions import make_action_available
                     "type": "string",
                 },
             },
+            "reuse_kinds": {
+                "type": "array",
+                "description": (
+                    "Optional: an array of kinds to load from the previous "
+                    "graph(s) instead of regenerating them."
+                ),
+                "default": graph_config["release-promotion"].get("reuse-kinds", []),
+                "items": {
+                    "type": "string",
+                },
+            },
             "previous_graph_ids": {
                 "type": "array",
                 "description": (
@@ -92,6 +328,13 @@ from mozilla_taskgraph.actions import make_action_available
 def release_promotion_action(
     push_parameters, graph_config, input, task_group_id, task_id
 ):
+    # Build previous_graph_ids from ``previous_graph_ids`` or ``revision``.
+    previous_graph_ids = input.get("previous_graph_ids")
+    if not previous_graph_ids:
+        previous_graph_ids = [find_decision_task(push_parameters, graph_config)]
+
+    preflight(graph_config, input, previous_graph_ids)
+
     release_promotion_flavor = input["release_promotion_flavor"]
     promotion_config = graph_config["release-promotion"]["flavors"][
         release_promotion_flavor
@@ -106,13 +349,9 @@ def release_promotion_action(
     do_not_optimize = input.get(
         "do_not_optimize", promotion_config.get("do-not-optimize", [])
     )
-
-    # make parameters read-write
-    parameters = dict(push_parameters)
-    # Build previous_graph_ids from ``previous_graph_ids`` or ``revision``.
-    previous_graph_ids = input.get("previous_graph_ids")
-    if not previous_graph_ids:
-        previous_graph_ids = [find_decision_task(parameters, graph_config)]
+    reuse_kinds = input.get(
+        "reuse_kinds", graph_config["release-promotion"].get("reuse-kinds", [])
+    )
 
     # Download parameters from the first decision task
     parameters = get_artifact(previous_graph_ids[0], "public/parameters.yml")
@@ -129,14 +368,25 @@ def release_promotion_action(
     # that didn't exist in the first full_task_graph, so combining them is
     # important. The rightmost graph should take precedence in the case of
     # conflicts.
+    # Snapshots are preferred when available, as they allow skipping the
+    # tasks from ``rebuild_kinds`` entirely.
     combined_full_task_graph = {}
     for graph_id in previous_graph_ids:
-        full_task_graph = get_artifact(graph_id, "public/full-task-graph.json")
+        full_task_graph = fetch_snapshot(
+            graph_id,
+            snapshot_name(FULL_TASK_GRAPH),
+            exclude_kinds=rebuild_kinds,
+        )
+        if full_task_graph is None:
+            full_task_graph = get_artifact(graph_id, FULL_TASK_GRAPH)
         combined_full_task_graph.update(full_task_graph)
     _, combined_full_task_graph = TaskGraph.from_json(combined_full_task_graph)
     parameters["existing_tasks"] = find_existing_tasks_from_previous_kinds(
         combined_full_task_graph, previous_graph_ids, rebuild_kinds
     )
+    # The previous parameters may reference their own out of line
+    # ``existing_tasks``, which no longer apply.
+    parameters.pop("existing_tasks_artifact", None)
     parameters["do_not_optimize"] = do_not_optimize
     parameters["target_tasks_method"] = target_tasks_method
     parameters["build_number"] = int(input["build_number"])
@@ -160,4 +410,21 @@ def release_promotion_action(
     # make parameters read-only
     parameters = Parameters(**parameters)
 
-    taskgraph_decision({"root": graph_config.root_dir}, parameters=parameters)
+    if reuse_kinds:
+        context = reuse_previous_kinds(
+            combined_full_task_graph,
+            reuse_kinds,
+            parameters["existing_tasks"],
+            parameters["do_not_optimize"],
+        )
+    else:
+        context = nullcontext()
+
+    with context:
+        taskgraph_decision({"root": graph_config.root_dir}, parameters=parameters)
+
+    # Allow subsequent release promotion actions to read this graph quickly.
+    write_graph_snapshot("full-task-graph.json")
+
+    if graph_config["release-promotion"].get("existing-tasks-artifact", False):
+        write_existing_tasks_artifact()
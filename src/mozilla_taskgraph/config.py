@@ -1,9 +1,37 @@
+import hashlib
+import logging
+import os
+import re
+from functools import cache
+from pathlib import Path
 from textwrap import dedent
-from typing import Optional, Union
+from typing import Literal, Optional, Union
 
+import msgspec
+import taskgraph
 from taskgraph import config as tg
 from taskgraph.util.schema import Schema
 
+logger = logging.getLogger(__name__)
+
+# Environment variable pointing to a directory to record successful graph
+# config validations in.
+VALIDATION_CACHE_ENV = "MOZILLA_TASKGRAPH_VALIDATION_CACHE"
+
+# Digests of the graph configs successfully validated by this process, along
+# with the id of the schema they were validated against.
+_validated = set()
+
+
+class TaskSizeBudgetConfig(Schema, kw_only=True):
+    # Maximum serialized size of a task definition, in bytes.
+    max_size: int
+    # Whether exceeding the budget fails the graph generation ("error") or
+    # only logs a warning ("warn").
+    level: Literal["error", "warn"] = "error"
+    # Maximum number of offending tasks listed per worker implementation.
+    top: Optional[int] = None
+
 
 class ShipitConfig(Schema, forbid_unknown_fields=False, kw_only=True):
     product: Optional[str] = None
@@ -11,59 +39,210 @@ class ShipitConfig(Schema, forbid_unknown_fields=False, kw_only=True):
     scope_prefix: Optional[str] = None
 
 
-if isinstance(tg.graph_config_schema, type) and issubclass(
-    tg.graph_config_schema, Schema
-):
-    # New msgspec-based graph_config_schema (upstream or no downstream override).
-
-    class MozillaGraphConfigSchema(tg.graph_config_schema):
-        """Extends the upstream GraphConfigSchema with Mozilla-specific fields."""
-
-        # Ship It integration settings.
-        shipit: Optional[ShipitConfig] = None
-        # Python path of the form ``<module>:<obj>`` pointing to a function
-        # that takes a set of parameters as input and returns the version
-        # string to use for release tasks.
-        # Defaults to ``mozilla_taskgraph.version:default_parser``.
-        version_parser: Optional[str] = None
-        # Mapping of project to the branches that should be considered
-        # "production" releases. A value of ``True`` means all branches of the
-        # project are release branches, while a list restricts releases to the
-        # named branches. Consumed by
-        # ``mozilla_taskgraph.util.attributes:release_level``.
-        release_branches: Optional[dict[str, Union[bool, list[str]]]] = None
-
-else:
-    # Legacy voluptuous-based graph_config_schema (e.g. gecko_taskgraph override).
-    from voluptuous import Optional as Vol_Optional
-
-    MozillaGraphConfigSchema = tg.graph_config_schema.extend(
-        {
-            Vol_Optional("shipit"): {
-                Vol_Optional("product"): str,
-                Vol_Optional("release-format"): str,
-                Vol_Optional("scope-prefix"): str,
-            },
-            Vol_Optional(
-                "version-parser",
-                description=dedent("""
-                    Python path of the form ``<module>:<obj>`` pointing to a
-                    function that takes a set of parameters as input and returns
-                    the version string to use for release tasks.
-
-                    Defaults to ``mozilla_taskgraph.version:default_parser``.
-                    """.lstrip()),
-            ): str,
-            Vol_Optional(
-                "release-branches",
-                description=dedent("""
-                    Mapping of project to the branches that should be considered
-                    "production" releases. A value of ``True`` means all branches
-                    of the project are release branches, while a list restricts
-                    releases to the named branches.
-                    """.lstrip()),
-            ): {str: object},
-        }
-    )
-
-tg.graph_config_schema = MozillaGraphConfigSchema
+@cache
+def get_graph_config_schema():
+    """Build the graph config schema, extended with Mozilla-specific fields.
+
+    The schema is built on first use rather than on import, and installed as
+    ``taskgraph.config.graph_config_schema`` so that subsequent validations
+    of the graph config (e.g by upstream ``load_graph_config``) use it.
+
+    Returns:
+        The extended schema.
+    """
+    if isinstance(tg.graph_config_schema, type) and issubclass(
+        tg.graph_config_schema, Schema
+    ):
+        # New msgspec-based graph_config_schema (upstream or no downstream override).
+
+        class MozillaGraphConfigSchema(tg.graph_config_schema):
+            """Extends the upstream GraphConfigSchema with Mozilla-specific fields."""
+
+            # Ship It integration settings.
+            shipit: Optional[ShipitConfig] = None
+            # Python path of the form ``<module>:<obj>`` pointing to a function
+            # that takes a set of parameters as input and returns the version
+            # string to use for release tasks.
+            # Defaults to ``mozilla_taskgraph.version:default_parser``.
+            version_parser: Optional[str] = None
+            # Mapping of project to the branches that should be considered
+            # "production" releases. A value of ``True`` means all branches of the
+            # project are release branches, while a list restricts releases to the
+            # named branches, which may be glob patterns. Consumed by
+            # ``mozilla_taskgraph.util.attributes:release_level``.
+            release_branches: Optional[dict[str, Union[bool, list[str]]]] = None
+            # Whether to remove scopes that are already covered by a wildcard scope
+            # of the same task from task definitions. Consumed by
+            # ``mozilla_taskgraph.morph:intern_scopes``.
+            collapse_scopes: Optional[bool] = None
+            # Size budget for task definitions, checked once the full task graph
+            # is generated. Consumed by
+            # ``mozilla_taskgraph.verify:verify_task_size_budget``.
+            task_size_budget: Optional[TaskSizeBudgetConfig] = None
+            # Whether to only register the payload builders of the worker
+            # implementations referenced by ``workers.aliases``. Consumed by
+            # ``mozilla_taskgraph:register``.
+            lazy_payload_builders: Optional[bool] = None
+
+    else:
+        # Legacy voluptuous-based graph_config_schema (e.g. gecko_taskgraph override).
+        from voluptuous import Any  # noqa: PLC0415
+        from voluptuous import Optional as Vol_Optional  # noqa: PLC0415
+
+        MozillaGraphConfigSchema = tg.graph_config_schema.extend(
+            {
+                Vol_Optional("shipit"): {
+                    Vol_Optional("product"): str,
+                    Vol_Optional("release-format"): str,
+                    Vol_Optional("scope-prefix"): str,
+                },
+                Vol_Optional(
+                    "version-parser",
+                    description=dedent("""
+                        Python path of the form ``<module>:<obj>`` pointing to a
+                        function that takes a set of parameters as input and returns
+                        the version string to use for release tasks.
+
+                        Defaults to ``mozilla_taskgraph.version:default_parser``.
+                        """.lstrip()),
+                ): str,
+                Vol_Optional(
+                    "release-branches",
+                    description=dedent("""
+                        Mapping of project to the branches that should be considered
+                        "production" releases. A value of ``True`` means all branches
+                        of the project are release branches, while a list restricts
+                        releases to the named branches, which may be glob patterns
+                        (e.g ``releases/*``).
+                        """.lstrip()),
+                ): {str: object},
+                Vol_Optional(
+                    "collapse-scopes",
+                    description=dedent("""
+                        Whether to remove scopes that are already covered by a
+                        wildcard scope of the same task from task definitions.
+                        """.lstrip()),
+                ): bool,
+                Vol_Optional(
+                    "task-size-budget",
+                    description=dedent("""
+                        Size budget for task definitions, checked once the full
+                        task graph is generated.
+                        """.lstrip()),
+                ): {
+                    "max-size": int,
+                    Vol_Optional("level"): Any("error", "warn"),
+                    Vol_Optional("top"): int,
+                },
+                Vol_Optional(
+                    "lazy-payload-builders",
+                    description=dedent("""
+                        Whether to only register the payload builders of the
+                        worker implementations referenced by ``workers.aliases``.
+                        """.lstrip()),
+                ): bool,
+            }
+        )
+
+    tg.graph_config_schema = MozillaGraphConfigSchema
+    return MozillaGraphConfigSchema
+
+
+def _canonical(value):
+    # JSON only supports str keys, so represent all keys with ``repr`` to keep
+    # e.g ``3`` and ``"3"`` distinct.
+    if isinstance(value, dict):
+        return {repr(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def _config_digest(config):
+    try:
+        data = msgspec.json.encode(config, order="sorted", enc_hook=repr)
+    except TypeError:
+        # Non-str keys, e.g from unquoted YAML such as ``by-level: {3: ...}``.
+        # The prefix keeps these digests distinct from those of the fast path.
+        data = b"canonical:" + msgspec.json.encode(
+            _canonical(config), order="sorted", enc_hook=repr
+        )
+    return hashlib.sha256(data).hexdigest()
+
+
+_ADDRESS_RE = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+def _schema_fingerprint(schema):
+    """Return a description of the contents of a graph config schema.
+
+    Schemas extended or overridden downstream get a different fingerprint,
+    even if their class is named the same. Memory addresses, e.g of validator
+    functions, are stripped so that the fingerprint is stable across
+    processes.
+    """
+    if isinstance(schema, type) and issubclass(schema, msgspec.Struct):
+        description = repr(msgspec.inspect.type_info(schema))
+    else:
+        # Legacy voluptuous schema.
+        description = repr(getattr(schema, "schema", schema))
+    return _ADDRESS_RE.sub("", description)
+
+
+def _disk_digest(schema, digest):
+    # Also depend on anything that may change the schema across processes.
+    with open(__file__, "rb") as f:
+        source = f.read()
+    h = hashlib.sha256(source)
+    h.update(f"{taskgraph.__version__}:{_schema_fingerprint(schema)}".encode())
+    h.update(f":{digest}".encode())
+    return h.hexdigest()
+
+
+def validate_graph_config(config):
+    """Validate a graph config against the extended graph config schema.
+
+    Successful validations are cached by a digest of the config contents, so
+    a config is only validated again if it changes. If the
+    ``MOZILLA_TASKGRAPH_VALIDATION_CACHE`` environment variable points to a
+    directory, they are also recorded there to be reused across processes.
+
+    Args:
+        config (dict): The graph config contents.
+
+    Raises:
+        Exception: If the graph config is invalid.
+    """
+    get_graph_config_schema()
+    if taskgraph.fast:
+        return
+
+    # The schema installed upstream may have been overridden since.
+    schema = tg.graph_config_schema
+    digest = _config_digest(config)
+    key = (id(schema), digest)
+    if key in _validated:
+        return
+
+    marker = None
+    if cache_dir := os.environ.get(VALIDATION_CACHE_ENV):
+        marker = Path(cache_dir) / _disk_digest(schema, digest)
+        if marker.exists():
+            _validated.add(key)
+            return
+
+    tg.validate_graph_config(config)
+    _validated.add(key)
+
+    if marker:
+        try:
+            marker.parent.mkdir(parents=True, exist_ok=True)
+            marker.touch()
+        except OSError as e:
+            logger.debug(f"Could not record graph config validation: {e}")
+
+
+def __getattr__(name):
+    if name == "MozillaGraphConfigSchema":
+        return get_graph_config_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
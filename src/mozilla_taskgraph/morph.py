@@ -0,0 +1,102 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Graph morphs applied to the optimized task graph.
+"""
+
+import json
+import logging
+import sys
+
+from taskgraph.morph import register_morph
+
+logger = logging.getLogger(__name__)
+
+
+def minimize_scopes(scopes):
+    """Remove scopes that are already satisfied by a wildcard scope in ``scopes``.
+
+    A Taskcluster scope ending with ``*`` satisfies every scope starting with
+    the same prefix, so such scopes are redundant. No scope is ever widened.
+
+    Args:
+        scopes (iterable): The scopes to minimize.
+
+    Returns:
+        list: The sorted, minimized scopes.
+    """
+    scopes = set(scopes)
+    prefixes = [s[:-1] for s in scopes if s.endswith("*")]
+    if not prefixes:
+        return sorted(scopes)
+
+    return sorted(
+        s for s in scopes if not any(s.startswith(p) and s != p + "*" for p in prefixes)
+    )
+
+
+class ScopeInterner:
+    """Share scope strings between tasks of a graph.
+
+    Scope strings are interned, and the interned (and optionally minimized)
+    scopes are computed once per distinct list of scopes. Each call returns a
+    new list, so tasks can still modify their scopes independently.
+    Optionally, scopes covered by a wildcard scope of the same task are dropped
+    (see :func:`minimize_scopes`).
+    """
+
+    def __init__(self, collapse=False):
+        self.collapse = collapse
+        self._lists = {}
+        self.tasks = 0
+        self.bytes_saved = 0
+
+    def __call__(self, scopes):
+        self.tasks += 1
+        key = tuple(scopes)
+        if (entry := self._lists.get(key)) is None:
+            interned = tuple(sys.intern(s) for s in scopes)
+            saved = 0
+            if self.collapse:
+                minimized = tuple(minimize_scopes(interned))
+                if len(minimized) < len(interned):
+                    saved = len(json.dumps(interned)) - len(json.dumps(minimized))
+                    interned = minimized
+            entry = self._lists[key] = (interned, saved)
+
+        self.bytes_saved += entry[1]
+        return list(entry[0])
+
+    @property
+    def distinct(self):
+        return len(self._lists)
+
+
+@register_morph
+def intern_scopes(taskgraph, label_to_taskid, parameters, graph_config):
+    """Intern scopes of all tasks in the graph.
+
+    Large graphs carry many identical scope lists. Sharing their strings
+    reduces the memory used by the decision task. If the ``collapse-scopes`` graph config
+    is set, scopes redundant with a wildcard scope of the same task are also
+    removed from the task definitions.
+    """
+    logger.debug("Morphing: interning scopes")
+
+    interner = ScopeInterner(collapse=graph_config.get("collapse-scopes", False))
+    for task in taskgraph.tasks.values():
+        if scopes := task.task.get("scopes"):
+            task.task["scopes"] = interner(scopes)
+
+    if interner.tasks:
+        logger.info(
+            f"Interned scopes of {interner.tasks} tasks into "
+            f"{interner.distinct} distinct scope sets"
+        )
+    if interner.bytes_saved:
+        logger.info(
+            f"Collapsing wildcard scopes saved {interner.bytes_saved} bytes "
+            "of task definitions"
+        )
+    return taskgraph, label_to_taskid
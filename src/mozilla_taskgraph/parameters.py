@@ -0,0 +1,29 @@
+from typing import Optional
+
+from taskgraph import parameters as tg
+from taskgraph.util.schema import Schema
+
+if isinstance(tg.base_schema, type) and issubclass(tg.base_schema, Schema):
+    # New msgspec-based parameters schema.
+
+    class MozillaParametersSchema(
+        Schema, rename=lambda name: name, forbid_unknown_fields=False, kw_only=True
+    ):
+        """Mozilla-specific parameters."""
+
+        # Path of an artifact on the task that produced these parameters,
+        # holding the ``existing_tasks`` mapping. Set by the release promotion
+        # action when ``existing_tasks`` is stored out of line. Consumed by
+        # ``mozilla_taskgraph.util.existing_tasks:load_existing_tasks``.
+        existing_tasks_artifact: Optional[str] = None
+
+    tg.extend_parameters_schema(MozillaParametersSchema)
+
+else:
+    # Legacy voluptuous-based parameters schema.
+    from voluptuous import Any as Vol_Any
+    from voluptuous import Optional as Vol_Optional
+
+    tg.extend_parameters_schema(
+        {Vol_Optional("existing_tasks_artifact"): Vol_Any(None, str)}
+    )
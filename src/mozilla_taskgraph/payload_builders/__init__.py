@@ -0,0 +1,60 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Payload builders for the scriptworker implementations supported by
+mozilla-taskgraph.
+
+Each implementation lives in its own module, which registers its payload
+builder and builds its schemas when imported. This allows registering only
+the payload builders a project actually uses.
+"""
+
+from importlib import import_module
+
+# Mapping of worker implementation to the module registering its payload
+# builder.
+PAYLOAD_BUILDER_MODULES = {
+    "scriptworker-beetmover-data": "beetmover_data",
+    "scriptworker-bitrise": "bitrise",
+    "scriptworker-lando": "lando",
+    "scriptworker-shipit": "shipit",
+    "scriptworker-signing": "signing",
+}
+
+
+def referenced_implementations(graph_config):
+    """Return the worker implementations referenced by a graph config.
+
+    Args:
+        graph_config (GraphConfig): The graph config.
+
+    Returns:
+        set: Implementations of the ``workers.aliases``, including all the
+            alternatives of keyed-by implementations.
+    """
+    implementations = set()
+    for alias in graph_config["workers"]["aliases"].values():
+        stack = [alias.get("implementation")]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, dict):
+                stack.extend(value.values())
+            elif isinstance(value, str):
+                implementations.add(value)
+    return implementations
+
+
+def register_payload_builders(implementations=None):
+    """Register the payload builders of the given worker implementations.
+
+    Args:
+        implementations (iterable): Worker implementations to register the
+            payload builders of. Implementations not provided by
+            mozilla-taskgraph are ignored. Defaults to all of them.
+    """
+    if implementations is None:
+        implementations = PAYLOAD_BUILDER_MODULES
+    for impl in implementations:
+        if module := PAYLOAD_BUILDER_MODULES.get(impl):
+            import_module(f".{module}", package=__name__)
@@ -0,0 +1,101 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Payload builder for the ``scriptworker-beetmover-data`` worker
+implementation.
+"""
+
+import binascii
+import gzip
+import re
+from base64 import b64decode, b64encode
+from typing import Optional
+
+from taskgraph.transforms.task import payload_builder
+from taskgraph.util.schema import Schema, taskref_or_string_msgspec
+
+# -- scriptworker-beetmover-data schemas --
+
+
+class DataMapEntry(Schema):
+    data: str
+    content_type: str
+    destinations: list[taskref_or_string_msgspec]
+
+
+class ScriptworkerBeetmoverDataSchema(
+    Schema, forbid_unknown_fields=False, kw_only=True
+):
+    app_name: str
+    bucket: str
+    project: str
+    data_map: list[DataMapEntry]
+    dry_run: Optional[bool] = None
+    # Gzip the data before encoding it, to keep task definitions small.
+    # Entries are annotated with a ``contentEncoding`` of ``gzip``.
+    compress: Optional[bool] = None
+
+
+# Standard base64, optionally split across lines as MIME encoders do.
+BASE64_RE = re.compile(r"[A-Za-z0-9+/\r\n]*(?:=[\r\n]*){0,2}")
+
+
+def is_base64(data):
+    """Whether ``data`` is a valid base64 string.
+
+    Accepts the same inputs as ``b64decode``, which e.g ignores characters
+    outside of the base64 alphabet and anything after the padding. Standard
+    base64 strings are checked in place, without decoding them. Only other
+    strings are decoded.
+    """
+    if BASE64_RE.fullmatch(data) and (
+        (len(data) - data.count("\n") - data.count("\r")) % 4 == 0
+    ):
+        return True
+
+    try:
+        b64decode(data)
+    except binascii.Error:
+        return False
+    return True
+
+
+@payload_builder(
+    "scriptworker-beetmover-data",
+    schema=ScriptworkerBeetmoverDataSchema,
+)
+def build_beetmover_data_payload(_, task, task_def):
+    worker = task["worker"]
+    task_def["tags"]["worker-implementation"] = "scriptworker"
+
+    task_def["payload"] = {
+        "releaseProperties": {
+            "appName": worker["app-name"],
+        },
+        "dataMap": [],
+    }
+
+    for dataMap in worker["data-map"]:
+        data = dataMap["data"]
+        if not is_base64(data):
+            raise Exception(f"data must be base64 encoded! data was: {data}")
+
+        entry = {
+            "data": data,
+            "contentType": dataMap["content-type"],
+            "destinations": dataMap["destinations"],
+        }
+        if worker.get("compress"):
+            entry["data"] = b64encode(gzip.compress(b64decode(data), mtime=0)).decode()
+            entry["contentEncoding"] = "gzip"
+
+        task_def["payload"]["dataMap"].append(entry)
+
+    scopes = task_def.setdefault("scopes", [])
+    scopes.extend(
+        [
+            f"project:{worker['project']}:releng:beetmover:bucket:{worker['bucket']}",
+            f"project:{worker['project']}:releng:beetmover:action:upload-data",
+        ]
+    )
@@ -0,0 +1,198 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Payload builder for the ``scriptworker-bitrise`` worker implementation.
+"""
+
+import json
+import logging
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Optional, Union
+from weakref import WeakKeyDictionary
+
+from taskgraph.transforms.task import payload_builder
+from taskgraph.util.schema import Schema, taskref_or_string_msgspec
+
+logger = logging.getLogger(__name__)
+
+
+# -- scriptworker-bitrise schemas --
+
+
+class BitriseConfig(
+    Schema, rename=lambda name: name, forbid_unknown_fields=False, kw_only=True
+):
+    # Name of Bitrise App to schedule workflows on.
+    app: str
+    # List of workflows to trigger on specified app.
+    # Can also be an object that maps workflow_ids to environment variables.
+    workflows: list[Union[str, dict[str, list[dict[str, taskref_or_string_msgspec]]]]]
+    # Directory prefix to store artifacts. Set this to 'public'
+    # to create public artifacts.
+    artifact_prefix: Optional[str] = None
+
+
+class ScriptworkerBitriseSchema(Schema, forbid_unknown_fields=False, kw_only=True):
+    bitrise: BitriseConfig
+
+
+@dataclass(frozen=True)
+class BitriseContext:
+    """Values shared by every Bitrise task of a kind."""
+
+    scope_prefix: str
+    # Bitrise global_params derived from the Taskcluster parameters.
+    global_params: Mapping[str, str]
+    # Normalized environment permutations, keyed by their canonical JSON
+    # representation, so identical permutations are shared between tasks.
+    environments: dict = field(default_factory=dict, compare=False)
+
+
+_bitrise_contexts = WeakKeyDictionary()
+
+
+def _normref(ref, type="heads"):
+    if ref:
+        prefix = f"refs/{type}/"
+        if ref.startswith(prefix):
+            return ref[len(prefix) :]
+        # The ref is a different type than the requested one, return None
+        # to indicate this.
+        elif ref.startswith("refs/"):
+            return None
+    return ref
+
+
+def get_bitrise_context(config):
+    """Get the :class:`BitriseContext` for a kind.
+
+    The context only depends on the parameters and graph config, so it is
+    computed once per ``config`` and shared by all of its tasks.
+
+    Args:
+        config (TransformConfig): The configuration for the kind being transformed.
+
+    Returns:
+        BitriseContext: The shared context.
+    """
+    if context := _bitrise_contexts.get(config):
+        return context
+
+    params = config.params
+
+    # Set some global_params implicitly from Taskcluster params.
+    global_params = {
+        "commit_hash": params["head_rev"],
+        "branch_repo_owner": params["head_repository"],
+    }
+
+    if head_ref := _normref(params["head_ref"]):
+        global_params["branch"] = head_ref
+
+    if head_tag := _normref(params["head_tag"], type="tags"):
+        global_params["tag"] = head_tag
+
+    if commit_message := params.get("commit_message"):
+        global_params["commit_message"] = commit_message
+
+    if pull_request_number := params.get("pull_request_number"):
+        global_params["pull_request_id"] = pull_request_number
+
+    if params["tasks_for"] == "github-pull-request":
+        global_params["pull_request_author"] = params["owner"]
+
+        if base_ref := _normref(params["base_ref"]):
+            global_params["branch_dest"] = base_ref
+
+        if base_repository := params["base_repository"]:
+            global_params["branch_dest_repo_owner"] = base_repository
+
+    context = BitriseContext(
+        scope_prefix=config.graph_config["scriptworker"]["scope-prefix"],
+        global_params=MappingProxyType(global_params),
+    )
+    _bitrise_contexts[config] = context
+    return context
+
+
+def expand_bitrise_workflows(workflows, environments=None):
+    """Expand the ``workflows`` of a Bitrise task in a single pass.
+
+    Environment variables are normalized to Bitrise's format. Duplicate
+    permutations within a workflow are dropped, and identical permutations
+    are shared via ``environments``.
+
+    Args:
+        workflows (list): The ``bitrise.workflows`` of a task.
+        environments (dict): Cache of normalized permutations, e.g from
+            :class:`BitriseContext`.
+
+    Returns:
+        tuple: The sorted unique workflow ids, and a dict of workflow id to
+            environment permutations.
+    """
+    if environments is None:
+        environments = {}
+
+    workflow_ids = set()
+    workflow_permutations = {}
+    seen = set()
+    for workflow in workflows:
+        if isinstance(workflow, str):
+            # Empty environments
+            workflow_ids.add(workflow)
+            continue
+
+        for workflow_id, env_permutations in workflow.items():
+            workflow_ids.add(workflow_id)
+            permutations = workflow_permutations.setdefault(workflow_id, [])
+            for envs in env_permutations:
+                key = json.dumps(envs, sort_keys=True)
+                if (workflow_id, key) in seen:
+                    continue
+                seen.add((workflow_id, key))
+
+                if key not in environments:
+                    environments[key] = {
+                        "environments": [
+                            {"mapped_to": k, "value": v} for k, v in envs.items()
+                        ]
+                    }
+                permutations.append(environments[key])
+
+    # sorted to allow for proper unit testing
+    return sorted(workflow_ids), workflow_permutations
+
+
+@payload_builder(
+    "scriptworker-bitrise",
+    schema=ScriptworkerBitriseSchema,
+)
+def build_bitrise_payload(config, task, task_def):
+    bitrise = task["worker"]["bitrise"]
+    task_def["tags"]["worker-implementation"] = "scriptworker"
+
+    context = get_bitrise_context(config)
+    workflow_ids, workflow_permutations = expand_bitrise_workflows(
+        bitrise["workflows"], context.environments
+    )
+
+    scopes = task_def.setdefault("scopes", [])
+    scopes.append(f"{context.scope_prefix}:bitrise:app:{bitrise['app']}")
+    scopes.extend(
+        [f"{context.scope_prefix}:bitrise:workflow:{wf}" for wf in workflow_ids]
+    )
+
+    task_def["payload"] = {"global_params": dict(context.global_params)}
+    if workflow_permutations:
+        task_def["payload"]["workflow_params"] = workflow_permutations
+
+    if bitrise.get("artifact_prefix"):
+        task_def["payload"]["artifact_prefix"] = bitrise["artifact_prefix"]
+
+    if logger.isEnabledFor(logging.DEBUG):
+        size = len(json.dumps(task_def["payload"]))
+        logger.debug(f"Bitrise payload for {task.get('label')} is {size} bytes")
@@ -0,0 +1,25 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Payload builder for the ``scriptworker-shipit`` worker implementation.
+"""
+
+from taskgraph.transforms.task import payload_builder
+from taskgraph.util.schema import Schema
+
+# -- scriptworker-shipit schemas --
+
+
+class ScriptworkerShipitSchema(Schema, forbid_unknown_fields=False, kw_only=True):
+    release_name: str
+
+
+@payload_builder(
+    "scriptworker-shipit",
+    schema=ScriptworkerShipitSchema,
+)
+def build_shipit_payload(config, task, task_def):
+    worker = task["worker"]
+    task_def["tags"]["worker-implementation"] = "scriptworker"
+    task_def["payload"] = {"release_name": worker["release-name"]}
@@ -0,0 +1,68 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Payload builder for the ``scriptworker-signing`` worker implementation.
+"""
+
+from typing import Optional
+
+from taskgraph.transforms.task import payload_builder
+from taskgraph.util.schema import Schema, taskref_or_string_msgspec
+
+from mozilla_taskgraph.util.signed_artifacts import get_upstream_signed_artifacts
+
+# -- scriptworker-signing schemas --
+
+
+class SigningUpstreamArtifact(
+    Schema, rename=lambda name: name, forbid_unknown_fields=False, kw_only=True
+):
+    # taskId of the task with the artifact
+    taskId: taskref_or_string_msgspec
+    # type of signing task (for CoT)
+    taskType: str
+    # Paths to the artifacts to sign
+    paths: list[str]
+    # Signing formats to use on each of the paths
+    formats: list[str]
+    # Only For MSI, optional for the signed Installer
+    authenticode_comment: Optional[str] = None
+
+
+class ScriptworkerSigningSchema(Schema, forbid_unknown_fields=False, kw_only=True):
+    signing_type: str
+    # list of artifact URLs for the artifacts that should be signed
+    upstream_artifacts: list[SigningUpstreamArtifact]
+    max_run_time: Optional[int] = None
+
+
+@payload_builder(
+    "scriptworker-signing",
+    schema=ScriptworkerSigningSchema,
+)
+def build_signing_payload(config, task, task_def):
+    worker = task["worker"]
+
+    task_def["payload"] = {
+        "upstreamArtifacts": worker["upstream-artifacts"],
+    }
+    if "max-run-time" in worker:
+        task_def["payload"]["maxRunTime"] = worker["max-run-time"]
+
+    task_def.setdefault("tags", {})["worker-implementation"] = "scriptworker"
+
+    formats = set()
+    for artifacts in worker["upstream-artifacts"]:
+        formats.update(artifacts["formats"])
+
+    scope_prefix = config.graph_config["scriptworker"]["scope-prefix"]
+    scopes = set(task_def.get("scopes", []))
+    scopes.add(f"{scope_prefix}:signing:cert:{worker['signing-type']}")
+
+    task_def["scopes"] = sorted(scopes)
+
+    # Set release artifacts
+    artifacts = get_upstream_signed_artifacts(worker["upstream-artifacts"])
+    artifacts.update(task.setdefault("attributes", {}).get("release_artifacts", []))
+    task["attributes"]["release_artifacts"] = sorted(artifacts)
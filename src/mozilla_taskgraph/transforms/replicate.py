@@ -16,6 +16,8 @@ from taskgraph.util.taskcluster import (
     get_task_definition,
 )
 
+from mozilla_taskgraph.util.graph_snapshot import fetch_snapshot, snapshot_name
+
 
 class ReplicateConfig(Schema):
     """Configuration for the replicate transforms."""
@@ -52,6 +54,8 @@ class ReplicateSchema(Schema, forbid_unknown_fields=False, kw_only=True):
 
 REPLICATE_SCHEMA = ReplicateSchema
 
+TASK_GRAPH = "public/task-graph.json"
+
 TASK_ID_RE = re.compile(
     r"^[A-Za-z0-9_-]{8}[Q-T][A-Za-z0-9_-][CGKOSWaeimquy26-][A-Za-z0-9_-]{10}[AQgw]$"
 )
@@ -65,6 +69,12 @@ def resolve_targets(config, tasks):
     for task in tasks:
         config = task.pop("replicate")
 
+        # If targets are filtered by kind, only those kinds need to be read
+        # from task graph snapshots.
+        kinds = config.get("include-attrs", {}).get("kind")
+        if isinstance(kinds, str):
+            kinds = {kinds}
+
         task_defs = []
         for target in config["target"]:
             if TASK_ID_RE.match(target):
@@ -74,9 +84,15 @@ def resolve_targets(config, tasks):
                 # target is an index path
                 task_id = find_task_id(target)
 
+            # prefer the snapshot of task-graph.json if there is one
+            result = fetch_snapshot(task_id, snapshot_name(TASK_GRAPH), kinds=kinds)
+            if result is not None:
+                task_defs.extend(result.values())
+                continue
+
             try:
                 # we have a decision task, add all tasks from task-graph.json
-                result = get_artifact(task_id, "public/task-graph.json").values()
+                result = get_artifact(task_id, TASK_GRAPH).values()
                 task_defs.extend(result)
             except TaskclusterRestFailure as e:
                 if e.status_code != 404:
@@ -0,0 +1,88 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Split the 'data-map' of 'scriptworker-beetmover-data' tasks across several
+tasks, so that no task definition grows too large and uploads can happen in
+parallel.
+"""
+
+import json
+from copy import deepcopy
+from typing import Optional
+
+from taskgraph.transforms.base import TransformSequence
+from taskgraph.util.schema import Schema
+
+# Default maximum size, in bytes, of the data-map of a single task.
+DEFAULT_MAX_DATA_MAP_SIZE = 1024 * 1024
+
+transforms = TransformSequence()
+
+
+class BeetmoverDataChunkSchema(Schema, forbid_unknown_fields=False, kw_only=True):
+    # Maximum size, in bytes, of the data-map of each resulting task.
+    # Defaults to ``DEFAULT_MAX_DATA_MAP_SIZE``.
+    max_data_map_size: Optional[int] = None
+
+
+transforms.add_validate(BeetmoverDataChunkSchema)
+
+
+def _entry_size(entry):
+    return len(json.dumps(entry, separators=(",", ":")))
+
+
+def pack_data_map(data_map, max_size):
+    """Pack data-map entries into as few chunks of ``max_size`` as possible.
+
+    This is a first-fit decreasing bin-packing pass. Entries larger than
+    ``max_size`` are placed in a chunk of their own. Within each chunk,
+    entries keep their original relative order.
+
+    Args:
+        data_map (list): The data-map entries.
+        max_size (int): Maximum serialized size of each chunk, in bytes.
+
+    Returns:
+        list: List of chunks, each a list of data-map entries.
+    """
+    sizes = [_entry_size(entry) for entry in data_map]
+    bins = []  # list of [remaining size, [indices]]
+    for i in sorted(range(len(data_map)), key=lambda i: sizes[i], reverse=True):
+        for b in bins:
+            if sizes[i] <= b[0]:
+                b[0] -= sizes[i]
+                b[1].append(i)
+                break
+        else:
+            bins.append([max_size - sizes[i], [i]])
+
+    return [[data_map[i] for i in sorted(indices)] for _, indices in bins]
+
+
+@transforms.add
+def chunk_data_map(config, tasks):
+    for task in tasks:
+        max_size = task.pop("max-data-map-size", None) or DEFAULT_MAX_DATA_MAP_SIZE
+        worker = task.get("worker", {})
+        if worker.get("implementation") != "scriptworker-beetmover-data":
+            yield task
+            continue
+
+        chunks = pack_data_map(worker["data-map"], max_size)
+        if len(chunks) <= 1:
+            yield task
+            continue
+
+        for i, chunk in enumerate(chunks, 1):
+            chunked = deepcopy({k: v for k, v in task.items() if k != "worker"})
+            chunked["worker"] = {k: v for k, v in worker.items() if k != "data-map"}
+            chunked["worker"]["data-map"] = chunk
+
+            for key in ("label", "name"):
+                if key in chunked:
+                    chunked[key] = f"{chunked[key]}-{i}"
+
+            chunked.setdefault("attributes", {})["data_map_chunk"] = i
+            yield chunked
@@ -0,0 +1,217 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Merge 'scriptworker-lando' tasks targeting the same repository into a single
+task running all of their actions.
+"""
+
+import json
+
+from taskgraph.transforms.base import TransformSequence
+
+from mozilla_taskgraph.util.attributes import common_attributes
+
+# Keys that may differ between merged tasks.
+PER_TASK_KEYS = {
+    "name",
+    "label",
+    "description",
+    "dependencies",
+    "attributes",
+    "scopes",
+    "treeherder",
+}
+
+# Keys of the worker that are combined when merging tasks.
+MERGED_WORKER_KEYS = {"actions", "matrix-rooms"}
+
+# Payload key that each lando action populates. Only one action can populate
+# a given key in a single task.
+ACTION_PAYLOAD_KEYS = {
+    "android-l10n-import": "android_l10n_import_info",
+    "android-l10n-sync": "android_l10n_sync_info",
+    "l10n-bump": "l10n_bump_info",
+    "tag": "tag_info",
+    "version-bump": "version_bump_info",
+    "esr-bump": "merge_info",
+    "main-bump": "merge_info",
+    "early-to-late-beta": "merge_info",
+    "uplift": "merge_info",
+}
+
+transforms = TransformSequence()
+
+
+def _merge_key(task):
+    """Return a key that is equal for tasks that should be merged together."""
+    worker = task["worker"]
+    rest = {k: v for k, v in task.items() if k not in PER_TASK_KEYS}
+    rest["worker"] = {k: v for k, v in worker.items() if k not in MERGED_WORKER_KEYS}
+    return (worker["lando-repo"], json.dumps(rest, sort_keys=True, default=str))
+
+
+def _payload_keys(task):
+    """Return the payload keys populated by the actions of a task.
+
+    Raises:
+        Exception: If more than one action of the task populates the same
+            payload key.
+    """
+    keys = set()
+    for action in task["worker"]["actions"]:
+        for name in action:
+            payload_key = ACTION_PAYLOAD_KEYS.get(name)
+            if payload_key is None:
+                continue
+            if payload_key in keys:
+                raise Exception(
+                    f"Lando task {task['name']} has more than one action "
+                    f"producing '{payload_key}'!"
+                )
+            keys.add(payload_key)
+    return keys
+
+
+def _compatible_batches(tasks):
+    """Split tasks into batches that can each be merged into a single task.
+
+    Tasks are added to the first batch whose actions populate different payload
+    keys, and whose dependencies don't conflict with theirs.
+    """
+    batches = []
+    for task in tasks:
+        keys = _payload_keys(task)
+        dependencies = task.get("dependencies", {})
+        for batch in batches:
+            if keys.isdisjoint(batch["keys"]) and all(
+                batch["dependencies"].get(name, label) == label
+                for name, label in dependencies.items()
+            ):
+                break
+        else:
+            batch = {"keys": set(), "dependencies": {}, "tasks": []}
+            batches.append(batch)
+
+        batch["keys"].update(keys)
+        batch["dependencies"].update(dependencies)
+        batch["tasks"].append(task)
+    return [batch["tasks"] for batch in batches]
+
+
+def merge_lando_tasks(tasks):
+    """Merge a list of lando tasks into a single task.
+
+    Args:
+        tasks (list): The lando tasks to merge, as yielded by previous
+            transforms. They must only differ by the keys in ``PER_TASK_KEYS``
+            and ``MERGED_WORKER_KEYS``.
+
+    Returns:
+        dict: The merged task.
+
+    Raises:
+        Exception: If more than one action populates the same payload key,
+            e.g two actions that produce ``merge_info``.
+    """
+    merged = {k: v for k, v in tasks[0].items() if k not in PER_TASK_KEYS}
+    names = [t["name"] for t in tasks]
+    merged["name"] = "-".join(names)
+    merged["description"] = "; ".join(t.get("description", t["name"]) for t in tasks)
+    if "treeherder" in tasks[0]:
+        merged["treeherder"] = tasks[0]["treeherder"]
+
+    producers = {}
+    actions = []
+    matrix_rooms = []
+    dependencies = {}
+    scopes = set()
+    for task in tasks:
+        for action in task["worker"]["actions"]:
+            for name in action:
+                payload_key = ACTION_PAYLOAD_KEYS.get(name)
+                if payload_key is None:
+                    continue
+                if payload_key in producers:
+                    raise Exception(
+                        f"Cannot merge lando tasks {producers[payload_key]} and "
+                        f"{task['name']}: both produce '{payload_key}'!"
+                    )
+                producers[payload_key] = task["name"]
+            actions.append(action)
+
+        for room in task["worker"].get("matrix-rooms", []):
+            if room not in matrix_rooms:
+                matrix_rooms.append(room)
+
+        for dep_name, label in task.get("dependencies", {}).items():
+            if dependencies.get(dep_name, label) != label:
+                raise Exception(
+                    f"Cannot merge lando tasks {', '.join(names)}: conflicting "
+                    f"dependency '{dep_name}'!"
+                )
+            dependencies[dep_name] = label
+
+        scopes.update(task.get("scopes", []))
+
+    # Only attributes shared by every merged task are kept.
+    attributes = common_attributes(tasks)
+    attributes["lando_merged"] = names
+    merged["attributes"] = attributes
+    if dependencies:
+        merged["dependencies"] = dependencies
+    if scopes:
+        merged["scopes"] = sorted(scopes)
+
+    merged["worker"] = dict(merged["worker"])
+    merged["worker"]["actions"] = actions
+    if matrix_rooms:
+        merged["worker"]["matrix-rooms"] = matrix_rooms
+    return merged
+
+
+def _label(config, task):
+    return task.get("label", f"{config.kind}-{task['name']}")
+
+
+def _linked_labels(config, tasks):
+    """Return the labels of tasks that depend on, or are depended on by, others.
+
+    Merging renames tasks, so these must be kept as is for the dependencies
+    between them to remain valid.
+    """
+    labels = {_label(config, t) for t in tasks}
+    linked = set()
+    for task in tasks:
+        depended = labels.intersection(task.get("dependencies", {}).values())
+        if depended:
+            linked.update(depended)
+            linked.add(_label(config, task))
+    return linked
+
+
+@transforms.add
+def merge_lando_tasks_by_repo(config, tasks):
+    lando_tasks = []
+    for task in tasks:
+        if task.get("worker", {}).get("implementation") != "scriptworker-lando":
+            yield task
+            continue
+        lando_tasks.append(task)
+
+    linked = _linked_labels(config, lando_tasks)
+    groups = {}
+    for task in lando_tasks:
+        if _label(config, task) in linked:
+            yield task
+            continue
+        groups.setdefault(_merge_key(task), []).append(task)
+
+    for group in groups.values():
+        # Tasks that can't be merged together, e.g two tasks producing
+        # ``merge_info``, are left in separate tasks.
+        for batch in _compatible_batches(group):
+            if len(batch) == 1:
+                yield batch[0]
+                continue
+            yield merge_lando_tasks(batch)
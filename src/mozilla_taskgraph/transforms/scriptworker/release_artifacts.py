@@ -4,16 +4,20 @@
 """
 Support a 'release-artifacts' key which automatically sets up the artifacts
 under 'public/build' and adds the corresponding attribute needed by downstream
-release tasks.
+release tasks. Directories and globs are uploaded as a single directory
+artifact.
 """
 
 import os
+from fnmatch import fnmatchcase
 from typing import Optional
 
 from taskgraph.transforms.base import TransformSequence
 from taskgraph.transforms.task import TaskDescriptionSchema
 from taskgraph.util.schema import Schema
-from taskgraph.util.workertypes import worker_type_implementation
+
+from mozilla_taskgraph.util.attributes import GLOB_CHARS
+from mozilla_taskgraph.util.workertypes import worker_type_implementation
 
 transforms = TransformSequence()
 
@@ -26,6 +30,69 @@ class ReleaseArtifactsSchema(Schema, forbid_unknown_fields=False, kw_only=True):
 transforms.add_validate(ReleaseArtifactsSchema)
 
 
+def _split_glob(path):
+    """Split a glob into its base directory and the pattern relative to it.
+
+    Returns ``None`` if ``path`` isn't a glob.
+    """
+    parts = path.split("/")
+    for i, part in enumerate(parts):
+        if any(c in part for c in GLOB_CHARS):
+            return "/".join(parts[:i]), "/".join(parts[i:])
+    return None
+
+
+def _find_directory(path, directories):
+    """Return the directory in ``directories`` containing ``path``, if any.
+
+    Returns:
+        tuple: The base of the directory and ``path`` relative to it, or
+            ``None`` if no directory contains ``path``.
+    """
+    for base in directories:
+        if not base:
+            return base, path
+        if path.startswith(f"{base}/"):
+            return base, path[len(base) + 1 :]
+    return None
+
+
+def _add_pattern(patterns, pattern):
+    if "*" not in patterns and pattern not in patterns:
+        patterns.append(pattern)
+
+
+def _collapse(files, directories):
+    """Fold entries that are already uploaded by a directory into it.
+
+    A directory artifact uploads the whole directory, so files and nested
+    directories within it would otherwise be uploaded twice, under the same
+    names. Their paths are added to the patterns of the enclosing directory
+    instead, so they remain release artifacts.
+    """
+    collapsed = {}
+    for base in sorted(directories, key=len):
+        if found := _find_directory(base, collapsed):
+            parent, rel = found
+            for pattern in directories[base]:
+                _add_pattern(collapsed[parent], f"{rel}/{pattern}")
+        else:
+            collapsed[base] = list(directories[base])
+
+    remaining = []
+    for path in files:
+        if found := _find_directory(path, collapsed):
+            parent, rel = found
+            patterns = collapsed[parent]
+            if not any(fnmatchcase(rel, p) for p in patterns):
+                _add_pattern(patterns, rel)
+        elif path not in remaining:
+            remaining.append(path)
+
+    # Keep directories in the order they were declared in.
+    return remaining, {b: collapsed[b] for b in directories if b in collapsed}
+
+
 @transforms.add
 def add_release_artifacts(config, tasks):
     for task in tasks:
@@ -43,10 +110,26 @@ def add_release_artifacts(config, tasks):
         else:
             path_tmpl = "/builds/worker/artifacts/{}"
 
+        files = []
+        directories = {}
         for path in task.pop("release-artifacts"):
             if os.path.isabs(path):
                 raise Exception("Cannot have absolute path artifacts")
 
+            if path.endswith("/"):
+                base, pattern = path.rstrip("/"), "*"
+            elif glob := _split_glob(path):
+                base, pattern = glob
+            else:
+                files.append(path)
+                continue
+
+            patterns = directories.setdefault(base, [])
+            if pattern not in patterns:
+                patterns.append(pattern)
+
+        files, directories = _collapse(files, directories)
+        for path in files:
             release_artifacts.append(
                 {
                     "type": "file",
@@ -55,6 +138,21 @@ def add_release_artifacts(config, tasks):
                 }
             )
 
+        # Globs sharing a base directory are uploaded as a single directory
+        # artifact. The files it contains are only known once the task ran,
+        # so the patterns are kept for consumers to match them against.
+        for base, patterns in directories.items():
+            release_artifacts.append(
+                {
+                    "type": "directory",
+                    "name": f"public/build/{base}".rstrip("/"),
+                    "path": path_tmpl.format(base).rstrip("/"),
+                    "patterns": ["*"] if "*" in patterns else patterns,
+                }
+            )
+
         artifacts = task.setdefault("worker", {}).setdefault("artifacts", [])
-        artifacts.extend(release_artifacts)
+        artifacts.extend(
+            {k: v for k, v in a.items() if k != "patterns"} for a in release_artifacts
+        )
         yield task
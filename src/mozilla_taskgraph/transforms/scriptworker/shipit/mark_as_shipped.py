@@ -7,7 +7,9 @@ from textwrap import dedent
 from typing import Optional
 
 from taskgraph.transforms.base import TransformSequence
-from taskgraph.util.schema import Schema, optionally_keyed_by, resolve_keyed_by
+from taskgraph.util.schema import Schema, optionally_keyed_by
+
+from mozilla_taskgraph.util.keyed_by import KeyedByResolver
 
 transforms = TransformSequence()
 
@@ -24,8 +26,9 @@ transforms.add_validate(MarkAsShippedSchema)
 
 @transforms.add
 def resolve_keys(config, tasks):
+    resolver = KeyedByResolver()
     for task in tasks:
-        resolve_keyed_by(
+        resolver.resolve_keyed_by(
             task,
             "shipit-product",
             item_name=task.get("name", "mark-as-shipped"),
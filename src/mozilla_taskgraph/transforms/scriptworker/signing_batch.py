@@ -0,0 +1,176 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Merge compatible 'scriptworker-signing' tasks into batches, so that a single
+signing task signs the artifacts of several upstream tasks.
+"""
+
+import json
+import re
+from collections import defaultdict
+from typing import Optional
+
+from taskgraph.transforms.base import TransformSequence
+from taskgraph.util.schema import Schema
+from taskgraph.util.treeherder import join_symbol, split_symbol
+
+from mozilla_taskgraph.util.attributes import common_attributes
+
+# Default maximum number of tasks merged into a single batch.
+DEFAULT_BATCH_SIZE = 20
+
+# Keys that may differ between tasks of the same batch.
+PER_TASK_KEYS = {"name", "label", "description", "dependencies", "attributes"}
+
+# Attributes that may differ between tasks of the same batch. Other attributes
+# (e.g ``shipping_phase`` or ``build_platform``) must be equal, so that the
+# batch keeps them.
+PER_TASK_ATTRIBUTES = {"locale", "chunk_locales", "l10n_chunk", "release_artifacts"}
+
+transforms = TransformSequence()
+
+
+class SigningBatchSchema(Schema, forbid_unknown_fields=False, kw_only=True):
+    # Maximum number of tasks to merge into a single signing task. Defaults
+    # to ``DEFAULT_BATCH_SIZE``. A value of 1 disables batching.
+    signing_batch_size: Optional[int] = None
+
+
+transforms.add_validate(SigningBatchSchema)
+
+
+def _batch_key(task):
+    """Return a key that is equal for tasks that can be merged together."""
+    worker = task["worker"]
+    task_types = sorted({a["taskType"] for a in worker["upstream-artifacts"]})
+    rest = {k: v for k, v in task.items() if k not in PER_TASK_KEYS}
+    rest["worker"] = {k: v for k, v in worker.items() if k != "upstream-artifacts"}
+    rest["attributes"] = {
+        k: v
+        for k, v in task.get("attributes", {}).items()
+        if k not in PER_TASK_ATTRIBUTES
+    }
+    if "treeherder" in rest:
+        rest["treeherder"] = {
+            k: v for k, v in rest["treeherder"].items() if k != "symbol"
+        }
+    return (
+        worker["signing-type"],
+        tuple(task_types),
+        json.dumps(rest, sort_keys=True, default=str),
+    )
+
+
+TASK_REFERENCE_RE = re.compile(r"<([^>]+)>")
+
+
+def _rename_reference(task_id, renames):
+    if not renames or not isinstance(task_id, dict) or "task-reference" not in task_id:
+        return task_id
+
+    # Renames are applied in a single pass, as a renamed dependency may take
+    # the name of another one, e.g {"build": "build-1", "build-1": "build-1-1"}.
+    ref = TASK_REFERENCE_RE.sub(
+        lambda m: f"<{renames.get(m.group(1), m.group(1))}>",
+        task_id["task-reference"],
+    )
+    return {"task-reference": ref}
+
+
+def merge_signing_tasks(tasks, name):
+    """Merge a list of compatible signing tasks into a single task.
+
+    Dependencies are combined, renaming any conflicting dependency names
+    (along with the task references that use them). Upstream artifacts that
+    come from the same task and use the same formats are combined into a
+    single entry.
+
+    Args:
+        tasks (list): The signing tasks to merge, as yielded by previous
+            transforms.
+        name (str): The name of the resulting task.
+
+    Returns:
+        dict: The merged task.
+    """
+    merged = {k: v for k, v in tasks[0].items() if k not in PER_TASK_KEYS}
+    merged["name"] = name
+    signing_type = merged["worker"]["signing-type"]
+    merged["description"] = f"Sign artifacts of {len(tasks)} tasks ({signing_type})"
+
+    dependencies = {}
+    upstream_artifacts = {}
+    release_artifacts = set()
+    for task in tasks:
+        renames = {}
+        for dep_name, label in task.get("dependencies", {}).items():
+            new_name = dep_name
+            i = 1
+            while dependencies.get(new_name, label) != label:
+                new_name = f"{dep_name}-{i}"
+                i += 1
+            if new_name != dep_name:
+                renames[dep_name] = new_name
+            dependencies[new_name] = label
+
+        for artifact in task["worker"]["upstream-artifacts"]:
+            artifact = dict(artifact)
+            artifact["taskId"] = _rename_reference(artifact["taskId"], renames)
+            key = json.dumps(
+                {k: v for k, v in artifact.items() if k != "paths"}, sort_keys=True
+            )
+            if key in upstream_artifacts:
+                paths = upstream_artifacts[key]["paths"]
+                paths.extend(p for p in artifact["paths"] if p not in paths)
+            else:
+                artifact["paths"] = list(artifact["paths"])
+                upstream_artifacts[key] = artifact
+
+        release_artifacts.update(
+            task.get("attributes", {}).get("release_artifacts", [])
+        )
+
+    # Only attributes shared by every task in the batch are kept.
+    attributes = common_attributes(tasks)
+    attributes["signing_batch"] = sorted(t["name"] for t in tasks)
+    if release_artifacts:
+        attributes["release_artifacts"] = sorted(release_artifacts)
+
+    merged["attributes"] = attributes
+    merged["dependencies"] = dependencies
+    merged["worker"] = dict(merged["worker"])
+    merged["worker"]["upstream-artifacts"] = list(upstream_artifacts.values())
+    return merged
+
+
+@transforms.add
+def batch_signing_tasks(config, tasks):
+    batches = defaultdict(list)
+    for task in tasks:
+        batch_size = task.pop("signing-batch-size", None) or DEFAULT_BATCH_SIZE
+        worker = task.get("worker", {})
+        if worker.get("implementation") != "scriptworker-signing" or batch_size == 1:
+            yield task
+            continue
+
+        batches[(batch_size, _batch_key(task))].append(task)
+
+    counts = defaultdict(int)
+    for (batch_size, _), group in batches.items():
+        for i in range(0, len(group), batch_size):
+            batch = group[i : i + batch_size]
+            if len(batch) == 1:
+                yield batch[0]
+                continue
+
+            signing_type = batch[0]["worker"]["signing-type"]
+            counts[signing_type] += 1
+            n = counts[signing_type]
+            task = merge_signing_tasks(batch, f"{signing_type}-batch-{n}")
+
+            if "treeherder" in task and "symbol" in task["treeherder"]:
+                group_symbol, _ = split_symbol(task["treeherder"]["symbol"])
+                task["treeherder"] = dict(task["treeherder"])
+                task["treeherder"]["symbol"] = join_symbol(group_symbol, f"B{n}")
+            yield task
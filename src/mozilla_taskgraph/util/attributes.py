@@ -2,7 +2,10 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import fnmatch
 import re
+from functools import cache, lru_cache
+from weakref import WeakKeyDictionary
 
 _COPYABLE_ATTRIBUTES = (
     "accepted-mar-channel-ids",
@@ -24,17 +27,208 @@ _COPYABLE_ATTRIBUTES = (
 )
 
 
+@cache
+def _compile_copier(denylist):
+    attrs = tuple(a for a in _COPYABLE_ATTRIBUTES if a not in denylist)
+
+    def copy(attributes):
+        return {a: attributes[a] for a in attrs if a in attributes}
+
+    return copy
+
+
+def attribute_copier(denylist=()):
+    """Return a function copying the curated ``_COPYABLE_ATTRIBUTES``.
+
+    The returned function takes an attributes dict and returns a new dict with
+    only the copyable attributes present in it that aren't in ``denylist``.
+    Copiers are compiled once per denylist.
+
+    Args:
+        denylist (iterable): Attributes not to copy.
+
+    Returns:
+        callable: The copier.
+    """
+    return _compile_copier(frozenset(denylist))
+
+
+def propagate_attributes(tasks, primary_dependencies, denylist=()):
+    """Propagate copyable attributes along dependency edges, in place.
+
+    Each task inherits the copyable attributes of its primary dependency, after
+    that dependency inherited those of its own primary dependency, and so on
+    (e.g build -> signing -> repackage -> beetmover). Attributes already set on
+    a task take precedence over inherited ones.
+
+    Tasks are processed in a single topological pass, so the cost is linear in
+    the number of edges.
+
+    Args:
+        tasks (dict): Mapping of label to task, which must have an
+            ``attributes`` dict.
+        primary_dependencies (dict): Mapping of label to the label of the
+            task to inherit attributes from. Tasks without an entry, or whose
+            primary dependency isn't in ``tasks``, don't inherit anything.
+        denylist (iterable): Attributes not to propagate.
+
+    Raises:
+        Exception: If primary dependencies form a cycle.
+    """
+    copy = attribute_copier(denylist)
+    done = set()
+    for label in tasks:
+        # Walk up the chain of primary dependencies until reaching a task
+        # that was already processed, then process the chain top down.
+        chain = []
+        current = label
+        while current not in done and current in tasks:
+            if current in chain:
+                raise Exception(f"Cycle in primary dependencies: {' -> '.join(chain)}")
+            chain.append(current)
+            current = primary_dependencies.get(current)
+
+        for current in reversed(chain):
+            dep = primary_dependencies.get(current)
+            if dep in tasks:
+                attributes = tasks[current].attributes
+                for key, value in copy(tasks[dep].attributes).items():
+                    attributes.setdefault(key, value)
+            done.add(current)
+
+
 def copy_attributes_from_dependent_job(dep_job, denylist=()):
     """Copy the curated ``_COPYABLE_ATTRIBUTES`` from a dependent job.
 
     Only attributes present on ``dep_job`` and not in ``denylist`` are copied,
     so entries that don't apply to a given job are simply skipped.
     """
-    return {
-        attr: dep_job.attributes[attr]
-        for attr in _COPYABLE_ATTRIBUTES
-        if attr in dep_job.attributes and attr not in denylist
-    }
+    return attribute_copier(denylist)(dep_job.attributes)
+
+
+def common_attributes(tasks):
+    """Return the attributes shared by all of the given tasks.
+
+    This is used when merging several tasks into one, where only attributes
+    with the same value in every task still apply to the result.
+
+    Args:
+        tasks (list): Task dicts, whose ``attributes`` may be missing.
+
+    Returns:
+        dict: The attributes present with the same value in every task.
+    """
+    attributes = None
+    for task in tasks:
+        task_attributes = task.get("attributes", {})
+        if attributes is None:
+            attributes = dict(task_attributes)
+        else:
+            attributes = {
+                k: v
+                for k, v in attributes.items()
+                if k in task_attributes and task_attributes[k] == v
+            }
+    return attributes or {}
+
+
+_HEAD_REF_RE = re.compile(r"refs/heads/(\S+)$")
+# Characters making a pattern a glob, as understood by ``fnmatch``.
+GLOB_CHARS = "*?["
+
+
+class ReleaseLevelResolver:
+    """Determine release levels from a ``release-branches`` mapping.
+
+    The mapping is compiled once: projects whose branches are all release
+    branches go in a set, literal branches in a set per project, and glob
+    patterns (e.g ``releases/*``) in a single regex per project. Levels are
+    cached by the parameters they depend on.
+
+    Args:
+        release_branches (dict): The graph config's ``release-branches``.
+    """
+
+    def __init__(self, release_branches):
+        self._all_branches = set()
+        self._literals = {}
+        self._patterns = {}
+        self._cache = {}
+
+        for project, branches in release_branches.items():
+            if branches is True:
+                self._all_branches.add(project)
+            elif isinstance(branches, (list, tuple)):
+                self._literals[project] = frozenset(
+                    b for b in branches if not any(c in b for c in GLOB_CHARS)
+                )
+                if globs := [b for b in branches if b not in self._literals[project]]:
+                    self._patterns[project] = re.compile(
+                        "|".join(fnmatch.translate(g) for g in globs)
+                    )
+
+    def is_release_branch(self, project, branch):
+        """Whether ``branch`` is a release branch of ``project``."""
+        if project in self._all_branches:
+            return True
+        if branch in self._literals.get(project, ()):
+            return True
+        pattern = self._patterns.get(project)
+        return bool(pattern and pattern.match(branch))
+
+    def level(self, params):
+        """Whether this is a production release or not.
+
+        See :func:`release_level`.
+
+        :return str: One of "production" or "staging".
+        """
+        if params["level"] != "3":
+            return "staging"
+
+        project = params["project"]
+        key = (project, params.get("head_ref"))
+        if (result := self._cache.get(key)) is not None:
+            return result
+
+        if project in self._all_branches:
+            result = "production"
+        elif project in self._literals:
+            match = _HEAD_REF_RE.match(params["head_ref"])
+            if match and self.is_release_branch(project, match.group(1)):
+                result = "production"
+            else:
+                result = "staging"
+        else:
+            result = "staging"
+
+        self._cache[key] = result
+        return result
+
+
+_resolvers = WeakKeyDictionary()
+
+
+def get_release_level_resolver(graph_config):
+    """Get the release level resolver for a graph config.
+
+    Resolvers are cached per graph config, and rebuilt if its
+    ``release-branches`` are replaced.
+
+    Args:
+        graph_config (GraphConfig): The graph config.
+
+    Returns:
+        ReleaseLevelResolver: The resolver.
+    """
+    release_branches = graph_config.get("release-branches") or {}
+    entry = _resolvers.get(graph_config)
+    if entry is None or entry[0] is not release_branches:
+        entry = _resolvers[graph_config] = (
+            release_branches,
+            ReleaseLevelResolver(release_branches),
+        )
+    return entry[1]
 
 
 def release_level(release_branches: dict, params: dict):
@@ -44,25 +238,28 @@ def release_level(release_branches: dict, params: dict):
     project to the branches considered "production" for it. A value of ``True``
     for a project means every branch of that project is a release branch (the
     model used by Mercurial based projects), while a list restricts releases to
-    the named branches.
+    the named branches. Entries of the list may be glob patterns, e.g
+    ``releases/*``.
 
     A build is only ever "production" at level 3. ``params`` provides ``level``
     and ``project``, plus ``head_ref`` for projects configured with a branch
     list.
 
+    The mapping is compiled into a :class:`ReleaseLevelResolver`, which is
+    cached by the contents of the mapping. Transforms can use
+    :func:`get_release_level_resolver` instead.
+
     :return str: One of "production" or "staging".
     """
+    key = tuple(
+        sorted(
+            (project, tuple(b) if isinstance(b, list) else b)
+            for project, b in release_branches.items()
+        )
+    )
+    return _cached_resolver(key).level(params)
 
-    if params["level"] == "3":
-        branches = release_branches.get(params["project"])
-
-        if branches is True:
-            return "production"
-
-        if isinstance(branches, list):
-            match = re.match(r"refs/heads/(\S+)$", params["head_ref"])
-
-            if match and match.group(1) in branches:
-                return "production"
 
-    return "staging"
+@lru_cache(maxsize=16)
+def _cached_resolver(release_branches):
+    return ReleaseLevelResolver(dict(release_branches))
@@ -0,0 +1,106 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Support for storing the ``existing_tasks`` parameter out of line.
+
+Release promotion graphs can reuse tens of thousands of tasks, making
+``existing_tasks`` by far the largest part of ``parameters.yml``. Instead, the
+mapping can be written to a separate compressed artifact, with only a
+reference to it kept in the ``existing_tasks_artifact`` parameter.
+
+The ``existing_tasks`` parameter is then replaced by a placeholder string.
+Unlike an empty or missing mapping, which taskgraph's parameter loaders would
+silently treat as "nothing to reuse", the placeholder fails parameter
+validation, strict or not. Tools that don't know about the artifact, e.g
+``taskgraph`` commands passed ``-p task-id=<id>``, thus fail loudly. Consumers
+should read the mapping with ``load_existing_tasks``.
+"""
+
+import gzip
+import json
+import logging
+from collections.abc import Mapping
+
+from taskgraph.decision import ARTIFACTS_DIR, write_artifact
+from taskgraph.util.taskcluster import get_artifact
+from taskgraph.util.yaml import load_yaml
+
+logger = logging.getLogger(__name__)
+
+EXISTING_TASKS_ARTIFACT = "public/existing-tasks.json.gz"
+
+# Value of ``existing_tasks`` in parameters referencing an out of line mapping.
+# It is deliberately not a mapping, so that it fails parameter validation.
+EXISTING_TASKS_PLACEHOLDER = (
+    f"<stored in {EXISTING_TASKS_ARTIFACT}, see "
+    "mozilla_taskgraph.util.existing_tasks:load_existing_tasks>"
+)
+
+
+def write_existing_tasks_artifact():
+    """Move ``existing_tasks`` out of the ``parameters.yml`` artifact.
+
+    This is meant to be called after ``taskgraph_decision`` has written its
+    artifacts. The mapping is written to a gzipped JSON artifact, and
+    ``parameters.yml`` is rewritten to reference it, with ``existing_tasks``
+    set to ``EXISTING_TASKS_PLACEHOLDER``.
+    """
+    parameters = load_yaml(ARTIFACTS_DIR, "parameters.yml")
+    existing_tasks = parameters.get("existing_tasks")
+    if not existing_tasks:
+        return
+
+    name = EXISTING_TASKS_ARTIFACT.split("/", 1)[1]
+    logger.info(f"writing artifact file `{name}`")
+    with open(ARTIFACTS_DIR / name, "wb") as f:
+        f.write(
+            gzip.compress(json.dumps(existing_tasks, separators=(",", ":")).encode())
+        )
+
+    parameters["existing_tasks"] = EXISTING_TASKS_PLACEHOLDER
+    parameters["existing_tasks_artifact"] = EXISTING_TASKS_ARTIFACT
+    write_artifact("parameters.yml", parameters)
+
+
+class LazyExistingTasks(Mapping):
+    """A read-only ``existing_tasks`` mapping, downloaded on first access."""
+
+    def __init__(self, task_id, path):
+        self.task_id = task_id
+        self.path = path
+        self._data = None
+
+    @property
+    def data(self):
+        if self._data is None:
+            with gzip.open(get_artifact(self.task_id, self.path)) as f:
+                self._data = json.load(f)
+        return self._data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+
+def load_existing_tasks(task_id, parameters):
+    """Return the ``existing_tasks`` of parameters produced by ``task_id``.
+
+    If the mapping was stored out of line, it is only downloaded once it is
+    first accessed.
+
+    Args:
+        task_id (str): The task that produced ``parameters``.
+        parameters (dict): The parameters, e.g from its ``parameters.yml``.
+
+    Returns:
+        Mapping: Mapping of label to taskId.
+    """
+    if path := parameters.get("existing_tasks_artifact"):
+        return LazyExistingTasks(task_id, path)
+    return parameters.get("existing_tasks", {})
@@ -0,0 +1,262 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+A compact binary snapshot of a task graph that can be partially read.
+
+Consumers of a previous graph (e.g release promotion, or the replicate
+transforms) often only need the tasks of a handful of kinds, yet the JSON
+graph artifacts have to be downloaded and parsed in their entirety. A snapshot
+stores each task as an individual msgpack record, grouped by kind, preceded by
+an index of byte offsets. Readers first fetch the header and index, then use
+HTTP range requests to fetch only the kinds they need.
+
+The layout is::
+
+    <magic:4s><version:B><index length:I>  (little endian)
+    <index>  msgpack {"kinds": {kind: [start, end]},
+                      "tasks": {key: [kind, start, end]}}
+    <data>   concatenated msgpack task records
+
+Offsets are relative to the start of the data section, and ``key`` is the key
+of the task in the original graph (a label in ``full-task-graph.json``, a
+taskId in ``task-graph.json``).
+
+Range requests only work if the snapshot is served without a content encoding,
+as offsets refer to the decoded snapshot. Snapshots served with e.g
+``Content-Encoding: gzip`` are downloaded in full instead.
+"""
+
+import logging
+import os
+import struct
+
+import msgspec
+from taskcluster.exceptions import TaskclusterRestFailure
+from taskgraph.decision import ARTIFACTS_DIR, read_artifact
+from taskgraph.util.taskcluster import get_session, get_taskcluster_client
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MTGS"
+VERSION = 1
+HEADER = struct.Struct("<4sBI")
+
+# Number of bytes to request up front. In most cases this is enough to cover
+# both the header and the index, saving a round trip.
+INITIAL_READ_SIZE = 64 * 1024
+
+
+def snapshot_name(name):
+    """Return the name of the snapshot artifact for a JSON graph artifact.
+
+    E.g ``public/full-task-graph.json`` -> ``public/full-task-graph.msgpack``.
+    """
+    return f"{os.path.splitext(name)[0]}.msgpack"
+
+
+def encode_snapshot(graph_json):
+    """Encode a task graph, as returned by ``TaskGraph.to_json``, as a snapshot.
+
+    Args:
+        graph_json (dict): Mapping of key to task definition.
+
+    Returns:
+        bytes: The encoded snapshot.
+    """
+    encoder = msgspec.msgpack.Encoder()
+
+    by_kind = {}
+    for key, task in graph_json.items():
+        kind = task.get("kind") or task["attributes"]["kind"]
+        by_kind.setdefault(kind, []).append(key)
+
+    data = bytearray()
+    index = {"kinds": {}, "tasks": {}}
+    for kind in sorted(by_kind):
+        kind_start = len(data)
+        for key in by_kind[kind]:
+            start = len(data)
+            encoder.encode_into(graph_json[key], data, len(data))
+            index["tasks"][key] = [kind, start, len(data)]
+        index["kinds"][kind] = [kind_start, len(data)]
+
+    index = encoder.encode(index)
+    return HEADER.pack(MAGIC, VERSION, len(index)) + index + bytes(data)
+
+
+def _decode_header(data):
+    magic, version, index_length = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise Exception("Not a task graph snapshot!")
+    if version != VERSION:
+        raise Exception(f"Unsupported task graph snapshot version {version}!")
+    return index_length
+
+
+def _select_kinds(index, kinds, exclude_kinds):
+    selected = set(index["kinds"]) if kinds is None else set(kinds)
+    return selected - set(exclude_kinds)
+
+
+def _decode_records(index, blocks, kinds):
+    """Decode the task records of ``kinds`` from the given data blocks.
+
+    ``blocks`` is a list of ``(start, bytes)`` tuples, each holding a
+    contiguous region of the data section beginning at offset ``start``.
+    """
+    decoder = msgspec.msgpack.Decoder()
+    graph = {}
+    for key, (kind, start, end) in index["tasks"].items():
+        if kind not in kinds:
+            continue
+        for block_start, block in blocks:
+            if block_start <= start and end <= block_start + len(block):
+                record = memoryview(block)[start - block_start : end - block_start]
+                graph[key] = decoder.decode(record)
+                break
+        else:
+            raise Exception(f"Task {key} is missing from the fetched snapshot data!")
+    return graph
+
+
+def decode_snapshot(data, kinds=None, exclude_kinds=()):
+    """Decode a snapshot that was read in its entirety.
+
+    Args:
+        data (bytes): The encoded snapshot.
+        kinds (set): Only decode tasks from these kinds. Defaults to all kinds.
+        exclude_kinds (set): Skip tasks from these kinds.
+
+    Returns:
+        dict: Mapping of key to task definition, as in the original graph.
+    """
+    index_length = _decode_header(data)
+    index_end = HEADER.size + index_length
+    index = msgspec.msgpack.decode(memoryview(data)[HEADER.size : index_end])
+    kinds = _select_kinds(index, kinds, exclude_kinds)
+    return _decode_records(index, [(0, memoryview(data)[index_end:])], kinds)
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class _EncodedSnapshot(Exception):
+    """The snapshot is served with a content encoding, so ranges can't be used."""
+
+
+def fetch_snapshot(task_id, name, kinds=None, exclude_kinds=()):
+    """Fetch (part of) a snapshot artifact using HTTP range requests.
+
+    Args:
+        task_id (str): The task that published the snapshot.
+        name (str): Name of the snapshot artifact.
+        kinds (set): Only fetch tasks from these kinds. Defaults to all kinds.
+        exclude_kinds (set): Skip tasks from these kinds.
+
+    Returns:
+        dict: Mapping of key to task definition, or ``None`` if the task has
+            no such artifact.
+    """
+    queue = get_taskcluster_client("queue")
+    try:
+        url = queue.getLatestArtifact(task_id, name)["url"]
+    except TaskclusterRestFailure as e:
+        if e.status_code != 404:
+            raise
+        return None
+
+    session = get_session()
+
+    def read(start, end):
+        response = session.get(
+            url,
+            headers={
+                "Range": f"bytes={start}-{end - 1}",
+                "Accept-Encoding": "identity",
+            },
+            stream=True,
+        )
+        response.raise_for_status()
+        # Ranges of content with an encoding (e.g gzip, as used by Taskcluster
+        # workers for unknown extensions) cover the encoded stream, while the
+        # offsets in the index refer to the decoded snapshot.
+        if response.headers.get("Content-Encoding", "identity") != "identity":
+            response.close()
+            raise _EncodedSnapshot()
+        return response.status_code == 206, response.content
+
+    try:
+        return _fetch_ranges(read, name, task_id, kinds, exclude_kinds)
+    except _EncodedSnapshot:
+        logger.debug(f"{name} from {task_id} is encoded, downloading it in full")
+        response = session.get(url)
+        response.raise_for_status()
+        return decode_snapshot(response.content, kinds, exclude_kinds)
+
+
+def _fetch_ranges(read, name, task_id, kinds, exclude_kinds):
+    """Fetch the tasks of ``kinds`` from a snapshot using range requests.
+
+    Args:
+        read (callable): Function taking a ``start`` and ``end`` offset, and
+            returning whether the response is partial and its content.
+
+    Raises:
+        _EncodedSnapshot: If ``read`` can't return ranges of the snapshot.
+    """
+    partial, data = read(0, INITIAL_READ_SIZE)
+    if not partial:
+        # The server ignored the range, so we already have everything.
+        return decode_snapshot(data, kinds, exclude_kinds)
+
+    index_length = _decode_header(data)
+    index_end = HEADER.size + index_length
+    if len(data) < index_end:
+        data += read(len(data), index_end)[1]
+    index = msgspec.msgpack.decode(memoryview(data)[HEADER.size : index_end])
+
+    kinds = _select_kinds(index, kinds, exclude_kinds)
+    ranges = [r for kind, r in index["kinds"].items() if kind in kinds]
+
+    blocks = []
+    for start, end in _merge_ranges(ranges):
+        # Re-use whatever the initial read already covered.
+        have = len(data) - index_end
+        if end <= have:
+            blocks.append(
+                (start, memoryview(data)[index_end + start : index_end + end])
+            )
+            continue
+        blocks.append((start, read(index_end + start, index_end + end)[1]))
+
+    logger.debug(
+        f"Fetched {sum(len(b) for _, b in blocks)} bytes of task data for "
+        f"{len(blocks)} range(s) of {name} from {task_id}"
+    )
+    return _decode_records(index, blocks, kinds)
+
+
+def write_graph_snapshot(name="full-task-graph.json"):
+    """Publish a snapshot next to a JSON graph artifact of the decision task.
+
+    This is meant to be called by decision (or action) tasks after
+    ``taskgraph_decision`` has written its artifacts, e.g::
+
+        write_graph_snapshot("full-task-graph.json")
+        write_graph_snapshot("task-graph.json")
+
+    Args:
+        name (str): Name of the JSON graph artifact to snapshot.
+    """
+    path = ARTIFACTS_DIR / snapshot_name(name)
+    logger.info(f"writing artifact file `{path.name}`")
+    with open(path, "wb") as f:
+        f.write(encode_snapshot(read_artifact(name)))
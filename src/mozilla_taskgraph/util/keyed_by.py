@@ -0,0 +1,193 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import copy
+
+import msgspec
+from taskgraph.util.keyed_by import evaluate_keyed_by
+from taskgraph.util.schema import iter_dot_path
+
+
+def _is_keyed_by(value):
+    return (
+        isinstance(value, dict)
+        and len(value) == 1
+        and next(iter(value)).startswith("by-")
+    )
+
+
+def keyed_by_names(value):
+    """Return the names of the attributes a keyed-by value depends on.
+
+    Args:
+        value: A value which may be keyed by some attributes, possibly nested.
+
+    Returns:
+        tuple: Names of the attributes, e.g ``("build-type", "project")``.
+    """
+    names = {}
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if not _is_keyed_by(value):
+            continue
+        key, alternatives = next(iter(value.items()))
+        names[key[3:]] = None
+        stack.extend(alternatives.values())
+    return tuple(names)
+
+
+class KeyedByResolver:
+    """Resolve keyed-by fields, memoizing results across items.
+
+    The result of resolving a keyed-by value only depends on the value itself
+    and the attributes it is keyed by. When many items share the same value
+    (e.g tasks created from the same ``task-defaults``), it is only evaluated
+    once per distinct set of attributes.
+
+    Loaders typically give every task its own deep copy of the defaults, so
+    values are cached by a structural fingerprint (their canonical JSON
+    encoding) rather than by identity. The fingerprint is itself cached by
+    identity, so each value object is only encoded once. Resolved values that
+    are containers are copied, so items never share them.
+    """
+
+    def __init__(self):
+        self._fingerprints = {}
+        self._names = {}
+        self._results = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _fingerprint(self, value):
+        entry = self._fingerprints.get(id(value))
+        if entry is not None and entry[0] is value:
+            return entry[1]
+
+        try:
+            fingerprint = msgspec.json.encode(value, order="sorted")
+        except TypeError:
+            # Not representable as JSON (e.g mixed key types), fall back to
+            # caching by identity.
+            fingerprint = id(value)
+        # Keep a reference to the value so its id isn't reused.
+        self._fingerprints[id(value)] = (value, fingerprint)
+        return fingerprint
+
+    def _lookup(
+        self, value, item_name, context_get, attributes, defer, enforce_single_match
+    ):
+        fingerprint = self._fingerprint(value)
+        names = self._names.get(fingerprint)
+        if names is None:
+            names = self._names[fingerprint] = keyed_by_names(value)
+
+        key = (
+            fingerprint,
+            tuple(context_get(name) for name in names),
+            defer,
+            enforce_single_match,
+        )
+        if key in self._results:
+            self.hits += 1
+            result = self._results[key]
+            if isinstance(result, (dict, list)):
+                result = copy.deepcopy(result)
+            return result
+
+        self.misses += 1
+        result = evaluate_keyed_by(
+            value,
+            item_name,
+            attributes(),
+            defer=defer,
+            enforce_single_match=enforce_single_match,
+        )
+        if isinstance(result, (dict, list)):
+            self._results[key] = copy.deepcopy(result)
+        else:
+            self._results[key] = result
+        return result
+
+    def evaluate(
+        self, value, item_name, attributes, defer=None, enforce_single_match=True
+    ):
+        """Memoized version of :func:`taskgraph.util.keyed_by.evaluate_keyed_by`.
+
+        Args:
+            value: Value to evaluate.
+            item_name (str): Used to generate useful error messages.
+            attributes (dict): Attributes used to look up 'by-<key>' with.
+            defer (list): Names of attributes to defer evaluation of.
+            enforce_single_match (bool): If True (default), each level of the
+                value must have exactly one matching alternative. Otherwise
+                the first match is used.
+
+        Returns:
+            The resolved value.
+        """
+        if not _is_keyed_by(value):
+            return value
+        return self._lookup(
+            value,
+            item_name,
+            attributes.get,
+            lambda: attributes,
+            _freeze(defer),
+            enforce_single_match,
+        )
+
+    def resolve_keyed_by(
+        self,
+        item,
+        field,
+        item_name,
+        defer=None,
+        enforce_single_match=True,
+        **extra_values,
+    ):
+        """Memoized version of :func:`taskgraph.util.schema.resolve_keyed_by`.
+
+        Args:
+            item (dict): Object being evaluated, modified in place.
+            field (str): Name of the key to perform evaluation on, in dot path
+                notation.
+            item_name (str): Used to generate useful error messages.
+            defer (list): Names of attributes to defer evaluation of.
+            enforce_single_match (bool): If True (default), each level of the
+                value must have exactly one matching alternative. Otherwise
+                the first match is used.
+            extra_values (kwargs): Additional values available for reference
+                from by-<field>.
+
+        Returns:
+            dict: The item.
+        """
+        defer = _freeze(defer)
+
+        def context_get(name):
+            if name in extra_values:
+                return extra_values[name]
+            return item.get(name)
+
+        def attributes():
+            # Only built when the value actually needs to be evaluated.
+            return dict(item, **extra_values)
+
+        for container, subfield in iter_dot_path(item, field):
+            value = container[subfield]
+            if _is_keyed_by(value):
+                container[subfield] = self._lookup(
+                    value,
+                    f"`{field}` in `{item_name}`",
+                    context_get,
+                    attributes,
+                    defer,
+                    enforce_single_match,
+                )
+        return item
+
+
+def _freeze(defer):
+    return tuple(defer) if defer else None
@@ -0,0 +1,112 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Conversion of validated task data to payload form.
+"""
+
+from functools import cache
+
+import msgspec
+
+_COMPILING = object()
+
+
+def _compile_payload_converter(type_info, converters):
+    """Compile a function converting values of a ``msgspec.inspect`` type.
+
+    Returns ``None`` if values of this type can be used as is.
+    """
+    if isinstance(type_info, msgspec.inspect.StructType):
+        cls = type_info.cls
+        if cls in converters:
+            if (convert := converters[cls]) is _COMPILING:
+                # Recursive type, defer the lookup until conversion.
+                return lambda value: converters[cls](value)
+            return convert
+
+        converters[cls] = _COMPILING
+        renames = {f.encode_name: f.name for f in type_info.fields}
+        nested = {}
+        for f in type_info.fields:
+            if convert := _compile_payload_converter(f.type, converters):
+                nested[f.encode_name] = (f.name, convert)
+
+        if all(k.replace("-", "_") == name for k, name in renames.items()):
+            # Kebab-case schemas don't need to look up the name of each field.
+            if not nested and all(k == name for k, name in renames.items()):
+                convert_fields = None
+            else:
+
+                def convert_fields(value):
+                    return {k.replace("-", "_"): v for k, v in value.items()}
+
+        else:
+
+            def convert_fields(value):
+                return {
+                    renames.get(k) or k.replace("-", "_"): v for k, v in value.items()
+                }
+
+        if not nested:
+            convert_struct = convert_fields
+        else:
+
+            def convert_struct(value):
+                result = convert_fields(value)
+                for key, (name, convert) in nested.items():
+                    if (v := value.get(key)) is not None:
+                        result[name] = convert(v)
+                return result
+
+        converters[cls] = convert_struct
+        return convert_struct
+
+    if isinstance(type_info, msgspec.inspect.ListType):
+        if convert_item := _compile_payload_converter(type_info.item_type, converters):
+            return lambda value: [convert_item(v) for v in value]
+        return None
+
+    if isinstance(type_info, msgspec.inspect.UnionType):
+        for t in type_info.types:
+            if convert := _compile_payload_converter(t, converters):
+                return convert
+
+    return None
+
+
+@cache
+def _payload_converter(schema):
+    return _compile_payload_converter(msgspec.inspect.type_info(schema), {})
+
+
+def to_payload(schema, data):
+    """Convert data validated against ``schema`` to its payload form.
+
+    This is the equivalent of ``msgspec.to_builtins`` with a renamer using the
+    Python (underscore) name of each field rather than its encoded (kebab-case)
+    name. A converter is compiled once per schema from the msgspec type
+    information, so only the nested objects that actually need to be renamed
+    are copied.
+
+    Args:
+        schema (type): The msgspec type ``data`` was validated against.
+        data: The validated data, as found in the task definition.
+
+    Returns:
+        The data with fields renamed for use in a payload.
+    """
+    if convert := _payload_converter(schema):
+        return convert(data)
+    return data
+
+
+def dash_to_underscore(obj):
+    """Return a shallow copy of ``obj`` with dashes in its keys replaced.
+
+    Prefer ``to_payload``, which also renames the keys of nested objects.
+    """
+    new_obj = {}
+    for k, v in obj.items():
+        new_obj[k.replace("-", "_")] = v
+    return new_obj
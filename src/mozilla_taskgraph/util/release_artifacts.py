@@ -0,0 +1,158 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+An index of the release artifacts of the tasks a kind depends on, and the
+tasks producing them.
+
+The index is built from the ``release-artifacts`` attributes set by the
+``release_artifacts`` transforms, and the ``release_artifacts`` attributes set
+by the ``scriptworker-signing`` payload builder. As these attributes are part
+of the tasks of ``kind-dependencies``, which are passed to each kind even when
+kinds are loaded in separate processes, transforms of downstream kinds (e.g
+beetmover or checksums) can look up the producers of an artifact without
+scanning the attributes of every dependency.
+"""
+
+from collections import defaultdict
+from fnmatch import fnmatchcase
+from weakref import WeakKeyDictionary
+
+_indexes = WeakKeyDictionary()
+
+
+class ReleaseArtifactsIndex:
+    """Mapping of release artifact names to the labels of their producers."""
+
+    def __init__(self):
+        self._producers = defaultdict(dict)
+        self._artifacts = defaultdict(dict)
+
+    def add(self, label, names):
+        """Record that the task ``label`` produces the artifacts ``names``.
+
+        Args:
+            label (str): Label of the producing task.
+            names (iterable): Names of the artifacts, e.g
+                ``public/build/target.tar.gz``.
+        """
+        artifacts = self._artifacts[label]
+        for name in names:
+            # Dicts are used as ordered sets, to keep insertion order.
+            self._producers[name][label] = None
+            artifacts[name] = None
+
+    def producers(self, name):
+        """Return the labels of the tasks producing an artifact.
+
+        Args:
+            name (str): Name of the artifact.
+
+        Returns:
+            tuple: Labels of the producing tasks, in the order they were added.
+        """
+        if name not in self._producers:
+            return ()
+        return tuple(self._producers[name])
+
+    def producer(self, name, labels=None):
+        """Return the label of the single task producing an artifact.
+
+        Args:
+            name (str): Name of the artifact.
+            labels (container): If specified, only consider producers within
+                these labels, e.g the dependencies of a task.
+
+        Returns:
+            str: The label of the producer, or ``None`` if there is none.
+
+        Raises:
+            Exception: If more than one task produces the artifact.
+        """
+        producers = self.producers(name)
+        if labels is not None:
+            producers = tuple(p for p in producers if p in labels)
+
+        if len(producers) > 1:
+            raise Exception(
+                f"Multiple tasks produce release artifact {name}: "
+                f"{', '.join(producers)}!"
+            )
+        return producers[0] if producers else None
+
+    def artifacts(self, label):
+        """Return the release artifacts produced by a task.
+
+        Args:
+            label (str): Label of the task.
+
+        Returns:
+            tuple: Names of the artifacts, in the order they were added.
+        """
+        if label not in self._artifacts:
+            return ()
+        return tuple(self._artifacts[label])
+
+    def __contains__(self, name):
+        return name in self._producers
+
+
+def get_release_artifacts_index(config):
+    """Get the release artifacts index of the dependencies of a kind.
+
+    The index is built on first use, and shared by all the transforms of the
+    kind.
+
+    Args:
+        config (TransformConfig): The configuration for the kind being
+            transformed.
+
+    Returns:
+        ReleaseArtifactsIndex: The index of the release artifacts of the tasks
+            in ``config.kind_dependencies_tasks``.
+    """
+    if (index := _indexes.get(config)) is None:
+        index = _indexes[config] = ReleaseArtifactsIndex()
+        for label, task in config.kind_dependencies_tasks.items():
+            attributes = task.attributes
+            index.add(
+                label,
+                [
+                    a["name"]
+                    for a in attributes.get("release-artifacts", [])
+                    if a["type"] == "file"
+                ],
+            )
+            index.add(label, attributes.get("release_artifacts", []))
+    return index
+
+
+def release_artifact_names(release_artifacts, listing=()):
+    """Lazily yield the names of the artifacts in a ``release-artifacts`` attribute.
+
+    Entries of type ``directory`` (from directory or glob release artifacts)
+    only describe which files of the directory are release artifacts. They
+    are expanded by matching their ``patterns`` against ``listing``, e.g the
+    names of the artifacts the task actually uploaded. As with ``fnmatch``,
+    ``*`` also matches ``/``.
+
+    Args:
+        release_artifacts (list): The ``release-artifacts`` attribute.
+        listing (iterable): Names of existing artifacts to expand directory
+            entries against.
+
+    Yields:
+        str: Names of the release artifacts.
+    """
+    listing = tuple(listing)
+    for entry in release_artifacts:
+        if entry["type"] != "directory":
+            yield entry["name"]
+            continue
+
+        prefix = f"{entry['name']}/"
+        for name in listing:
+            if name.startswith(prefix) and any(
+                fnmatchcase(name[len(prefix) :], p) for p in entry["patterns"]
+            ):
+                yield name
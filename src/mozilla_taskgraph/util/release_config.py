@@ -0,0 +1,68 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Release information used in the payload of release tasks.
+"""
+
+import os
+from functools import cache
+
+import msgspec
+from taskgraph.util.schema import Schema
+
+
+class PartialUpdateInfo(
+    Schema, rename=lambda name: name, forbid_unknown_fields=False, kw_only=True
+):
+    # Build number of the release to generate partial updates from.
+    buildNumber: int
+
+
+@cache
+def _parse_partial_updates(partial_updates):
+    """Validate ``PARTIAL_UPDATES`` and format it as ``partial_versions``.
+
+    The result is cached, so each distinct value is only parsed once per
+    process regardless of how many tasks need it.
+    """
+    try:
+        partial_updates = msgspec.json.decode(
+            partial_updates, type=dict[str, PartialUpdateInfo]
+        )
+    except msgspec.DecodeError as e:
+        raise Exception(f"Invalid PARTIAL_UPDATES: {e}")
+
+    return ", ".join(
+        f"{v}build{info.buildNumber}" for v, info in partial_updates.items()
+    )
+
+
+def get_release_config(config):
+    """Get the build number and version for a release task.
+
+    Currently only applies to beetmover tasks.
+
+    Args:
+        config (TransformConfig): The configuration for the kind being transformed.
+
+    When the `PARTIAL_UPDATES` environment variable is set (as done by the
+    `release_promotion` action), a `partial_versions` entry describing the
+    partial updates is also included.
+
+    Returns:
+        dict: containing at least `build_number` and `version`.  This can be
+            used to update `task.payload`.
+    """
+    release_config = {
+        "version": config.params["version"],
+        "appVersion": config.params["app_version"],
+        "next_version": config.params["next_version"],
+        "build_number": config.params["build_number"],
+    }
+
+    partial_updates = os.environ.get("PARTIAL_UPDATES", "")
+    if partial_updates != "":
+        release_config["partial_versions"] = _parse_partial_updates(partial_updates)
+
+    return release_config
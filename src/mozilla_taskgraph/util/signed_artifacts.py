@@ -2,20 +2,121 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+from functools import lru_cache
+
+# Artifacts produced in place of inputs with a given extension. Each rule is a
+# tuple of the suffix replacing the extension, and the set of signing behaviors
+# for which the artifact is *not* produced (``None`` standing for no behavior,
+# which an empty behavior is normalized to).
+EXTENSION_RULES = {
+    ".dmg": (
+        (".tar.gz", frozenset()),
+        (".pkg", frozenset({None, "mac_sign"})),
+    ),
+}
+
+# Suffixes of the artifacts produced alongside the input by signing formats.
+FORMAT_SUFFIXES = {
+    "gcp_prod_autograph_gpg": (".asc",),
+}
+
+CACHE_SIZE = 4096
+
+
+def add_extension_rule(extension, suffix, skip_behaviors=()):
+    """Register an artifact produced in place of inputs with ``extension``.
+
+    Args:
+        extension (str): Extension of the inputs, e.g ``.dmg``.
+        suffix (str): Suffix replacing ``extension`` in the produced artifact.
+        skip_behaviors (iterable): Signing behaviors for which the artifact
+            isn't produced. ``None`` stands for no behavior (including an
+            empty behavior).
+    """
+    rules = EXTENSION_RULES.get(extension, ())
+    EXTENSION_RULES[extension] = rules + ((suffix, frozenset(skip_behaviors)),)
+    _clear_caches()
+
+
+def add_format_suffix(format, suffix):
+    """Register an artifact produced alongside inputs signed with ``format``.
+
+    Args:
+        format (str): The signing format, e.g ``gcp_prod_autograph_gpg``.
+        suffix (str): Suffix appended to the input, e.g ``.asc``.
+    """
+    FORMAT_SUFFIXES[format] = FORMAT_SUFFIXES.get(format, ()) + (suffix,)
+    _clear_caches()
+
+
+def _clear_caches():
+    _derive.cache_clear()
+    _derive_paths.cache_clear()
+
+
+def _format_key(formats):
+    # Only formats producing extra artifacts affect the result, ignoring the
+    # others improves cache hits.
+    return frozenset(f for f in formats if f in FORMAT_SUFFIXES)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _derive(input, formats, behavior):
+    for extension, rules in EXTENSION_RULES.items():
+        if input.endswith(extension):
+            base = input[: -len(extension)]
+            artifacts = {
+                base + suffix for suffix, skip in rules if behavior not in skip
+            }
+            break
+    else:
+        artifacts = {input}
+
+    for format in formats:
+        artifacts.update(input + suffix for suffix in FORMAT_SUFFIXES[format])
+
+    return frozenset(artifacts)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _derive_paths(paths, formats, behavior):
+    if len(paths) == 1:
+        return _derive(paths[0], formats, behavior)
+    return frozenset().union(*(_derive(p, formats, behavior) for p in paths))
+
 
 def get_signed_artifacts(input, formats, behavior=None):
     """
     Get the list of signed artifacts for the given input and formats.
     """
-    artifacts = set()
-    if input.endswith(".dmg"):
-        artifacts.add(input.replace(".dmg", ".tar.gz"))
-        if behavior and behavior != "mac_sign":
-            artifacts.add(input.replace(".dmg", ".pkg"))
-    else:
-        artifacts.add(input)
+    # A new set is returned as callers are free to modify it.
+    return set(_derive(input, _format_key(formats), behavior or None))
+
+
+def get_upstream_signed_artifacts(upstream_artifacts, behavior=None):
+    """
+    Get the signed artifacts for a whole ``upstream-artifacts`` list.
 
-    if "gcp_prod_autograph_gpg" in formats:
-        artifacts.add(f"{input}.asc")
+    Results are memoized per upstream artifact, so tasks signing the same
+    artifacts (or artifacts with the same paths) share the work.
 
+    Args:
+        upstream_artifacts (list): The ``upstream-artifacts`` of a signing
+            task, each with ``paths`` and ``formats`` keys.
+        behavior (str): The signing behavior, if any. An empty behavior is
+            the same as no behavior.
+
+    Returns:
+        set: The signed artifacts.
+    """
+    behavior = behavior or None
+    artifacts = set()
+    for upstream_artifact in upstream_artifacts:
+        artifacts.update(
+            _derive_paths(
+                tuple(upstream_artifact["paths"]),
+                _format_key(upstream_artifact["formats"]),
+                behavior,
+            )
+        )
     return artifacts
@@ -0,0 +1,106 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Cached resolution of worker implementations, shared by the transforms and
+payload builders of mozilla-taskgraph.
+"""
+
+from dataclasses import dataclass, field
+from weakref import WeakKeyDictionary
+
+from taskgraph.util import workertypes
+
+# Bypass the upstream cache (if any), which can't be invalidated.
+_resolve = getattr(
+    workertypes.worker_type_implementation,
+    "__wrapped__",
+    workertypes.worker_type_implementation,
+)
+
+
+@dataclass
+class WorkerImplementationCache:
+    """Resolved worker implementations for a graph config."""
+
+    # The worker aliases the implementations were resolved from. The cache is
+    # reset if the graph config's aliases are replaced.
+    aliases: dict
+    implementations: dict = field(default_factory=dict)
+    hits: int = 0
+    misses: int = 0
+
+
+_caches = WeakKeyDictionary()
+
+
+def _get_cache(graph_config):
+    aliases = graph_config["workers"]["aliases"]
+    cache = _caches.get(graph_config)
+    if cache is None or cache.aliases is not aliases:
+        cache = _caches[graph_config] = WorkerImplementationCache(aliases)
+    return cache
+
+
+def worker_type_implementation(graph_config, worker_type):
+    """Get the worker implementation and OS for the given worker type.
+
+    This is a cached version of
+    :func:`taskgraph.util.workertypes.worker_type_implementation`. Results are
+    cached per graph config, and discarded if its worker aliases change.
+
+    Args:
+        graph_config (GraphConfig): The graph config.
+        worker_type (str): The worker type (alias), e.g from a task's
+            ``worker-type`` key.
+
+    Returns:
+        tuple: The worker implementation and OS.
+    """
+    cache = _get_cache(graph_config)
+    if (result := cache.implementations.get(worker_type)) is not None:
+        cache.hits += 1
+        return result
+
+    cache.misses += 1
+    result = cache.implementations[worker_type] = _resolve(graph_config, worker_type)
+    return result
+
+
+def invalidate_worker_implementations(graph_config=None):
+    """Discard cached worker implementations.
+
+    This is only needed if the worker aliases of a graph config are modified
+    in place, as replacing them is detected automatically.
+
+    Args:
+        graph_config (GraphConfig): The graph config to discard cached
+            implementations for. Defaults to all graph configs.
+    """
+    if graph_config is None:
+        _caches.clear()
+    else:
+        _caches.pop(graph_config, None)
+
+
+def worker_implementation_stats(graph_config):
+    """Return statistics about the worker implementation cache.
+
+    Args:
+        graph_config (GraphConfig): The graph config.
+
+    Returns:
+        dict: The number of ``hits`` and ``misses``, the ``hit_rate`` and the
+            number of cached worker types (``size``).
+    """
+    cache = _caches.get(graph_config)
+    if cache is None:
+        return {"hits": 0, "misses": 0, "hit_rate": 0.0, "size": 0}
+
+    total = cache.hits + cache.misses
+    return {
+        "hits": cache.hits,
+        "misses": cache.misses,
+        "hit_rate": cache.hits / total if total else 0.0,
+        "size": len(cache.implementations),
+    }
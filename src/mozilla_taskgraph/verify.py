@@ -0,0 +1,99 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Verifications run against the generated task graphs.
+"""
+
+import json
+import logging
+
+from taskgraph.util.verify import verifications
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_OFFENDERS = 5
+
+
+def _json_size(obj):
+    return len(json.dumps(obj, separators=(",", ":"), default=str))
+
+
+def task_size_breakdown(task_def):
+    """Attribute the serialized size of a task definition to its parts.
+
+    Args:
+        task_def (dict): The task definition.
+
+    Returns:
+        dict: Mapping of part (``payload``, ``env``, ``artifacts``, ``scopes``,
+            ``routes`` and ``other``) to its size in bytes, along with the
+            ``total`` size of the task definition.
+    """
+    total = _json_size(task_def)
+    payload = task_def.get("payload", {})
+    sizes = {
+        "env": _json_size(payload["env"]) if "env" in payload else 0,
+        "artifacts": _json_size(payload["artifacts"]) if "artifacts" in payload else 0,
+        "scopes": _json_size(task_def.get("scopes", [])),
+        "routes": _json_size(task_def.get("routes", [])),
+    }
+    sizes["payload"] = _json_size(payload) - sizes["env"] - sizes["artifacts"]
+    sizes["other"] = total - sum(sizes.values())
+    sizes["total"] = total
+    return sizes
+
+
+def _format_offender(label, sizes):
+    parts = ", ".join(
+        f"{part}={size}"
+        for part, size in sorted(sizes.items(), key=lambda i: i[1], reverse=True)
+        if part != "total" and size
+    )
+    return f"  {label}: {sizes['total']} bytes ({parts})"
+
+
+@verifications.add("full_task_graph")
+def verify_task_size_budget(task, taskgraph, scratch_pad, graph_config, parameters):
+    """Check the serialized size of task definitions against a budget.
+
+    Only runs if ``task-size-budget`` is set in the graph config. Tasks over
+    the budget are reported grouped by worker implementation, largest first,
+    with their size broken down by part of the task definition.
+    """
+    budget = graph_config.get("task-size-budget")
+    if not budget:
+        return
+
+    if task is not None:
+        sizes = task_size_breakdown(task.task)
+        if sizes["total"] > budget["max-size"]:
+            impl = task.task.get("tags", {}).get("worker-implementation", "unknown")
+            scratch_pad.setdefault(impl, []).append((task.label, sizes))
+        return
+
+    if not scratch_pad:
+        return
+
+    top = budget.get("top") or DEFAULT_TOP_OFFENDERS
+    count = sum(len(offenders) for offenders in scratch_pad.values())
+    lines = [
+        f"{count} task definitions exceed the size budget of "
+        f"{budget['max-size']} bytes:"
+    ]
+    largest = {
+        impl: max(sizes["total"] for _, sizes in offenders)
+        for impl, offenders in scratch_pad.items()
+    }
+    for impl in sorted(largest, key=largest.get, reverse=True):
+        offenders = sorted(scratch_pad[impl], key=lambda o: o[1]["total"], reverse=True)
+        lines.append(f"{impl} ({len(offenders)} tasks):")
+        lines.extend(_format_offender(label, sizes) for label, sizes in offenders[:top])
+        if len(offenders) > top:
+            lines.append(f"  ... and {len(offenders) - top} more")
+
+    message = "\n".join(lines)
+    if budget.get("level", "error") == "warn":
+        logger.warning(message)
+    else:
+        raise Exception(message)
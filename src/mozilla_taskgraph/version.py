@@ -1,10 +1,95 @@
 import os
+import subprocess
+from functools import cache
 
 from taskgraph.util.vcs import get_repository
 
+VCS_DIRS = (".git", ".hg")
 
-def default_parser(params):
-    repo_root = get_repository(os.getcwd()).path
 
+def find_repo_root(path):
+    """Find the root of the repository containing ``path``.
+
+    The root is located by looking for a VCS directory in ``path`` and its
+    parents, so no VCS process needs to be spawned. The VCS is only queried
+    if no such directory is found.
+    """
+    path = os.path.abspath(path)
+    current = path
+    while True:
+        if any(os.path.exists(os.path.join(current, d)) for d in VCS_DIRS):
+            return current
+
+        parent = os.path.dirname(current)
+        if parent == current:
+            return get_repository(path).path
+        current = parent
+
+
+def read_files_at_revision(repo_root, revision, paths):
+    """Read the contents of files at a given revision of a Git repository.
+
+    All files are read with a single ``git cat-file --batch`` process.
+
+    Args:
+        repo_root (str): Path to the root of the repository.
+        revision (str): The revision to read the files at.
+        paths (list): Paths of the files, relative to ``repo_root``.
+
+    Returns:
+        dict: Mapping of path to contents, or ``None`` for missing files.
+    """
+    stdin = "".join(f"{revision}:{path}\n" for path in paths).encode()
+    out = subprocess.run(
+        ["git", "cat-file", "--batch"],
+        cwd=repo_root,
+        input=stdin,
+        capture_output=True,
+        check=True,
+    ).stdout
+
+    contents = {}
+    pos = 0
+    for path in paths:
+        end = out.index(b"\n", pos)
+        header = out[pos:end].split()
+        pos = end + 1
+        if header[-1] == b"missing":
+            contents[path] = None
+            continue
+
+        size = int(header[2])
+        contents[path] = out[pos : pos + size].decode()
+        # Skip the content and its trailing newline.
+        pos += size + 1
+    return contents
+
+
+@cache
+def _read_version(repo_root, revision):
+    # The working copy is expected to be at ``revision``, which is only part
+    # of the cache key so that a new revision invalidates the cached version.
     with open(os.path.join(repo_root, "version.txt")) as f:
         return f.read().strip()
+
+
+def default_parser(params):
+    repo_root = find_repo_root(os.getcwd())
+    return _read_version(repo_root, params.get("head_rev"))
+
+
+@cache
+def _read_version_at_revision(repo_root, revision):
+    version = read_files_at_revision(repo_root, revision, ["version.txt"])
+    if version["version.txt"] is None:
+        raise Exception(f"version.txt does not exist at revision {revision}!")
+    return version["version.txt"].strip()
+
+
+def revision_parser(params):
+    """Read ``version.txt`` at ``head_rev`` rather than from the working copy.
+
+    Only supported for Git repositories.
+    """
+    repo_root = find_repo_root(os.getcwd())
+    return _read_version_at_revision(repo_root, params["head_rev"])
@@ -1,10 +1,13 @@
+import pickle
 import sys
 from itertools import count
 
 import pytest
 import taskcluster_urls as liburl
+from taskgraph.generator import Kind, TaskGraphGenerator
 
-from mozilla_taskgraph.actions import enable_action
+from mozilla_taskgraph.actions import enable_action, release_promotion
+from mozilla_taskgraph.util.graph_snapshot import encode_snapshot
 
 from ..conftest import (
     make_graph,
@@ -24,10 +27,26 @@ def mock_version(session_mocker):
 
 
 @pytest.fixture
-def setup(responses, parameters):
+def add_artifact_info(responses):
     tc_url = liburl.test_root_url()
 
-    def inner(previous_graphs=None, parameter_overrides=None):
+    def inner(task_id, path, status=200, expires="3000-01-01T00:00:00.000Z"):
+        name = path.replace("/", "%2F")
+        responses.add(
+            method="GET",
+            url=f"{tc_url}/api/queue/v1/task/{task_id}/artifact-info/{name}",
+            json={"name": path, "expires": expires},
+            status=status,
+        )
+
+    return inner
+
+
+@pytest.fixture
+def setup(responses, parameters, add_artifact_info):
+    tc_url = liburl.test_root_url()
+
+    def inner(previous_graphs=None, parameter_overrides=None, snapshots=()):
         final_params = parameters.copy()
         if parameter_overrides:
             final_params.update(parameter_overrides)
@@ -52,6 +71,13 @@ def setup(responses, parameters):
                 json={"taskId": decision_id},
             )
 
+        # Preflight checks that every needed artifact exists.
+        first_id = list(previous_graphs.keys())[0]
+        add_artifact_info(first_id, "public/parameters.yml")
+        for decision_id in previous_graphs:
+            add_artifact_info(decision_id, "public/full-task-graph.json")
+            add_artifact_info(decision_id, "public/label-to-taskid.json")
+
         # Only the parameters from the first previous graph is downloaded.
         # get_artifact does a two-step fetch: getLatestArtifact returns
         # {"url": url}, then the content is fetched from that url.
@@ -61,9 +87,20 @@ def setup(responses, parameters):
 
         tid = count(0)
         for decision_id, full_task_graph in previous_graphs.items():
-            url = f"{tc_url}/api/queue/v1/task/{decision_id}/artifacts/public%2Ffull-task-graph.json"
-            responses.add(method="GET", url=url, json={"url": url})
-            responses.add(method="GET", url=url, json=full_task_graph.to_json())
+            url = f"{tc_url}/api/queue/v1/task/{decision_id}/artifacts/public%2Ffull-task-graph.msgpack"
+            if decision_id in snapshots:
+                responses.add(method="GET", url=url, json={"url": url})
+                responses.add(
+                    method="GET",
+                    url=url,
+                    body=encode_snapshot(full_task_graph.to_json()),
+                )
+            else:
+                responses.add(method="GET", url=url, status=404, json={})
+
+                url = f"{tc_url}/api/queue/v1/task/{decision_id}/artifacts/public%2Ffull-task-graph.json"
+                responses.add(method="GET", url=url, json={"url": url})
+                responses.add(method="GET", url=url, json=full_task_graph.to_json())
 
             label_to_taskid = {label: int(next(tid)) for label in full_task_graph.tasks}
             url = f"{tc_url}/api/queue/v1/task/{decision_id}/artifacts/public%2Flabel-to-taskid.json"
@@ -183,6 +220,38 @@ def test_release_promotion_combine_previous_graphs(
     assert_call(datadir, mock, expected_params)
 
 
+def test_release_promotion_snapshot(parameters, setup, run_action, datadir):
+    previous_graphs = {
+        "d0": make_graph(make_task("a"), make_task("b")),
+        "d1": make_graph(make_task("b"), make_task("c")),
+    }
+    setup(previous_graphs, snapshots=["d1"])
+    expected_params = parameters.copy()
+    expected_params.update(
+        {
+            "do_not_optimize": [],
+            "existing_tasks": {"a": 0, "b": 2, "c": 3},
+            "optimize_target_tasks": True,
+            "shipping_phase": "ship",
+            "target_tasks_method": "target_ship",
+            "tasks_for": "action",
+            "version": "1.0.0",
+        }
+    )
+
+    input = {
+        "build_number": "1",
+        "release_promotion_flavor": "ship",
+        "previous_graph_ids": ["d0", "d1"],
+        "version": "",
+    }
+    mock = run_action("release-promotion", parameters, input)
+    assert_call(datadir, mock, expected_params)
+    release_promotion.write_graph_snapshot.assert_called_once_with(
+        "full-task-graph.json"
+    )
+
+
 def test_release_promotion_rebuild_kinds(parameters, setup, run_action, datadir):
     previous_graphs = {
         "d0": make_graph(
@@ -240,3 +309,166 @@ def test_release_promotion_version(parameters, setup, run_action, datadir):
     }
     mock = run_action("release-promotion", parameters, input)
     assert_call(datadir, mock, expected_params)
+
+
+def test_release_promotion_reuse_kinds(mocker, parameters, setup, run_action):
+    setup()
+    m = mocker.patch.object(release_promotion, "reuse_previous_kinds")
+
+    input = {
+        "build_number": "1",
+        "release_promotion_flavor": "promote",
+        "reuse_kinds": ["foo"],
+        "version": "",
+    }
+    mock = run_action("release-promotion", parameters, input)
+    mock.assert_called_once()
+    m.assert_called_once()
+    full_task_graph, reuse_kinds, existing_tasks, do_not_optimize = m.call_args[0]
+    assert set(full_task_graph.tasks) == {"a", "b"}
+    assert reuse_kinds == ["foo"]
+    assert existing_tasks == {"a": 0, "b": 1}
+    assert do_not_optimize == []
+
+
+def test_reuse_previous_kinds(mocker):
+    orig = mocker.patch.object(TaskGraphGenerator, "_load_kinds", autospec=True)
+    orig.return_value = [
+        Kind(name, "", {}, None) for name in ("foo", "bar", "baz", "qux")
+    ]
+    mocker.patch.object(Kind, "load_tasks").return_value = ["regenerated"]
+
+    full_task_graph = make_graph(
+        make_task("a", kind="foo", task_id="abc"),
+        make_task("b", kind="foo"),
+        make_task("c", kind="bar"),
+        make_task("d", kind="baz"),
+        make_task("e", kind="qux"),
+    )
+    existing_tasks = {"a": "0", "b": "1", "c": "2", "d": "3", "e": "4"}
+
+    with release_promotion.reuse_previous_kinds(
+        full_task_graph, ["foo", "baz", "missing"], existing_tasks, ["d"]
+    ) as reused:
+        assert reused == {"foo"}
+        kinds = {k.name: k for k in TaskGraphGenerator._load_kinds(None, None)}
+
+    assert TaskGraphGenerator._load_kinds is orig
+    assert isinstance(kinds["foo"], release_promotion.ReusedKind)
+    for name in ("bar", "baz", "qux"):
+        assert not isinstance(kinds[name], release_promotion.ReusedKind)
+        assert kinds[name].load_tasks({}, {}, False) == ["regenerated"]
+
+    # Reused kinds can be sent to the parallel loader.
+    kind = pickle.loads(pickle.dumps(kinds["foo"]))
+    tasks = kind.load_tasks({}, {}, False)
+    assert [t.label for t in tasks] == ["a", "b"]
+    assert all(t.task_id is None for t in tasks)
+    # Reused tasks are copies, not the objects from the previous graph.
+    tasks = kinds["foo"].load_tasks({}, {}, False)
+    assert tasks[0] is not full_task_graph.tasks["a"]
+    assert tasks[0].task is not full_task_graph.tasks["a"].task
+
+
+def test_can_reuse_kinds():
+    # Fails if a taskgraph upgrade changed the internals reuse_kinds relies on.
+    assert release_promotion.can_reuse_kinds()
+
+
+def test_reuse_previous_kinds_unsupported(mocker, caplog):
+    def _load_kinds(self, graph_config, target_kinds, extra):
+        pass
+
+    mocker.patch.object(TaskGraphGenerator, "_load_kinds", _load_kinds)
+    full_task_graph = make_graph(make_task("a", kind="foo"))
+
+    with release_promotion.reuse_previous_kinds(
+        full_task_graph, ["foo"], {"a": "0"}
+    ) as reused:
+        assert reused == set()
+        assert TaskGraphGenerator._load_kinds is _load_kinds
+
+    assert "Not reusing any kind" in caplog.text
+
+
+def test_find_reusable_kinds_partial_coverage(caplog):
+    full_task_graph = make_graph(
+        make_task("a", kind="foo"),
+        make_task("b", kind="foo"),
+    )
+
+    reusable = release_promotion.find_reusable_kinds(
+        full_task_graph, ["foo"], {"a": "0"}, []
+    )
+    assert reusable == {}
+    assert "Not reusing kind foo: some tasks are not reused" in caplog.text
+
+
+def test_release_promotion_preflight(
+    mocker, responses, parameters, run_action, add_artifact_info
+):
+    get_artifact = mocker.patch.object(release_promotion, "get_artifact")
+    add_artifact_info("d0", "public/parameters.yml")
+    add_artifact_info("d0", "public/full-task-graph.json")
+    add_artifact_info("d0", "public/label-to-taskid.json")
+    add_artifact_info("d1", "public/full-task-graph.json", status=404)
+    add_artifact_info("d1", "public/label-to-taskid.json", status=404)
+    add_artifact_info(
+        "d2", "public/full-task-graph.json", expires="2000-01-01T00:00:00.000Z"
+    )
+    add_artifact_info("d2", "public/label-to-taskid.json")
+
+    input = {
+        "build_number": "1",
+        "release_promotion_flavor": "bogus",
+        "previous_graph_ids": ["d0", "d1", "d2"],
+        "version": "",
+    }
+    with pytest.raises(Exception) as excinfo:
+        run_action("release-promotion", parameters, input)
+
+    message = str(excinfo.value)
+    assert "Unknown release promotion flavor 'bogus'" in message
+    assert (
+        "d1 is missing public/full-task-graph.json; is it a decision or action task?"
+        in message
+    )
+    assert "d1 is missing public/label-to-taskid.json" in message
+    assert "public/full-task-graph.json from d2 expired" in message
+    assert "d0" not in message
+    # Nothing was downloaded.
+    get_artifact.assert_not_called()
+
+
+def test_release_promotion_existing_tasks_artifact(
+    parameters, setup, run_action, datadir, make_graph_config
+):
+    # The previous parameters referencing their own out of line
+    # existing_tasks must not leak into the new parameters.
+    setup(parameter_overrides={"existing_tasks_artifact": "public/foo.json.gz"})
+    expected_params = parameters.copy()
+    expected_params.update(
+        {
+            "build_number": 1,
+            "do_not_optimize": [],
+            "existing_tasks": {"a": 0, "b": 1},
+            "optimize_target_tasks": True,
+            "shipping_phase": "promote",
+            "target_tasks_method": "target_promote",
+            "tasks_for": "action",
+            "version": "1.0.0",
+        }
+    )
+
+    graph_config = make_graph_config(
+        extra_config={
+            "release-promotion": {
+                "existing-tasks-artifact": True,
+                "flavors": {"promote": {"target-tasks-method": "target_promote"}},
+            }
+        }
+    )
+    input = {"build_number": "1", "release_promotion_flavor": "promote", "version": ""}
+    mock = run_action("release-promotion", parameters, input, graph_config)
+    assert_call(datadir, mock, expected_params)
+    release_promotion.write_existing_tasks_artifact.assert_called_once_with()
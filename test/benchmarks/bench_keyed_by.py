@@ -0,0 +1,96 @@
+"""
+Benchmark resolving keyed-by fields shared by many tasks, as in the
+mark_as_shipped transforms.
+
+Tasks are produced by taskgraph's transform loader, which gives every task its
+own deep copy of the ``task-defaults``, as in a real kind.
+
+This isn't collected by pytest, run it with:
+
+    python test/benchmarks/bench_keyed_by.py
+"""
+
+import timeit
+
+from taskgraph.loader.transform import loader
+from taskgraph.util.schema import resolve_keyed_by
+
+from mozilla_taskgraph.util.keyed_by import KeyedByResolver
+
+NUMBER = 5000
+
+# Regular expression alternatives, nested by project, as commonly found in
+# kinds with many platforms.
+SHIPIT_PRODUCT = {
+    "by-build-type": {
+        f"{platform}.*-{build_type}": {
+            "by-project": {
+                "main": f"product-{platform}-{build_type}",
+                "release": f"product-{platform}",
+                "default": "product-dev",
+            }
+        }
+        for platform in ("linux", "mac", "win", "android")
+        for build_type in ("release", "beta", "nightly")
+    }
+    | {"default": "product"}
+}
+
+
+KIND_CONFIG = {
+    "task-defaults": {
+        "project": "main",
+        "description": "Mark the release as shipped",
+        "worker": {"implementation": "scriptworker-shipit"},
+        "shipit-product": SHIPIT_PRODUCT,
+        # Keys commonly found in task definitions at this stage.
+        **{f"key-{j}": {"foo": "bar"} for j in range(20)},
+    },
+    "tasks": {
+        f"task-{i}": {"attributes": {"build-type": f"win{(32, 64)[i % 2]}-release"}}
+        for i in range(NUMBER)
+    },
+}
+
+
+def make_tasks():
+    return list(loader("mark-as-shipped", "", KIND_CONFIG, {}, [], False))
+
+
+def upstream(tasks):
+    for task in tasks:
+        resolve_keyed_by(
+            task,
+            "shipit-product",
+            item_name=task["name"],
+            **{"build-type": task["attributes"]["build-type"]},
+        )
+
+
+def memoized(tasks):
+    resolver = KeyedByResolver()
+    for task in tasks:
+        resolver.resolve_keyed_by(
+            task,
+            "shipit-product",
+            item_name=task["name"],
+            **{"build-type": task["attributes"]["build-type"]},
+        )
+
+
+def main():
+    for func in (upstream, memoized):
+        elapsed = min(
+            timeit.repeat(
+                "func(tasks)",
+                setup="tasks = make_tasks()",
+                number=1,
+                repeat=5,
+                globals={"func": func, "make_tasks": make_tasks},
+            )
+        )
+        print(f"{func.__name__:<10} {elapsed / NUMBER * 1e6:8.2f} µs/task")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmarks for the scriptworker payload builders.
+
+These aren't collected by pytest, run them with:
+
+    python test/benchmarks/bench_payload_builders.py
+"""
+
+import timeit
+from copy import deepcopy
+from pathlib import Path
+
+from taskgraph.config import load_graph_config
+from taskgraph.transforms.base import GraphConfig, TransformConfig
+from taskgraph.transforms.task import payload_builders
+
+import mozilla_taskgraph.worker_types  # noqa - trigger payload_builder registration
+
+here = Path(__file__).parent
+NUMBER = 2000
+
+PARAMETERS = {
+    "app_version": "99.0",
+    "base_ref": "refs/heads/main",
+    "base_repository": "http://example.com/base/repo",
+    "build_number": 1,
+    "head_repository": "http://example.com/head/repo",
+    "head_rev": "abcdef",
+    "head_ref": "refs/heads/main",
+    "head_tag": "",
+    "next_version": "100.0",
+    "owner": "some-owner",
+    "tasks_for": "github-push",
+    "version": "99.0",
+}
+
+VERSION_FILES = [
+    {"filename": f"file{i}.txt", "version-bump": "major", "new-suffix": "a1"}
+    for i in range(20)
+]
+L10N_BUMP_INFO = [
+    {
+        "name": f"l10n-{i}",
+        "path": f"l10n-{i}.json",
+        "l10n-repo-url": "https://example.com/l10n",
+        "l10n-repo-target-branch": "main",
+        "platform-configs": [{"platforms": ["linux", "win"], "path": "locales"}],
+    }
+    for i in range(10)
+]
+
+WORKERS = {
+    "scriptworker-lando": {
+        "lando-repo": "main",
+        "matrix-rooms": ["!room"],
+        "actions": [
+            {"l10n-bump": L10N_BUMP_INFO},
+            {"version-bump": {"bump-files": ["version.txt"]}},
+            {
+                "uplift": {
+                    "fetch-version-from": "version.txt",
+                    "version-files": VERSION_FILES,
+                    "from-branch": "main",
+                    "to-branch": "beta",
+                    "replacements": [["a", "b"]] * 10,
+                    "l10n-bump-info": L10N_BUMP_INFO,
+                }
+            },
+        ],
+    },
+    "scriptworker-signing": {
+        "signing-type": "release-signing",
+        "upstream-artifacts": [
+            {
+                "taskId": {"task-reference": f"<build-{i}>"},
+                "taskType": "build",
+                "paths": [f"public/build/{i}/target.tar.gz", f"public/build/{i}.zip"],
+                "formats": ["gcp_prod_autograph_gpg", "autograph_authenticode"],
+            }
+            for i in range(20)
+        ],
+    },
+    "scriptworker-bitrise": {
+        "bitrise": {
+            "app": "app",
+            "workflows": [
+                {
+                    f"workflow-{i}": [
+                        {"FOO": "1", "BAR": str(j)},
+                        {"FOO": "1", "BAR": str(j + 1)},
+                    ]
+                }
+                for i in range(10)
+                for j in range(2)
+            ],
+        }
+    },
+}
+
+
+def make_config():
+    root_dir = here.parent / "data" / "taskcluster"
+    config = load_graph_config(str(root_dir))._config.copy()
+    config["scriptworker"] = {"scope-prefix": "project:releng"}
+    graph_config = GraphConfig(config, str(root_dir))
+    return TransformConfig(
+        "bench", str(here), {}, PARAMETERS, {}, graph_config, write_artifacts=False
+    )
+
+
+def bench(config, name, worker):
+    builder = payload_builders[name].builder
+    worker = dict(worker, implementation=name)
+    tasks = [
+        {"label": f"{name}-{i}", "shipping-product": "product", "worker": worker}
+        for i in range(NUMBER)
+    ]
+    task_defs = [{"tags": {}} for _ in range(NUMBER)]
+
+    def run():
+        for task, task_def in zip(tasks, task_defs):
+            builder(config, task, deepcopy(task_def))
+
+    elapsed = min(timeit.repeat(run, number=1, repeat=5))
+    print(f"{name:<25} {elapsed / NUMBER * 1e6:8.1f} µs/task")
+
+
+def main():
+    config = make_config()
+    for name, worker in WORKERS.items():
+        bench(config, name, worker)
+
+
+if __name__ == "__main__":
+    main()
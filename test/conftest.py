@@ -151,6 +151,8 @@ def run_action(mocker, monkeypatch, graph_config):
     def inner(name, parameters, input, graph_config=None):
         m = mocker.patch.object(release_promotion, "taskgraph_decision")
         m.return_value = lambda *args, **kwargs: (args, kwargs)
+        mocker.patch.object(release_promotion, "write_graph_snapshot")
+        mocker.patch.object(release_promotion, "write_existing_tasks_artifact")
 
         gc_mock = None
         if graph_config:
@@ -0,0 +1,98 @@
+import pytest
+from taskgraph import config as tg
+from voluptuous import Schema as VolSchema
+
+from mozilla_taskgraph import config
+
+
+@pytest.fixture
+def validate(monkeypatch):
+    calls = []
+    orig = tg.validate_graph_config
+
+    def inner(cfg):
+        calls.append(cfg)
+        orig(cfg)
+
+    monkeypatch.setattr(tg, "validate_graph_config", inner)
+    monkeypatch.setattr(config, "_validated", set())
+    monkeypatch.delenv(config.VALIDATION_CACHE_ENV, raising=False)
+    return calls
+
+
+def test_validate_graph_config_cached(graph_config, validate):
+    cfg = dict(graph_config._config)
+    config.validate_graph_config(cfg)
+    config.validate_graph_config(dict(cfg))
+    assert len(validate) == 1
+
+    # Changing the config revalidates it.
+    cfg["collapse-scopes"] = True
+    config.validate_graph_config(cfg)
+    assert len(validate) == 2
+
+
+def test_validate_graph_config_non_str_keys(graph_config, validate):
+    cfg = dict(graph_config._config)
+    cfg["workers"] = {
+        "aliases": {
+            "b-linux": {
+                # Unquoted YAML keys, e.g ``by-level: {3: ...}``.
+                "provisioner": {"by-level": {3: "taskgraph-b", "default": "t"}},
+                "implementation": "generic-worker",
+                "os": "linux",
+                "worker-type": "linux",
+            }
+        }
+    }
+    config.validate_graph_config(cfg)
+    config.validate_graph_config(cfg)
+    assert len(validate) == 1
+
+    # Str keys are a different config.
+    cfg["workers"]["aliases"]["b-linux"]["provisioner"] = {
+        "by-level": {"3": "taskgraph-b", "default": "t"}
+    }
+    config.validate_graph_config(cfg)
+    assert len(validate) == 2
+
+
+def test_validate_graph_config_invalid_not_cached(graph_config, validate):
+    cfg = dict(graph_config._config, **{"collapse-scopes": "yes"})
+    for _ in range(2):
+        with pytest.raises(Exception):
+            config.validate_graph_config(cfg)
+    assert len(validate) == 2
+
+
+def test_validate_graph_config_disk_cache(
+    monkeypatch, tmp_path, graph_config, validate
+):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv(config.VALIDATION_CACHE_ENV, str(cache_dir))
+    cfg = graph_config._config
+    config.validate_graph_config(cfg)
+    assert len(validate) == 1
+    assert len(list(cache_dir.iterdir())) == 1
+
+    # A new process reuses the validation recorded on disk.
+    monkeypatch.setattr(config, "_validated", set())
+    config.validate_graph_config(cfg)
+    assert len(validate) == 1
+
+
+def test_validate_graph_config_disk_cache_schema():
+    base = VolSchema({"trust-domain": str})
+    extended = VolSchema({"trust-domain": str, "foo": int})
+    # Schemas that are the same class, but with different contents, don't
+    # share validations recorded on disk.
+    assert type(base) is type(extended)
+    assert config._disk_digest(base, "d") != config._disk_digest(extended, "d")
+    assert config._disk_digest(base, "d") == config._disk_digest(
+        VolSchema({"trust-domain": str}), "d"
+    )
+
+    schema = config.get_graph_config_schema()
+    assert config._disk_digest(schema, "d") != config._disk_digest(
+        tg.graph_config_schema.__mro__[1], "d"
+    )
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+# Budget for the time spent in mozilla_taskgraph's own modules when importing
+# the package and its graph config extension, in microseconds. This excludes
+# dependencies such as taskgraph, and is generous to avoid flakiness.
+IMPORT_TIME_BUDGET = 50_000
+
+
+def test_import_time():
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import mozilla_taskgraph.config as c; "
+            "print(c.get_graph_config_schema.cache_info().currsize)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # The graph config schema is only built on first validation.
+    assert proc.stdout.strip() == "0"
+
+    self_times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        self_times[name.strip()] = int(self_us)
+
+    assert "mozilla_taskgraph.config" in self_times
+    own = sum(
+        t for name, t in self_times.items() if name.startswith("mozilla_taskgraph")
+    )
+    assert own < IMPORT_TIME_BUDGET
@@ -0,0 +1,80 @@
+import logging
+
+import pytest
+from taskgraph.graph import Graph
+from taskgraph.task import Task
+from taskgraph.taskgraph import TaskGraph
+
+from mozilla_taskgraph.morph import intern_scopes, minimize_scopes
+
+
+@pytest.mark.parametrize(
+    "scopes,expected",
+    (
+        pytest.param(["b", "a"], ["a", "b"], id="no_wildcard"),
+        pytest.param(
+            ["foo:bar", "foo:*", "foo:baz:qux", "foobar", "fo"],
+            ["fo", "foo:*", "foobar"],
+            id="wildcard",
+        ),
+        pytest.param(["foo*", "foo:*", "foo:bar"], ["foo*"], id="nested_wildcards"),
+        pytest.param(["*", "foo", "bar"], ["*"], id="star"),
+    ),
+)
+def test_minimize_scopes(scopes, expected):
+    assert minimize_scopes(scopes) == expected
+
+
+@pytest.fixture
+def make_taskgraph():
+    def inner(scopes):
+        tasks = {}
+        for i, s in enumerate(scopes):
+            label = f"task-{i}"
+            tasks[label] = Task(
+                kind="test",
+                label=label,
+                attributes={},
+                task={"scopes": list(s)},
+            )
+        return TaskGraph(tasks, Graph(set(tasks), set()))
+
+    return inner
+
+
+@pytest.mark.parametrize("collapse", (False, True))
+def test_intern_scopes(caplog, make_taskgraph, make_graph_config, collapse):
+    caplog.set_level(logging.INFO)
+    scopes = [
+        ["foo:*", "foo:bar", "baz"],
+        ["foo:*", "foo:bar", "baz"],
+        ["qux"],
+        [],
+    ]
+    taskgraph = make_taskgraph(scopes)
+    graph_config = make_graph_config(extra_config={"collapse-scopes": collapse})
+
+    result, label_to_taskid = intern_scopes(taskgraph, {}, {}, graph_config)
+    assert result is taskgraph
+
+    tasks = result.tasks
+    if collapse:
+        assert tasks["task-0"].task["scopes"] == ["baz", "foo:*"]
+        # 2 tasks, each saving `"foo:bar", `
+        assert "saved 22 bytes" in caplog.text
+    else:
+        assert tasks["task-0"].task["scopes"] == scopes[0]
+        assert "saved" not in caplog.text
+
+    # Scope strings are shared, but each task has its own list.
+    assert tasks["task-0"].task["scopes"] == tasks["task-1"].task["scopes"]
+    assert tasks["task-0"].task["scopes"] is not tasks["task-1"].task["scopes"]
+    assert all(
+        a is b
+        for a, b in zip(tasks["task-0"].task["scopes"], tasks["task-1"].task["scopes"])
+    )
+    tasks["task-0"].task["scopes"].append("new")
+    assert "new" not in tasks["task-1"].task["scopes"]
+    assert tasks["task-2"].task["scopes"] == ["qux"]
+    assert tasks["task-3"].task["scopes"] == []
+    assert "3 tasks into 2 distinct scope sets" in caplog.text
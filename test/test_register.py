@@ -1,9 +1,12 @@
 from contextlib import nullcontext as does_not_raise
 
 import pytest
+from taskgraph.parameters import ParameterMismatch, Parameters
 from taskgraph.transforms.task import payload_builders
 
+from mozilla_taskgraph import payload_builders as pb
 from mozilla_taskgraph import register
+from mozilla_taskgraph.util.existing_tasks import EXISTING_TASKS_PLACEHOLDER
 
 
 def test_payload_builders(graph_config):
@@ -27,6 +30,26 @@ def test_payload_builders(graph_config):
             does_not_raise(),
             id="shipit_valid",
         ),
+        pytest.param(
+            {"collapse-scopes": True},
+            does_not_raise(),
+            id="collapse_scopes_valid",
+        ),
+        pytest.param(
+            {"task-size-budget": {"max-size": 1000, "level": "warn"}},
+            does_not_raise(),
+            id="task_size_budget_valid",
+        ),
+        pytest.param(
+            {"task-size-budget": {"max-size": 1000, "level": "fatal"}},
+            pytest.raises(Exception),
+            id="task_size_budget_invalid",
+        ),
+        pytest.param(
+            {"lazy-payload-builders": True},
+            does_not_raise(),
+            id="lazy_payload_builders_valid",
+        ),
     ),
 )
 def test_graph_config(make_graph_config, extra_config, expectation):
@@ -34,3 +57,100 @@ def test_graph_config(make_graph_config, extra_config, expectation):
     graph_config = make_graph_config(extra_config=extra_config)
     with expectation:
         register(graph_config)
+
+
+def test_parameters(graph_config):
+    register(graph_config)
+    params = Parameters(
+        strict=True,
+        existing_tasks={},
+        existing_tasks_artifact="public/existing-tasks.json.gz",
+        **{k: v for k, v in Parameters(strict=False).items() if k != "existing_tasks"},
+    )
+    params.check()
+
+    # Parameters referencing an out of line ``existing_tasks`` only contain a
+    # placeholder, so consumers unaware of the artifact fail loudly, even when
+    # loading parameters non-strictly.
+    for strict in (True, False):
+        params = Parameters(
+            strict=strict,
+            existing_tasks=EXISTING_TASKS_PLACEHOLDER,
+            existing_tasks_artifact="public/existing-tasks.json.gz",
+            **{
+                k: v
+                for k, v in Parameters(strict=False).items()
+                if k != "existing_tasks"
+            },
+        )
+        with pytest.raises(ParameterMismatch, match="existing_tasks"):
+            params.check()
+
+
+def test_referenced_implementations(make_graph_config):
+    graph_config = make_graph_config(
+        extra_config={
+            "workers": {
+                "aliases": {
+                    "signing": {
+                        "provisioner": "scriptworker-k8s",
+                        "implementation": "scriptworker-signing",
+                        "os": "scriptworker",
+                        "worker-type": "signing",
+                    },
+                    "lando": {
+                        "provisioner": "scriptworker-k8s",
+                        "implementation": {
+                            "by-level": {
+                                "3": "scriptworker-lando",
+                                "default": "generic-worker",
+                            }
+                        },
+                        "os": "scriptworker",
+                        "worker-type": "lando",
+                    },
+                }
+            }
+        }
+    )
+    assert pb.referenced_implementations(graph_config) == {
+        "scriptworker-signing",
+        "scriptworker-lando",
+        "generic-worker",
+    }
+
+
+@pytest.fixture
+def imported_payload_builders(monkeypatch):
+    imported = []
+    monkeypatch.setattr(
+        pb, "import_module", lambda name, package: imported.append(name[1:])
+    )
+    return imported
+
+
+def test_register_payload_builders(imported_payload_builders):
+    pb.register_payload_builders(["scriptworker-signing", "docker-worker"])
+    assert imported_payload_builders == ["signing"]
+
+    imported_payload_builders.clear()
+    pb.register_payload_builders()
+    assert sorted(imported_payload_builders) == sorted(
+        pb.PAYLOAD_BUILDER_MODULES.values()
+    )
+
+
+def test_register_lazy_payload_builders(make_graph_config, imported_payload_builders):
+    graph_config = make_graph_config(extra_config={"lazy-payload-builders": True})
+    graph_config._config["workers"] = {
+        "aliases": {
+            "signing": {
+                "provisioner": "scriptworker-k8s",
+                "implementation": "scriptworker-signing",
+                "os": "scriptworker",
+                "worker-type": "signing",
+            },
+        }
+    }
+    register(graph_config)
+    assert imported_payload_builders == ["signing"]
@@ -0,0 +1,108 @@
+import logging
+
+import pytest
+from taskgraph.graph import Graph
+from taskgraph.task import Task
+from taskgraph.taskgraph import TaskGraph
+
+from mozilla_taskgraph.verify import task_size_breakdown, verify_task_size_budget
+
+
+def make_task_def(impl, env_size=0, scopes=()):
+    return {
+        "tags": {"worker-implementation": impl},
+        "scopes": list(scopes),
+        "routes": ["index.foo"],
+        "payload": {
+            "command": ["run"],
+            "env": {"FOO": "x" * env_size},
+            "artifacts": [{"name": "public/build"}],
+        },
+    }
+
+
+def run_verification(graph_config, task_defs):
+    tasks = {
+        label: Task(kind="test", label=label, attributes={}, task=task_def)
+        for label, task_def in task_defs.items()
+    }
+    graph = TaskGraph(tasks, Graph(set(tasks), set()))
+    scratch_pad = {}
+    for task in graph.tasks.values():
+        verify_task_size_budget(task, graph, scratch_pad, graph_config, {})
+    verify_task_size_budget(None, graph, scratch_pad, graph_config, {})
+
+
+def test_task_size_breakdown():
+    task_def = make_task_def("docker-worker", env_size=10, scopes=["foo:bar"])
+    sizes = task_size_breakdown(task_def)
+    assert sizes == {
+        "env": 20,
+        "artifacts": 25,
+        "scopes": 11,
+        "routes": 13,
+        "payload": 39,
+        "other": 81,
+        "total": 189,
+    }
+
+
+@pytest.fixture
+def task_defs():
+    return {
+        "small": make_task_def("docker-worker"),
+        "big-docker-1": make_task_def("docker-worker", env_size=1000),
+        "big-docker-2": make_task_def("docker-worker", env_size=2000),
+        "big-docker-3": make_task_def("docker-worker", env_size=1500),
+        "big-scriptworker": make_task_def(
+            "scriptworker", scopes=[f"scope:{i}" for i in range(500)]
+        ),
+    }
+
+
+def test_verify_task_size_budget_disabled(graph_config, task_defs):
+    run_verification(graph_config, task_defs)
+
+
+def test_verify_task_size_budget_error(make_graph_config, task_defs):
+    graph_config = make_graph_config(
+        extra_config={"task-size-budget": {"max-size": 1000, "top": 2}}
+    )
+    with pytest.raises(Exception) as e:
+        run_verification(graph_config, task_defs)
+
+    lines = str(e.value).splitlines()
+    print("\n".join(lines))
+    assert lines[0] == "4 task definitions exceed the size budget of 1000 bytes:"
+    assert lines[1] == "scriptworker (1 tasks):"
+    assert lines[2].startswith("  big-scriptworker: ")
+    assert "(scopes=" in lines[2]
+    assert lines[3] == "docker-worker (3 tasks):"
+    assert lines[4].startswith("  big-docker-2: ")
+    assert "(env=2" in lines[4]
+    assert lines[5].startswith("  big-docker-3: ")
+    assert lines[6] == "  ... and 1 more"
+    assert len(lines) == 7
+
+
+def test_verify_task_size_budget_warn(caplog, make_graph_config, task_defs):
+    graph_config = make_graph_config(
+        extra_config={"task-size-budget": {"max-size": 2100, "level": "warn"}}
+    )
+    with caplog.at_level(logging.WARNING):
+        run_verification(graph_config, task_defs)
+
+    assert "2 task definitions exceed the size budget" in caplog.text
+    assert "big-docker-2" in caplog.text
+    assert "big-docker-3" not in caplog.text
+
+
+def test_verify_task_size_budget_top_null(make_graph_config, task_defs):
+    graph_config = make_graph_config(
+        extra_config={"task-size-budget": {"max-size": 1000, "top": None}}
+    )
+    with pytest.raises(Exception) as e:
+        run_verification(graph_config, task_defs)
+
+    assert "4 task definitions exceed the size budget" in str(e.value)
+    assert "... and" not in str(e.value)
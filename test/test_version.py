@@ -1,6 +1,42 @@
+import subprocess
 from unittest.mock import mock_open, patch
 
-from mozilla_taskgraph.version import default_parser
+import pytest
+
+from mozilla_taskgraph import version
+from mozilla_taskgraph.version import (
+    default_parser,
+    find_repo_root,
+    read_files_at_revision,
+    revision_parser,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    version._read_version.cache_clear()
+    version._read_version_at_revision.cache_clear()
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], cwd=tmp_path, check=True, capture_output=True, text=True
+        ).stdout.strip()
+
+    git("init", "-q")
+    git("config", "user.email", "test@example.com")
+    git("config", "user.name", "Test")
+    (tmp_path / "version.txt").write_text("1.0.0\n")
+    (tmp_path / "other.txt").write_text("other\n")
+    git("add", ".")
+    git("commit", "-q", "-m", "first")
+    first = git("rev-parse", "HEAD")
+    (tmp_path / "version.txt").write_text("2.0.0\n")
+    git("commit", "-q", "-am", "second")
+    second = git("rev-parse", "HEAD")
+    return tmp_path, first, second
 
 
 def test_default_parser(repo_root):
@@ -9,3 +45,55 @@ def test_default_parser(repo_root):
     with patch("mozilla_taskgraph.version.open", mock_open(read_data=version)) as m:
         assert default_parser({}) == version
         m.assert_called_with(str(repo_root / "version.txt"))
+
+
+def test_default_parser_cached():
+    with patch("mozilla_taskgraph.version.open", mock_open(read_data="1.0")) as m:
+        assert default_parser({"head_rev": "abc"}) == "1.0"
+        assert default_parser({"head_rev": "abc"}) == "1.0"
+        assert m.call_count == 1
+
+        assert default_parser({"head_rev": "def"}) == "1.0"
+        assert m.call_count == 2
+
+
+def test_find_repo_root(mocker, tmp_path):
+    get_repository = mocker.patch.object(version, "get_repository")
+    (tmp_path / ".hg").mkdir()
+    subdir = tmp_path / "a" / "b"
+    subdir.mkdir(parents=True)
+
+    assert find_repo_root(str(subdir)) == str(tmp_path)
+    get_repository.assert_not_called()
+
+
+def test_find_repo_root_fallback(mocker):
+    get_repository = mocker.patch.object(version, "get_repository")
+    get_repository.return_value.path = "/some/repo"
+    mocker.patch.object(version.os.path, "exists", return_value=False)
+
+    assert find_repo_root("/foo/bar") == "/some/repo"
+    get_repository.assert_called_once_with("/foo/bar")
+
+
+def test_read_files_at_revision(git_repo):
+    path, first, second = git_repo
+    result = read_files_at_revision(
+        str(path), first, ["version.txt", "missing.txt", "other.txt"]
+    )
+    assert result == {
+        "version.txt": "1.0.0\n",
+        "missing.txt": None,
+        "other.txt": "other\n",
+    }
+    assert read_files_at_revision(str(path), second, ["version.txt"]) == {
+        "version.txt": "2.0.0\n"
+    }
+
+
+def test_revision_parser(monkeypatch, git_repo):
+    path, first, second = git_repo
+    monkeypatch.chdir(path)
+
+    assert revision_parser({"head_rev": first}) == "1.0.0"
+    assert revision_parser({"head_rev": second}) == "2.0.0"
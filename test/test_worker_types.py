@@ -1,15 +1,28 @@
+import base64
+import binascii
+import gzip
 import inspect
 import json
 from pprint import pprint
 from typing import Optional
 
 import pytest
+from taskgraph.task import Task
 from taskgraph.transforms.base import TransformConfig
 from taskgraph.transforms.task import payload_builders
 from taskgraph.util.schema import validate_schema
 
 import mozilla_taskgraph.worker_types  # noqa - trigger payload_builder registration
-from mozilla_taskgraph.worker_types import get_release_config
+from mozilla_taskgraph.payload_builders.beetmover_data import is_base64
+from mozilla_taskgraph.payload_builders.bitrise import (
+    expand_bitrise_workflows,
+    get_bitrise_context,
+)
+from mozilla_taskgraph.payload_builders.lando import UpliftConfig
+from mozilla_taskgraph.util import release_config
+from mozilla_taskgraph.util.payload import to_payload
+from mozilla_taskgraph.util.release_artifacts import get_release_artifacts_index
+from mozilla_taskgraph.util.release_config import get_release_config
 
 
 @pytest.fixture
@@ -110,6 +123,36 @@ def test_bitrise_default_params(build_payload):
     }
 
 
+def test_bitrise_context_shared(make_graph_config, make_transform_config):
+    graph_config = make_graph_config(
+        extra_config={"scriptworker": {"scope-prefix": "foo"}},
+    )
+    config = make_transform_config(graph_cfg=graph_config)
+    builder = payload_builders["scriptworker-bitrise"].builder
+
+    task_defs = []
+    for app in ("app-a", "app-b"):
+        task = {"worker": {"bitrise": {"app": app, "workflows": ["bar"]}}}
+        task_def = {"tags": {}}
+        builder(config, task, task_def)
+        task_defs.append(task_def)
+
+    context = get_bitrise_context(config)
+    assert get_bitrise_context(config) is context
+    assert context.scope_prefix == "foo"
+    # Each payload gets its own copy of the shared global params.
+    assert task_defs[0]["payload"]["global_params"] == context.global_params
+    assert (
+        task_defs[0]["payload"]["global_params"]
+        is not task_defs[1]["payload"]["global_params"]
+    )
+    assert task_defs[1]["scopes"][0] == "foo:bitrise:app:app-b"
+
+    # A different config gets its own context.
+    other = make_transform_config(graph_cfg=graph_config)
+    assert get_bitrise_context(other) is not context
+
+
 def test_bitrise_pull_request(build_payload):
     assert build_payload(
         "scriptworker-bitrise",
@@ -304,6 +347,39 @@ def test_bitrise_environments(build_payload):
     }
 
 
+def test_expand_bitrise_workflows():
+    envs = {"FOO": "bar", "PATH": {"artifact-reference": "<build/target.zip>"}}
+    workflows = [
+        "foo",
+        {"bar": [envs, {"FOO": "baz"}, dict(reversed(envs.items()))]},
+        {"bar": [envs], "baz": [envs]},
+    ]
+    environments = {}
+    workflow_ids, permutations = expand_bitrise_workflows(workflows, environments)
+    assert workflow_ids == ["bar", "baz", "foo"]
+    expected = {
+        "environments": [
+            {"mapped_to": "FOO", "value": "bar"},
+            {
+                "mapped_to": "PATH",
+                "value": {"artifact-reference": "<build/target.zip>"},
+            },
+        ]
+    }
+    # Duplicates within a workflow are removed.
+    assert permutations == {
+        "bar": [expected, {"environments": [{"mapped_to": "FOO", "value": "baz"}]}],
+        "baz": [expected],
+    }
+    # Identical permutations are shared.
+    assert permutations["bar"][0] is permutations["baz"][0]
+    assert len(environments) == 2
+
+    # As well as across calls using the same cache.
+    _, other = expand_bitrise_workflows([{"qux": [envs]}], environments)
+    assert other["qux"][0] is permutations["bar"][0]
+
+
 def test_bitrise_artifact_prefix(build_payload):
     assert build_payload(
         "scriptworker-bitrise",
@@ -395,6 +471,42 @@ def test_build_signing_payload_basic(build_payload):
     }
 
 
+def test_build_signing_payload_release_artifacts_index(
+    make_graph_config, make_transform_config
+):
+    graph_config = make_graph_config(
+        extra_config={"scriptworker": {"scope-prefix": "foo"}},
+    )
+    config = make_transform_config(graph_cfg=graph_config)
+    task = {
+        "label": "signing-linux",
+        "worker": {
+            "signing-type": "release",
+            "upstream-artifacts": [
+                {
+                    "taskId": "abc",
+                    "taskType": "build",
+                    "paths": ["public/build/target.tar.gz"],
+                    "formats": ["gcp_prod_autograph_gpg"],
+                }
+            ],
+        },
+    }
+    payload_builders["scriptworker-signing"].builder(config, task, {})
+
+    # Downstream kinds index the attribute set by the payload builder.
+    dep = Task(
+        kind="signing", label=task["label"], attributes=task["attributes"], task={}
+    )
+    config = make_transform_config(kind_dependencies_tasks={dep.label: dep})
+    index = get_release_artifacts_index(config)
+    assert index.artifacts("signing-linux") == (
+        "public/build/target.tar.gz",
+        "public/build/target.tar.gz.asc",
+    )
+    assert index.producer("public/build/target.tar.gz.asc") == "signing-linux"
+
+
 def test_build_signing_payload_dmg(build_payload):
     worker = {
         "max-run-time": 3600,
@@ -1483,6 +1595,58 @@ def test_beetmover_upload_data_bad_encoding(build_payload):
         assert "data must be base64 encoded" in e.args[0]
 
 
+@pytest.mark.parametrize(
+    "data,expected",
+    (
+        ("", True),
+        ("c29tZSB0ZXN0IGRhdGE=", True),
+        ("c29tZSB0ZXN0IGRhdA==", True),
+        ("c29tZSB0\nZXN0IGRh\r\ndGE=\n", True),
+        ("aaaaa", False),
+        ("c29tZSB0ZXN0IGRhdGE", False),
+        ("c29tZSB0Z=N0IGRhdGE=", False),
+        ("c29tZSB0ZXN0IGRh!GE=", False),
+        # Inputs that aren't standard base64, but are accepted by b64decode.
+        ("c29tZSB0ZXN0IGRhdGE===", True),
+        ("c29t ZSB0\tZXN0IGRhdGE=", True),
+        ("YQ==YQ==", True),
+        ("c29tZSB0ZXN0IGRh!dGE=", True),
+    ),
+)
+def test_is_base64(data, expected):
+    assert is_base64(data) == expected
+    # Same as the historical check.
+    try:
+        base64.b64decode(data)
+    except binascii.Error:
+        assert not expected
+    else:
+        assert expected
+
+
+def test_beetmover_upload_data_compress(build_payload):
+    data = b"some test data " * 100
+    worker = {
+        "bucket": "testbucket",
+        "app-name": "testapp",
+        "project": "testproject",
+        "compress": True,
+        "data-map": [
+            {
+                "data": base64.b64encode(data).decode(),
+                "content-type": "text/plain",
+                "destinations": ["foo.txt"],
+            },
+        ],
+    }
+    _, task_def = build_payload("scriptworker-beetmover-data", worker=worker)
+    entry = task_def["payload"]["dataMap"][0]
+    assert entry["contentEncoding"] == "gzip"
+    assert entry["contentType"] == "text/plain"
+    assert gzip.decompress(base64.b64decode(entry["data"])) == data
+    assert len(entry["data"]) < len(worker["data-map"][0]["data"])
+
+
 @pytest.fixture
 def make_release_config(monkeypatch, make_graph_config, parameters):
     def inner(kind, partial_updates=None):
@@ -1519,3 +1683,86 @@ def test_get_release_config_partials(make_release_config):
         partial_updates=partial_updates,
     )
     assert release_config["partial_versions"] == "70.0build1, 69.0build3"
+
+
+def test_get_release_config_invalid_partials(make_release_config):
+    with pytest.raises(Exception, match="Invalid PARTIAL_UPDATES"):
+        make_release_config(
+            "release-update-verify-config",
+            partial_updates=json.dumps({"70.0": {"locales": []}}),
+        )
+
+    with pytest.raises(Exception, match="Invalid PARTIAL_UPDATES"):
+        make_release_config("release-update-verify-config", partial_updates="not json")
+
+
+def test_get_release_config_partials_parsed_once(
+    monkeypatch, make_graph_config, parameters
+):
+    # Simulate an l10n sized kind, with many tasks and partial versions.
+    partial_updates = json.dumps(
+        {f"{v}.0": {"buildNumber": 1, "locales": ["de", "fr"]} for v in range(300)}
+    )
+    monkeypatch.setenv("PARTIAL_UPDATES", partial_updates)
+    graph_config = make_graph_config()
+    config = TransformConfig(
+        "l10n", "test", {}, parameters, {}, graph_config, write_artifacts=False
+    )
+
+    release_config._parse_partial_updates.cache_clear()
+    results = [get_release_config(config) for _ in range(500)]
+
+    assert release_config._parse_partial_updates.cache_info().misses == 1
+    assert all(r["partial_versions"] == results[0]["partial_versions"] for r in results)
+    assert results[0]["partial_versions"].startswith("0.0build1, 1.0build1, ")
+
+
+def test_to_payload():
+    info = {
+        "fetch-version-from": "version.txt",
+        "version-files": [{"filename": "version.txt", "version-bump": "major"}],
+        "from-branch": "main",
+        "to-branch": "beta",
+        "replacements": [["a", "b"]],
+        "l10n-bump-info": [
+            {
+                "name": "l10n",
+                "path": "l10n.json",
+                "l10n-repo-url": "https://example.com",
+                "l10n-repo-target-branch": "main",
+                "platform-configs": [{"platforms": ["linux"], "path": "locales"}],
+            }
+        ],
+    }
+    result = to_payload(UpliftConfig, info)
+    pprint(result)
+    assert result == {
+        "fetch_version_from": "version.txt",
+        "version_files": [{"filename": "version.txt", "version_bump": "major"}],
+        "from_branch": "main",
+        "to_branch": "beta",
+        "replacements": [["a", "b"]],
+        "l10n_bump_info": [
+            {
+                "name": "l10n",
+                "path": "l10n.json",
+                "l10n_repo_url": "https://example.com",
+                "l10n_repo_target_branch": "main",
+                "platform_configs": [{"platforms": ["linux"], "path": "locales"}],
+            }
+        ],
+    }
+    # objects that don't need renaming are shared rather than copied
+    assert result["replacements"] is info["replacements"]
+    platform_configs = info["l10n-bump-info"][0]["platform-configs"]
+    assert result["l10n_bump_info"][0]["platform_configs"] is platform_configs
+    # the input is left untouched
+    assert "fetch-version-from" in info
+
+
+def test_worker_types_reexports_public_names_only():
+    names = [n for n in vars(mozilla_taskgraph.worker_types) if not n.startswith("__")]
+    assert [n for n in names if n.startswith("_")] == []
+    assert mozilla_taskgraph.worker_types.dash_to_underscore(
+        {"to-branch": "main", "version-files": []}
+    ) == {"to_branch": "main", "version_files": []}
@@ -6,10 +6,19 @@ from taskcluster.exceptions import TaskclusterRestFailure
 from taskgraph.util.templates import merge
 
 from mozilla_taskgraph.transforms.replicate import transforms as replicate_transforms
+from mozilla_taskgraph.util.graph_snapshot import encode_snapshot
 
 TC_ROOT_URL = "https://tc-tests.example.com"
 
 
+def add_missing_snapshot(responses, task_id):
+    responses.get(
+        f"{TC_ROOT_URL}/api/queue/v1/task/{task_id}/artifacts/public%2Ftask-graph.msgpack",
+        json={"message": "Artifact not found"},
+        status=404,
+    )
+
+
 def get_target_defs(*task_defs):
     default = {
         "task": {
@@ -137,6 +146,7 @@ def test_requests_error(responses, run_replicate):
             ]
         },
     }
+    add_missing_snapshot(responses, task_id)
     responses.get(
         f"{TC_ROOT_URL}/api/queue/v1/task/{task_id}/artifacts/public%2Ftask-graph.json",
         json={"message": "Forbidden"},
@@ -161,6 +171,7 @@ def test_task_id(responses, run_replicate):
     task_def = get_target_defs()[0]
     expected = get_expected(prefix, task_def)[0]
 
+    add_missing_snapshot(responses, task_id)
     responses.get(
         f"{TC_ROOT_URL}/api/queue/v1/task/{task_id}/artifacts/public%2Ftask-graph.json",
         json={"message": "Artifact not found"},
@@ -187,6 +198,7 @@ def test_index_path(responses, run_replicate):
     responses.get(
         f"{TC_ROOT_URL}/api/index/v1/task/{index_path}", json={"taskId": task_id}
     )
+    add_missing_snapshot(responses, task_id)
     responses.get(
         f"{TC_ROOT_URL}/api/queue/v1/task/{task_id}/artifacts/public%2Ftask-graph.json",
         json={"message": "Artifact not found"},
@@ -213,6 +225,7 @@ def test_decision_task(responses, run_replicate):
     task_defs = get_target_defs({}, {"task": {"metadata": {"name": "task-c"}}})
     expected = get_expected(prefix, *task_defs)
 
+    add_missing_snapshot(responses, task_id)
     counter = count()
     url = (
         f"{TC_ROOT_URL}/api/queue/v1/task/{task_id}/artifacts/public%2Ftask-graph.json"
@@ -269,6 +282,7 @@ def test_filtered_out(responses, run_replicate, target_def):
     }
     task_defs = get_target_defs(target_def)
 
+    add_missing_snapshot(responses, task_id)
     counter = count()
     url = (
         f"{TC_ROOT_URL}/api/queue/v1/task/{task_id}/artifacts/public%2Ftask-graph.json"
@@ -277,3 +291,40 @@ def test_filtered_out(responses, run_replicate, target_def):
     responses.get(url, json={next(counter): task_def for task_def in task_defs})
     result = run_replicate(task)
     assert len(result) == 0
+
+
+def test_decision_task_snapshot(responses, run_replicate):
+    prefix = "kind-a"
+    task_id = "fwp41cUkRmara7CD6l2U3A"
+    task = {
+        "name": prefix,
+        "replicate": {
+            "target": [
+                task_id,
+            ],
+            "include-attrs": {
+                "kind": "build",
+            },
+        },
+    }
+    task_defs = get_target_defs(
+        {"kind": "build", "attributes": {"kind": "build"}},
+        {
+            "kind": "test",
+            "attributes": {"kind": "test"},
+            "task": {"metadata": {"name": "task-c"}},
+        },
+    )
+    expected = get_expected(prefix, *get_target_defs())
+
+    url = f"{TC_ROOT_URL}/api/queue/v1/task/{task_id}/artifacts/public%2Ftask-graph.msgpack"
+    storage_url = "https://storage.example.com/task-graph.msgpack"
+    responses.get(url, json={"url": storage_url})
+    responses.get(
+        storage_url,
+        body=encode_snapshot(
+            {str(i): task_def for i, task_def in enumerate(task_defs)}
+        ),
+    )
+    result = run_replicate(task)
+    assert result == expected
@@ -0,0 +1,118 @@
+from pprint import pprint
+
+import pytest
+
+from mozilla_taskgraph.transforms.scriptworker.beetmover_data import (
+    pack_data_map,
+)
+from mozilla_taskgraph.transforms.scriptworker.beetmover_data import (
+    transforms as beetmover_data_transforms,
+)
+
+
+def data_entry(name, size):
+    return {
+        "data": "a" * size,
+        "content-type": "text/plain",
+        "destinations": [name],
+    }
+
+
+def data_map(count, size):
+    return [data_entry(str(i), size) for i in range(count)]
+
+
+def beetmover_data_task(entries, name="upload", max_size=None):
+    task = {
+        "name": name,
+        "worker-type": "beetmover",
+        "worker": {
+            "implementation": "scriptworker-beetmover-data",
+            "app-name": "app",
+            "bucket": "bucket",
+            "project": "project",
+            "data-map": entries,
+        },
+    }
+    if max_size:
+        task["max-data-map-size"] = max_size
+    return task
+
+
+def with_label(task):
+    task["label"] = task.pop("name")
+    return task
+
+
+def test_pack_data_map():
+    entries = [
+        data_entry("a", 600),
+        data_entry("b", 300),
+        data_entry("c", 500),
+        data_entry("d", 100),
+        data_entry("e", 2000),
+    ]
+    chunks = pack_data_map(entries, 1000)
+    pprint(chunks)
+    assert [[e["destinations"][0] for e in chunk] for chunk in chunks] == [
+        # oversized entries get their own chunk
+        ["e"],
+        ["a", "d"],
+        ["b", "c"],
+    ]
+
+
+def assert_no_chunking(result):
+    assert result == [beetmover_data_task(data_map(2, 10))]
+
+
+def assert_other_implementation(result):
+    assert result == [{"name": "foo", "worker": {"implementation": "docker-worker"}}]
+
+
+def _assert_chunks(result, key):
+    assert [t[key] for t in result] == ["upload-1", "upload-2", "upload-3"]
+    assert [t["attributes"]["data_map_chunk"] for t in result] == [1, 2, 3]
+    assert [len(t["worker"]["data-map"]) for t in result] == [2, 2, 1]
+    assert [e for t in result for e in t["worker"]["data-map"]] == data_map(5, 400)
+    for t in result:
+        assert "max-data-map-size" not in t
+        assert t["worker"]["bucket"] == "bucket"
+        assert t["worker"]["implementation"] == "scriptworker-beetmover-data"
+
+
+def assert_chunking_name(result):
+    _assert_chunks(result, "name")
+
+
+def assert_chunking_label(result):
+    _assert_chunks(result, "label")
+
+
+@pytest.mark.parametrize(
+    "task",
+    (
+        pytest.param(beetmover_data_task(data_map(2, 10)), id="no_chunking"),
+        pytest.param(
+            {"name": "foo", "worker": {"implementation": "docker-worker"}},
+            id="other_implementation",
+        ),
+        pytest.param(
+            beetmover_data_task(data_map(5, 400), max_size=1000),
+            id="chunking_name",
+        ),
+        pytest.param(
+            with_label(beetmover_data_task(data_map(5, 400), max_size=1000)),
+            id="chunking_label",
+        ),
+    ),
+)
+def test_beetmover_data(request, run_transform, task):
+    result = run_transform(beetmover_data_transforms, task)
+
+    print("Dumping result:")
+    pprint(result, indent=2)
+
+    param_id = request.node.callspec.id
+    assert_func = globals()[f"assert_{param_id}"]
+    assert_func(result)
@@ -0,0 +1,170 @@
+from pprint import pprint
+
+import pytest
+
+from mozilla_taskgraph.transforms.scriptworker.lando_merge import (
+    transforms as lando_merge_transforms,
+)
+
+TAG = {"tag": {"types": ["release"], "hg-repo-url": "https://hg.example.com"}}
+BUMP = {"version-bump": {"bump-files": ["version.txt"]}}
+L10N = {"l10n-bump": []}
+MAIN_BUMP = {
+    "main-bump": {
+        "to-branch": "main",
+        "fetch-version-from": "version.txt",
+        "version-files": [],
+    }
+}
+UPLIFT = {
+    "uplift": {
+        "fetch-version-from": "version.txt",
+        "version-files": [],
+        "from-branch": "main",
+        "to-branch": "beta",
+    }
+}
+
+
+def lando_task(name, actions, repo="main", dependencies=None, **worker):
+    task = {
+        "name": name,
+        "description": f"Run {name}",
+        "worker-type": "lando",
+        "attributes": {"shipping-phase": "ship", "name": name},
+        "worker": {
+            "implementation": "scriptworker-lando",
+            "lando-repo": repo,
+            "actions": actions,
+            **worker,
+        },
+    }
+    if dependencies:
+        task["dependencies"] = dependencies
+    return task
+
+
+def assert_merge(result):
+    assert [t["name"] for t in result] == [
+        "not-lando",
+        "tag-bump",
+        "other-repo",
+        "dry-run",
+    ]
+    assert result[1] == {
+        "name": "tag-bump",
+        "description": "Run tag; Run bump",
+        "worker-type": "lando",
+        "attributes": {"shipping-phase": "ship", "lando_merged": ["tag", "bump"]},
+        "dependencies": {"build": "build-linux", "test": "test-linux"},
+        "scopes": ["bar", "foo"],
+        "treeherder": {"symbol": "Rel(tag)"},
+        "worker": {
+            "implementation": "scriptworker-lando",
+            "lando-repo": "main",
+            "actions": [TAG, BUMP, L10N],
+            "matrix-rooms": ["!room"],
+        },
+    }
+
+
+def assert_conflicting_merge_info(result):
+    assert [t["name"] for t in result] == ["main-bump-tag", "uplift"]
+    assert result[0]["worker"]["actions"] == [MAIN_BUMP, TAG]
+    assert result[1]["worker"]["actions"] == [UPLIFT]
+
+
+def assert_conflicting_version_bump(result):
+    assert [t["name"] for t in result] == ["bump", "tag-bump"]
+    assert result[1]["worker"]["actions"] == [TAG, BUMP]
+
+
+def assert_conflicting_dependencies(result):
+    assert [t["name"] for t in result] == ["tag-l10n", "bump"]
+    assert result[0]["dependencies"] == {"build": "build-linux"}
+    assert result[1]["dependencies"] == {"build": "build-mac"}
+
+
+def assert_dependent(result):
+    assert [t["name"] for t in result] == ["tag", "bump", "l10n-main-bump"]
+    assert result[1]["dependencies"] == {"tag": "test-tag"}
+    assert result[2]["worker"]["actions"] == [L10N, MAIN_BUMP]
+
+
+def assert_invalid_task(e):
+    assert isinstance(e, Exception)
+    assert "more than one action producing 'merge_info'" in str(e)
+
+
+@pytest.mark.parametrize(
+    "tasks",
+    (
+        pytest.param(
+            [
+                {
+                    **lando_task("tag", [TAG], dependencies={"build": "build-linux"}),
+                    "scopes": ["foo"],
+                    "treeherder": {"symbol": "Rel(tag)"},
+                },
+                {
+                    **lando_task(
+                        "bump",
+                        [BUMP, L10N],
+                        dependencies={"build": "build-linux", "test": "test-linux"},
+                        **{"matrix-rooms": ["!room"]},
+                    ),
+                    "scopes": ["bar", "foo"],
+                },
+                lando_task("other-repo", [BUMP], repo="other"),
+                {"name": "not-lando", "worker": {"implementation": "docker-worker"}},
+                lando_task("dry-run", [BUMP], **{"force-dry-run": True}),
+            ],
+            id="merge",
+        ),
+        pytest.param(
+            [
+                lando_task("main-bump", [MAIN_BUMP]),
+                lando_task("uplift", [UPLIFT]),
+                lando_task("tag", [TAG]),
+            ],
+            id="conflicting_merge_info",
+        ),
+        pytest.param(
+            [lando_task("bump", [BUMP]), lando_task("tag-bump", [TAG, BUMP])],
+            id="conflicting_version_bump",
+        ),
+        pytest.param(
+            [
+                lando_task("tag", [TAG], dependencies={"build": "build-linux"}),
+                lando_task("bump", [BUMP], dependencies={"build": "build-mac"}),
+                lando_task("l10n", [L10N], dependencies={"build": "build-linux"}),
+            ],
+            id="conflicting_dependencies",
+        ),
+        pytest.param(
+            [
+                lando_task("tag", [TAG]),
+                lando_task("bump", [BUMP], dependencies={"tag": "test-tag"}),
+                lando_task("l10n", [L10N]),
+                lando_task("main-bump", [MAIN_BUMP]),
+            ],
+            id="dependent",
+        ),
+        pytest.param(
+            [lando_task("merges", [MAIN_BUMP, UPLIFT]), lando_task("tag", [TAG])],
+            id="invalid_task",
+        ),
+    ),
+)
+def test_lando_merge(request, run_transform, tasks):
+    try:
+        result = run_transform(lando_merge_transforms, tasks)
+
+        print("Dumping result:")
+        pprint(result, indent=2)
+    except Exception as e:
+        result = e
+
+    param_id = request.node.callspec.id
+    assert_func = globals()[f"assert_{param_id}"]
+    assert_func(result)
@@ -1,10 +1,16 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pprint import pprint
 
 import pytest
+from taskgraph.config import load_graph_config
+from taskgraph.generator import Kind, TaskGraphGenerator
+from taskgraph.graph import Graph
 
 from mozilla_taskgraph.transforms.scriptworker.release_artifacts import (
     transforms as release_artifacts_transforms,
 )
+from mozilla_taskgraph.util.release_artifacts import get_release_artifacts_index
 
 
 def assert_no_release_artifacts(task):
@@ -98,3 +104,174 @@ def test_release_artifacts(request, run_transform, task):
     param_id = request.node.callspec.id
     assert_func = globals()[f"assert_{param_id}"]
     assert_func(result)
+
+
+def load_tasks(kind, path, config, params, loaded_tasks):
+    return config["tasks"]
+
+
+def finalize(config, tasks):
+    for task in tasks:
+        yield {
+            "label": f"{config.kind}-{task['name']}",
+            "description": "",
+            "attributes": task.get("attributes", {}),
+            "task": {},
+        }
+
+
+def lookup_producer(config, tasks):
+    index = get_release_artifacts_index(config)
+    for task in tasks:
+        task["attributes"] = {"producer": index.producer(task["artifact"])}
+        yield task
+
+
+def test_release_artifacts_index_parallel(datadir, parameters):
+    # Kinds are sent to other processes, so the graph config must be picklable.
+    graph_config = load_graph_config(str(datadir / "taskcluster"))
+    kinds = {
+        "build": Kind(
+            "build",
+            "",
+            {
+                "loader": f"{__name__}:load_tasks",
+                "transforms": [
+                    "mozilla_taskgraph.transforms.scriptworker.release_artifacts",
+                    f"{__name__}:finalize",
+                ],
+                "tasks": [
+                    {
+                        "name": "linux",
+                        "worker-type": "b-linux",
+                        "release-artifacts": ["target.tar.gz"],
+                    }
+                ],
+            },
+            graph_config,
+        ),
+        "beetmover": Kind(
+            "beetmover",
+            "",
+            {
+                "loader": f"{__name__}:load_tasks",
+                "kind-dependencies": ["build"],
+                "transforms": [f"{__name__}:lookup_producer", f"{__name__}:finalize"],
+                "tasks": [{"name": "linux", "artifact": "public/build/target.tar.gz"}],
+            },
+            graph_config,
+        ),
+    }
+    kind_graph = Graph(set(kinds), {("beetmover", "build", "kind-dependency")})
+    generator = TaskGraphGenerator(None, parameters)
+    executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context("fork"))
+    tasks = generator._load_tasks_parallel(
+        kinds, kind_graph, dict(parameters), executor
+    )
+    assert tasks["beetmover-linux"].attributes["producer"] == "build-linux"
+
+
+@pytest.mark.parametrize(
+    "worker_type,root",
+    (
+        pytest.param("t-linux", "/builds/worker/artifacts", id="docker_worker"),
+        pytest.param("b-linux", "artifacts", id="generic_worker"),
+    ),
+)
+def test_release_artifacts_directories(run_transform, worker_type, root):
+    task = {
+        "worker-type": worker_type,
+        "release-artifacts": [
+            "foo.txt",
+            "dist/*.zip",
+            "dist/*.zip.asc",
+            "dist/*.zip",
+            "logs/",
+            "config/*.json",
+            "l10n/*/target.tar.gz",
+        ],
+    }
+    result = run_transform(release_artifacts_transforms, task)[0]
+    pprint(result)
+    assert result["attributes"]["release-artifacts"] == [
+        {"type": "file", "name": "public/build/foo.txt", "path": f"{root}/foo.txt"},
+        {
+            "type": "directory",
+            "name": "public/build/dist",
+            "path": f"{root}/dist",
+            "patterns": ["*.zip", "*.zip.asc"],
+        },
+        {
+            "type": "directory",
+            "name": "public/build/logs",
+            "path": f"{root}/logs",
+            "patterns": ["*"],
+        },
+        {
+            "type": "directory",
+            "name": "public/build/config",
+            "path": f"{root}/config",
+            "patterns": ["*.json"],
+        },
+        {
+            "type": "directory",
+            "name": "public/build/l10n",
+            "path": f"{root}/l10n",
+            "patterns": ["*/target.tar.gz"],
+        },
+    ]
+    assert result["worker"]["artifacts"] == [
+        {k: v for k, v in a.items() if k != "patterns"}
+        for a in result["attributes"]["release-artifacts"]
+    ]
+
+
+@pytest.mark.parametrize(
+    "release_artifacts,expected",
+    (
+        pytest.param(
+            ["dist/a.zip", "dist/*.zip", "dist/sub/", "dist/"],
+            [{"name": "public/build/dist", "patterns": ["*"]}],
+            id="directory",
+        ),
+        pytest.param(
+            ["dist/*.zip", "dist/a.zip", "dist/b.txt", "dist/sub/*.asc", "dist/sub/"],
+            [
+                {
+                    "name": "public/build/dist",
+                    "patterns": ["*.zip", "sub/*.asc", "sub/*", "b.txt"],
+                }
+            ],
+            id="patterns",
+        ),
+        pytest.param(
+            ["foo.txt", "dist/a.zip", "logs/", "*.json"],
+            [
+                {
+                    "name": "public/build",
+                    "patterns": ["*.json", "logs/*", "foo.txt", "dist/a.zip"],
+                }
+            ],
+            id="root",
+        ),
+        pytest.param(
+            ["foo.txt", "foo.txt", "dist-a/", "dist/a.zip"],
+            [
+                {"name": "public/build/foo.txt"},
+                {"name": "public/build/dist/a.zip"},
+                {"name": "public/build/dist-a", "patterns": ["*"]},
+            ],
+            id="disjoint",
+        ),
+    ),
+)
+def test_release_artifacts_overlapping(run_transform, release_artifacts, expected):
+    task = {"worker-type": "b-linux", "release-artifacts": release_artifacts}
+    result = run_transform(release_artifacts_transforms, task)[0]
+    pprint(result)
+    assert [
+        {k: v for k, v in a.items() if k in ("name", "patterns")}
+        for a in result["attributes"]["release-artifacts"]
+    ] == expected
+    names = [a["name"] for a in result["worker"]["artifacts"]]
+    assert len(names) == len(set(names))
@@ -0,0 +1,240 @@
+from pprint import pprint
+
+import pytest
+
+from mozilla_taskgraph.transforms.scriptworker.signing_batch import (
+    transforms as signing_batch_transforms,
+)
+
+
+def signing_task(name, dependencies, upstream_artifacts, signing_type="release"):
+    return {
+        "name": name,
+        "description": f"Sign {name}",
+        "worker-type": "signing",
+        "dependencies": dependencies,
+        "attributes": {"locale": name, "shipping-phase": "promote"},
+        "treeherder": {"symbol": f"Bs({name})", "kind": "build"},
+        "worker": {
+            "implementation": "scriptworker-signing",
+            "signing-type": signing_type,
+            "upstream-artifacts": upstream_artifacts,
+        },
+    }
+
+
+def upstream_artifact(ref, paths, formats=("gcp_prod_autograph_gpg",), type="build"):
+    return {
+        "taskId": {"task-reference": f"<{ref}>"},
+        "taskType": type,
+        "paths": paths,
+        "formats": list(formats),
+    }
+
+
+def l10n_tasks(count, **kwargs):
+    return [
+        signing_task(
+            f"l10n-{i}",
+            {"build": f"build-l10n-{i}"},
+            [upstream_artifact("build", [f"public/build/l10n-{i}/target.zip"])],
+            **kwargs,
+        )
+        for i in range(count)
+    ]
+
+
+def assert_batch(result):
+    assert [t["name"] for t in result] == ["other", "release-batch-1"]
+
+    task = result[1]
+    assert task["dependencies"] == {
+        "build": "build-l10n-0",
+        "build-1": "build-l10n-1",
+        "build-2": "build-l10n-2",
+    }
+    assert task["worker"]["upstream-artifacts"] == [
+        upstream_artifact("build", ["public/build/l10n-0/target.zip"]),
+        upstream_artifact("build-1", ["public/build/l10n-1/target.zip"]),
+        upstream_artifact("build-2", ["public/build/l10n-2/target.zip"]),
+    ]
+    assert task["attributes"] == {
+        "shipping-phase": "promote",
+        "signing_batch": ["l10n-0", "l10n-1", "l10n-2"],
+        "release_artifacts": ["public/build/foo.zip"],
+    }
+    assert task["treeherder"] == {"symbol": "Bs(B1)", "kind": "build"}
+
+
+def assert_batch_size(result):
+    assert [t["name"] for t in result] == [
+        "release-batch-1",
+        "release-batch-2",
+        "l10n-4",
+    ]
+    assert result[0]["attributes"]["signing_batch"] == ["l10n-0", "l10n-1"]
+    assert result[1]["attributes"]["signing_batch"] == ["l10n-2", "l10n-3"]
+    assert all("signing-batch-size" not in t for t in result)
+
+
+def assert_batch_disabled(result):
+    assert [t["name"] for t in result] == ["l10n-0", "l10n-1"]
+
+
+def assert_same_upstream(result):
+    assert len(result) == 1
+    assert result[0]["dependencies"] == {"build": "build"}
+    assert result[0]["worker"]["upstream-artifacts"] == [
+        upstream_artifact("build", ["public/build/a.zip", "public/build/b.zip"]),
+        upstream_artifact("build", ["public/build/c.zip"], formats=["other"]),
+    ]
+
+
+def assert_chained_renames(result):
+    assert len(result) == 1
+    assert result[0]["dependencies"] == {
+        "build": "build-a",
+        "build-1": "build-c",
+        "build-1-1": "build-d",
+    }
+    assert result[0]["worker"]["upstream-artifacts"] == [
+        upstream_artifact("build", ["public/build/a.zip"]),
+        upstream_artifact("build-1", ["public/build/c.zip"]),
+        upstream_artifact("build-1-1", ["public/build/d.zip"]),
+    ]
+
+
+def assert_incompatible(result):
+    assert [t["attributes"]["signing_batch"] for t in result] == [
+        ["l10n-0", "l10n-1"],
+        ["l10n-0", "l10n-1"],
+    ]
+
+
+def assert_different_attributes(result):
+    assert [t["attributes"]["signing_batch"] for t in result] == [
+        ["l10n-0", "l10n-1"],
+        ["l10n-2", "l10n-3"],
+    ]
+    assert [t["attributes"]["shipping-phase"] for t in result] == [
+        "promote",
+        "ship",
+    ]
+
+
+def with_batch_size(tasks, size):
+    for task in tasks:
+        task["signing-batch-size"] = size
+    return tasks
+
+
+def with_attributes(tasks, **attributes):
+    for task in tasks:
+        task["attributes"].update(attributes)
+    return tasks
+
+
+def with_release_artifacts(tasks):
+    tasks[0]["attributes"]["release_artifacts"] = ["public/build/foo.zip"]
+    return tasks
+
+
+@pytest.mark.parametrize(
+    "tasks",
+    (
+        pytest.param(
+            [{"name": "other", "worker": {}}] + with_release_artifacts(l10n_tasks(3)),
+            id="batch",
+        ),
+        pytest.param(with_batch_size(l10n_tasks(5), 2), id="batch_size"),
+        pytest.param(with_batch_size(l10n_tasks(2), 1), id="batch_disabled"),
+        pytest.param(
+            [
+                signing_task(
+                    "a",
+                    {"build": "build"},
+                    [upstream_artifact("build", ["public/build/a.zip"])],
+                ),
+                signing_task(
+                    "b",
+                    {"build": "build"},
+                    [upstream_artifact("build", ["public/build/b.zip"])],
+                ),
+                signing_task(
+                    "c",
+                    {"build": "build"},
+                    [
+                        upstream_artifact(
+                            "build", ["public/build/c.zip"], formats=["other"]
+                        )
+                    ],
+                ),
+            ],
+            id="same_upstream",
+        ),
+        pytest.param(
+            [
+                signing_task(
+                    "a",
+                    {"build": "build-a"},
+                    [upstream_artifact("build", ["public/build/a.zip"])],
+                ),
+                signing_task(
+                    "b",
+                    {"build": "build-c", "build-1": "build-d"},
+                    [
+                        upstream_artifact("build", ["public/build/c.zip"]),
+                        upstream_artifact("build-1", ["public/build/d.zip"]),
+                    ],
+                ),
+            ],
+            id="chained_renames",
+        ),
+        pytest.param(
+            l10n_tasks(2) + l10n_tasks(2, signing_type="dep"),
+            id="incompatible",
+        ),
+        pytest.param(
+            l10n_tasks(2)
+            + with_attributes(l10n_tasks(4)[2:], **{"shipping-phase": "ship"}),
+            id="different_attributes",
+        ),
+    ),
+)
+def test_signing_batch(request, run_transform, tasks):
+    result = run_transform(signing_batch_transforms, tasks)
+
+    print("Dumping result:")
+    pprint(result, indent=2)
+
+    param_id = request.node.callspec.id
+    assert_func = globals()[f"assert_{param_id}"]
+    assert_func(result)
+
+
+@pytest.mark.parametrize(
+    "key,value",
+    (
+        pytest.param("worker-type", "other-signing", id="worker-type"),
+        pytest.param("taskType", "repackage", id="taskType"),
+    ),
+)
+def test_signing_batch_incompatible_keys(run_transform, key, value):
+    tasks = l10n_tasks(4)
+    for task in tasks[2:]:
+        if key == "worker-type":
+            task[key] = value
+        else:
+            task["worker"]["upstream-artifacts"][0][key] = value
+
+    result = run_transform(signing_batch_transforms, tasks)
+    assert [t["attributes"]["signing_batch"] for t in result] == [
+        ["l10n-0", "l10n-1"],
+        ["l10n-2", "l10n-3"],
+    ]
+
+
+def test_signing_batch_leaves_input_untouched(run_transform):
+    tasks = l10n_tasks(2)
+    run_transform(signing_batch_transforms, tasks)
+    assert tasks[1]["dependencies"] == {"build": "build-l10n-1"}
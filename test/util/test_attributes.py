@@ -6,12 +6,18 @@ from types import SimpleNamespace
 
 import pytest
 
+from mozilla_taskgraph.util import attributes
 from mozilla_taskgraph.util.attributes import (
+    ReleaseLevelResolver,
+    attribute_copier,
+    common_attributes,
     copy_attributes_from_dependent_job,
+    get_release_level_resolver,
+    propagate_attributes,
     release_level,
 )
 
-FIREFOX_BRANCHES = ["main", "beta", "release", "esr140"]
+FIREFOX_BRANCHES = ["main", "beta", "release", "esr140", "releases/*"]
 RELEASE_BRANCHES = {
     "firefox": FIREFOX_BRANCHES,
     "mozilla-central": True,
@@ -49,6 +55,17 @@ RELEASE_BRANCHES = {
             {"level": "3", "project": "firefox", "head_ref": "refs/heads/test"},
             "staging",
         ),
+        # Glob patterns.
+        (
+            RELEASE_BRANCHES,
+            {"level": "3", "project": "firefox", "head_ref": "refs/heads/releases/v1"},
+            "production",
+        ),
+        (
+            RELEASE_BRANCHES,
+            {"level": "3", "project": "firefox", "head_ref": "refs/heads/releases"},
+            "staging",
+        ),
         # Only refs/heads/* match, not tags.
         (
             RELEASE_BRANCHES,
@@ -61,6 +78,49 @@ def test_release_level(release_branches, params, expected):
     assert release_level(release_branches, params) == expected
 
 
+def test_release_level_cached_by_contents():
+    params = {"level": "3", "project": "firefox", "head_ref": "refs/heads/beta"}
+    release_branches = {"firefox": ["main"]}
+    assert release_level(release_branches, params) == "staging"
+
+    # Modifying the mapping in place isn't hidden by the cache.
+    release_branches["firefox"].append("beta")
+    assert release_level(release_branches, params) == "production"
+
+    # Equal mappings share a resolver.
+    info = attributes._cached_resolver.cache_info()
+    assert release_level({"firefox": ["main", "beta"]}, params) == "production"
+    assert attributes._cached_resolver.cache_info().hits == info.hits + 1
+
+
+def test_release_level_resolver_cache():
+    resolver = ReleaseLevelResolver(RELEASE_BRANCHES)
+    params = {"level": "3", "project": "firefox", "head_ref": "refs/heads/beta"}
+    assert resolver.level(params) == "production"
+    assert resolver.level(dict(params)) == "production"
+    assert len(resolver._cache) == 1
+
+    params["head_ref"] = "refs/heads/test"
+    assert resolver.level(params) == "staging"
+    assert len(resolver._cache) == 2
+
+
+def test_get_release_level_resolver(make_graph_config):
+    graph_config = make_graph_config(
+        extra_config={"release-branches": {"firefox": ["releases/*"]}}
+    )
+    resolver = get_release_level_resolver(graph_config)
+    assert get_release_level_resolver(graph_config) is resolver
+    assert resolver.is_release_branch("firefox", "releases/v2")
+    assert not resolver.is_release_branch("firefox", "main")
+
+    # Replacing the release branches rebuilds the resolver.
+    graph_config._config["release-branches"] = {"firefox": ["main"]}
+    resolver = get_release_level_resolver(graph_config)
+    assert resolver.is_release_branch("firefox", "main")
+    assert not resolver.is_release_branch("firefox", "releases/v2")
+
+
 def test_copy_attributes_from_dependent_job():
     dep_job = SimpleNamespace(
         attributes={
@@ -79,3 +139,84 @@ def test_copy_attributes_from_dependent_job():
         "build_platform": "linux64",
         "shippable": True,
     }
+
+
+def test_attribute_copier():
+    assert attribute_copier(["locale"]) is attribute_copier(("locale",))
+    copy = attribute_copier({"locale"})
+    assert copy({"locale": "de", "nightly": True, "other": 1}) == {"nightly": True}
+
+
+@pytest.mark.parametrize(
+    "tasks,expected",
+    (
+        pytest.param([], {}, id="no_tasks"),
+        pytest.param([{"attributes": {"a": 1}}], {"a": 1}, id="single"),
+        pytest.param(
+            [
+                {"attributes": {"a": 1, "b": 2, "c": [3]}},
+                {"attributes": {"a": 1, "b": 3, "c": [3]}},
+                {"attributes": {"a": 1, "c": [3], "d": 4}},
+            ],
+            {"a": 1, "c": [3]},
+            id="shared",
+        ),
+        pytest.param([{"attributes": {"a": 1}}, {}], {}, id="missing"),
+    ),
+)
+def test_common_attributes(tasks, expected):
+    result = common_attributes(tasks)
+    assert result == expected
+    if tasks:
+        # The result can be modified without affecting the tasks.
+        result["new"] = True
+        assert "new" not in tasks[0].get("attributes", {})
+
+
+def test_propagate_attributes():
+    tasks = {
+        label: SimpleNamespace(attributes=attributes)
+        for label, attributes in {
+            "repackage": {"locale": "fr"},
+            "signing": {},
+            "build": {"build_platform": "linux64", "locale": "de", "other": 1},
+            "unrelated": {},
+        }.items()
+    }
+    primary_dependencies = {
+        "repackage": "signing",
+        "signing": "build",
+        "unrelated": "missing",
+    }
+    propagate_attributes(tasks, primary_dependencies)
+
+    assert tasks["build"].attributes == {
+        "build_platform": "linux64",
+        "locale": "de",
+        "other": 1,
+    }
+    assert tasks["signing"].attributes == {"build_platform": "linux64", "locale": "de"}
+    # Attributes set on the task take precedence.
+    assert tasks["repackage"].attributes == {
+        "build_platform": "linux64",
+        "locale": "fr",
+    }
+    assert tasks["unrelated"].attributes == {}
+
+
+def test_propagate_attributes_denylist():
+    tasks = {
+        "signing": SimpleNamespace(attributes={}),
+        "build": SimpleNamespace(attributes={"nightly": True, "locale": "de"}),
+    }
+    propagate_attributes(tasks, {"signing": "build"}, denylist=("locale",))
+    assert tasks["signing"].attributes == {"nightly": True}
+
+
+def test_propagate_attributes_cycle():
+    tasks = {
+        "a": SimpleNamespace(attributes={}),
+        "b": SimpleNamespace(attributes={}),
+    }
+    with pytest.raises(Exception, match="Cycle in primary dependencies"):
+        propagate_attributes(tasks, {"a": "b", "b": "a"})
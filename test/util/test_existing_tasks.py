@@ -0,0 +1,69 @@
+import gzip
+import json
+
+import taskcluster_urls as liburl
+from taskgraph.decision import write_artifact
+from taskgraph.util.yaml import load_yaml
+
+from mozilla_taskgraph.util import existing_tasks
+from mozilla_taskgraph.util.existing_tasks import (
+    EXISTING_TASKS_ARTIFACT,
+    EXISTING_TASKS_PLACEHOLDER,
+    LazyExistingTasks,
+    load_existing_tasks,
+    write_existing_tasks_artifact,
+)
+
+
+def test_write_existing_tasks_artifact(monkeypatch, tmp_path):
+    monkeypatch.setattr(existing_tasks, "ARTIFACTS_DIR", tmp_path)
+    monkeypatch.setattr("taskgraph.decision.ARTIFACTS_DIR", tmp_path)
+    write_artifact("parameters.yml", {"existing_tasks": {"a": "0", "b": "1"}})
+
+    write_existing_tasks_artifact()
+
+    parameters = load_yaml(tmp_path, "parameters.yml")
+    assert parameters == {
+        "existing_tasks": EXISTING_TASKS_PLACEHOLDER,
+        "existing_tasks_artifact": EXISTING_TASKS_ARTIFACT,
+    }
+    with gzip.open(tmp_path / "existing-tasks.json.gz") as f:
+        assert json.load(f) == {"a": "0", "b": "1"}
+
+
+def test_write_existing_tasks_artifact_empty(monkeypatch, tmp_path):
+    monkeypatch.setattr(existing_tasks, "ARTIFACTS_DIR", tmp_path)
+    monkeypatch.setattr("taskgraph.decision.ARTIFACTS_DIR", tmp_path)
+    write_artifact("parameters.yml", {"existing_tasks": {}})
+
+    write_existing_tasks_artifact()
+
+    assert not (tmp_path / "existing-tasks.json.gz").exists()
+    assert load_yaml(tmp_path, "parameters.yml") == {"existing_tasks": {}}
+
+
+def test_load_existing_tasks_inline():
+    parameters = {"existing_tasks": {"a": "0"}}
+    assert load_existing_tasks("abc", parameters) == {"a": "0"}
+
+
+def test_load_existing_tasks_lazy(responses):
+    tc_url = liburl.test_root_url()
+    parameters = {
+        "existing_tasks": EXISTING_TASKS_PLACEHOLDER,
+        "existing_tasks_artifact": EXISTING_TASKS_ARTIFACT,
+    }
+    result = load_existing_tasks("abc", parameters)
+    assert isinstance(result, LazyExistingTasks)
+    # Nothing was downloaded yet.
+    assert len(responses.calls) == 0
+
+    url = f"{tc_url}/api/queue/v1/task/abc/artifacts/public%2Fexisting-tasks.json.gz"
+    responses.get(url, json={"url": url})
+    responses.get(url, body=gzip.compress(json.dumps({"a": "0", "b": "1"}).encode()))
+
+    assert result["a"] == "0"
+    assert dict(result) == {"a": "0", "b": "1"}
+    assert len(result) == 2
+    # The artifact is only downloaded once.
+    assert len(responses.calls) == 2
@@ -0,0 +1,194 @@
+import gzip
+import re
+
+import pytest
+import taskcluster_urls as liburl
+
+from mozilla_taskgraph.util import graph_snapshot
+from mozilla_taskgraph.util.graph_snapshot import (
+    decode_snapshot,
+    encode_snapshot,
+    fetch_snapshot,
+    snapshot_name,
+    write_graph_snapshot,
+)
+
+STORAGE_URL = "https://storage.example.com/snapshot"
+
+
+@pytest.fixture
+def graph_json():
+    tasks = [("a-1", "a"), ("a-2", "a"), ("b-1", "b"), ("c-1", "c"), ("d-1", "d")]
+    return {
+        label: {
+            "kind": kind,
+            "label": label,
+            "attributes": {"kind": kind},
+            "dependencies": {},
+            "optimization": None,
+            "task": {"metadata": {"name": label}, "payload": {"env": {"FOO": "1"}}},
+        }
+        for label, kind in tasks
+    }
+
+
+@pytest.fixture
+def serve_snapshot(responses):
+    tc_url = liburl.test_root_url()
+
+    def inner(data, task_id="abc", honor_range=True, gzip_encoded=False, gzip_after=0):
+        url = f"{tc_url}/api/queue/v1/task/{task_id}/artifacts/public%2Ffull-task-graph.msgpack"
+        responses.get(url, json={"url": STORAGE_URL})
+
+        requested = []
+
+        def callback(request):
+            # Only ranges after the first ``gzip_after`` ones are encoded, as
+            # when the artifact is replaced while being read.
+            if gzip_encoded and (
+                "Range" not in request.headers or len(requested) >= gzip_after
+            ):
+                # The stored object is gzipped, and ranges cover the gzipped
+                # stream.
+                body = gzip.compress(data)
+                headers = {"Content-Encoding": "gzip"}
+                if "Range" not in request.headers:
+                    return (200, headers, body)
+                start, end = map(
+                    int,
+                    re.match(r"bytes=(\d+)-(\d+)", request.headers["Range"]).groups(),
+                )
+                requested.append((start, end))
+                return (206, headers, body[start : end + 1])
+            if not honor_range:
+                return (200, {}, data)
+            start, end = map(
+                int, re.match(r"bytes=(\d+)-(\d+)", request.headers["Range"]).groups()
+            )
+            requested.append((start, end))
+            return (206, {}, data[start : end + 1])
+
+        responses.add_callback("GET", STORAGE_URL, callback=callback)
+        return requested
+
+    return inner
+
+
+def test_snapshot_name():
+    assert snapshot_name("public/task-graph.json") == "public/task-graph.msgpack"
+
+
+def test_roundtrip(graph_json):
+    data = encode_snapshot(graph_json)
+    assert decode_snapshot(data) == graph_json
+
+
+@pytest.mark.parametrize(
+    "kinds,exclude_kinds,expected",
+    (
+        pytest.param({"a"}, (), {"a-1", "a-2"}, id="kinds"),
+        pytest.param(None, ["a", "c"], {"b-1", "d-1"}, id="exclude_kinds"),
+        pytest.param({"a", "b"}, ["b"], {"a-1", "a-2"}, id="both"),
+        pytest.param({"missing"}, (), set(), id="missing_kind"),
+    ),
+)
+def test_decode_kinds(graph_json, kinds, exclude_kinds, expected):
+    data = encode_snapshot(graph_json)
+    result = decode_snapshot(data, kinds=kinds, exclude_kinds=exclude_kinds)
+    assert set(result) == expected
+    for label in expected:
+        assert result[label] == graph_json[label]
+
+
+def test_decode_invalid():
+    with pytest.raises(Exception, match="Not a task graph snapshot"):
+        decode_snapshot(b"not a snapshot at all")
+
+
+def test_fetch_snapshot_ranges(monkeypatch, serve_snapshot, graph_json):
+    data = encode_snapshot(graph_json)
+    # Force the index and the data to require their own requests.
+    monkeypatch.setattr(graph_snapshot, "INITIAL_READ_SIZE", graph_snapshot.HEADER.size)
+    requested = serve_snapshot(data)
+
+    result = fetch_snapshot("abc", "public/full-task-graph.msgpack", kinds={"b", "d"})
+    assert set(result) == {"b-1", "d-1"}
+    assert result["b-1"] == graph_json["b-1"]
+
+    # header, rest of the index, kind b, kind d
+    assert len(requested) == 4
+    fetched = sum(end - start + 1 for start, end in requested)
+    assert fetched < len(data)
+
+
+def test_fetch_snapshot_adjacent_kinds(monkeypatch, serve_snapshot, graph_json):
+    data = encode_snapshot(graph_json)
+    monkeypatch.setattr(graph_snapshot, "INITIAL_READ_SIZE", graph_snapshot.HEADER.size)
+    requested = serve_snapshot(data)
+
+    result = fetch_snapshot(
+        "abc", "public/full-task-graph.msgpack", exclude_kinds=["d"]
+    )
+    assert set(result) == {"a-1", "a-2", "b-1", "c-1"}
+    # kinds a, b and c are contiguous so they are fetched in one request
+    assert len(requested) == 3
+
+
+def test_fetch_snapshot_initial_read(serve_snapshot, graph_json):
+    data = encode_snapshot(graph_json)
+    requested = serve_snapshot(data)
+
+    assert fetch_snapshot("abc", "public/full-task-graph.msgpack") == graph_json
+    assert len(requested) == 1
+
+
+def test_fetch_snapshot_no_range_support(serve_snapshot, graph_json):
+    data = encode_snapshot(graph_json)
+    serve_snapshot(data, honor_range=False)
+
+    result = fetch_snapshot("abc", "public/full-task-graph.msgpack", kinds={"c"})
+    assert result == {"c-1": graph_json["c-1"]}
+
+
+def test_fetch_snapshot_gzip_encoded(monkeypatch, serve_snapshot, graph_json):
+    data = encode_snapshot(graph_json)
+    monkeypatch.setattr(graph_snapshot, "INITIAL_READ_SIZE", graph_snapshot.HEADER.size)
+    requested = serve_snapshot(data, gzip_encoded=True)
+
+    result = fetch_snapshot("abc", "public/full-task-graph.msgpack", kinds={"b"})
+    assert result == {"b-1": graph_json["b-1"]}
+    # Only the initial range request, before falling back to a full download.
+    assert len(requested) == 1
+
+
+def test_fetch_snapshot_gzip_encoded_later(monkeypatch, serve_snapshot, graph_json):
+    data = encode_snapshot(graph_json)
+    monkeypatch.setattr(graph_snapshot, "INITIAL_READ_SIZE", graph_snapshot.HEADER.size)
+    requested = serve_snapshot(data, gzip_encoded=True, gzip_after=1)
+
+    result = fetch_snapshot("abc", "public/full-task-graph.msgpack", kinds={"b"})
+    assert result == {"b-1": graph_json["b-1"]}
+    # The header, then the encoded index, before falling back.
+    assert len(requested) == 2
+
+
+def test_fetch_snapshot_missing(responses):
+    tc_url = liburl.test_root_url()
+    responses.get(
+        f"{tc_url}/api/queue/v1/task/abc/artifacts/public%2Ffull-task-graph.msgpack",
+        json={"message": "Artifact not found"},
+        status=404,
+    )
+    assert fetch_snapshot("abc", "public/full-task-graph.msgpack") is None
+
+
+def test_write_graph_snapshot(monkeypatch, tmp_path, graph_json):
+    monkeypatch.setattr(graph_snapshot, "ARTIFACTS_DIR", tmp_path)
+    monkeypatch.setattr(
+        graph_snapshot,
+        "read_artifact",
+        lambda name: {"task-graph.json": graph_json}[name],
+    )
+
+    write_graph_snapshot("task-graph.json")
+    assert decode_snapshot((tmp_path / "task-graph.msgpack").read_bytes()) == graph_json
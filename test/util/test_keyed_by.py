@@ -0,0 +1,125 @@
+import copy
+
+import pytest
+from taskgraph.util.schema import resolve_keyed_by
+
+from mozilla_taskgraph.util.keyed_by import KeyedByResolver, keyed_by_names
+
+VALUE = {
+    "by-build-type": {
+        "release": {"by-project": {"main": "app", "default": "app-beta"}},
+        "nightly": "app-nightly",
+        "default": None,
+    }
+}
+
+
+def test_keyed_by_names():
+    assert keyed_by_names("foo") == ()
+    assert keyed_by_names({"foo": "bar"}) == ()
+    assert keyed_by_names(VALUE) == ("build-type", "project")
+
+
+@pytest.mark.parametrize(
+    "build_type,project",
+    (
+        ("release", "main"),
+        ("release", "other"),
+        ("nightly", "main"),
+        ("debug", "main"),
+        (None, None),
+    ),
+)
+def test_resolver_matches_upstream(build_type, project):
+    resolver = KeyedByResolver()
+    task = {"project": project, "product": VALUE}
+    expected = resolve_keyed_by(
+        dict(task), "product", "task", **{"build-type": build_type}
+    )
+    result = resolver.resolve_keyed_by(
+        task, "product", "task", **{"build-type": build_type}
+    )
+    assert result == expected
+
+
+def test_resolver_memoizes():
+    resolver = KeyedByResolver()
+    tasks = [
+        {"name": f"task-{i}", "project": "main", "product": VALUE} for i in range(10)
+    ]
+    for i, task in enumerate(tasks):
+        build_type = "release" if i % 2 else "nightly"
+        resolver.resolve_keyed_by(
+            task, "product", task["name"], **{"build-type": build_type}
+        )
+
+    assert [t["product"] for t in tasks[:2]] == ["app-nightly", "app"]
+    assert resolver.misses == 2
+    assert resolver.hits == 8
+
+    # Equal but distinct values, e.g deep copies of task-defaults, share
+    # results.
+    task = {"project": "main", "product": copy.deepcopy(VALUE)}
+    resolver.resolve_keyed_by(task, "product", "task", **{"build-type": "release"})
+    assert task["product"] == "app"
+    assert resolver.misses == 2
+    assert resolver.hits == 9
+
+    # Different values don't.
+    task = {"project": "main", "product": {"by-build-type": {"release": "other"}}}
+    resolver.resolve_keyed_by(task, "product", "task", **{"build-type": "release"})
+    assert task["product"] == "other"
+    assert resolver.misses == 3
+
+
+def test_resolver_copies_containers():
+    resolver = KeyedByResolver()
+    value = {"by-project": {"main": {"foo": ["bar"]}}}
+    tasks = [{"project": "main", "scopes": copy.deepcopy(value)} for _ in range(3)]
+    for task in tasks:
+        resolver.resolve_keyed_by(task, "scopes", "task")
+
+    tasks[0]["scopes"]["foo"].append("baz")
+    assert tasks[1]["scopes"] == {"foo": ["bar"]}
+    assert tasks[2]["scopes"] == {"foo": ["bar"]}
+    assert tasks[1]["scopes"] is not tasks[2]["scopes"]
+    assert resolver.hits == 2
+
+
+def test_resolver_errors():
+    resolver = KeyedByResolver()
+    task = {"product": {"by-build-type": {"release": "app"}}}
+    with pytest.raises(Exception, match="No attribute build-type"):
+        resolver.resolve_keyed_by(task, "product", "task")
+
+
+MULTIPLE_MATCHES = {"by-platform": {"linux.*": "first", "linux6.*": "second"}}
+
+
+def _resolve_multiple_matches(func, enforce_single_match):
+    item = {"platform": "linux64", "product": copy.deepcopy(MULTIPLE_MATCHES)}
+    try:
+        func(item, "product", "task", enforce_single_match=enforce_single_match)
+    except Exception as e:
+        return str(e)
+    return item["product"]
+
+
+@pytest.mark.parametrize("enforce_single_match", (True, False))
+def test_resolver_multiple_matches(enforce_single_match):
+    expected = _resolve_multiple_matches(resolve_keyed_by, enforce_single_match)
+    if enforce_single_match:
+        assert "Multiple matching values" in expected
+    else:
+        assert expected == "first"
+
+    resolver = KeyedByResolver()
+    result = _resolve_multiple_matches(resolver.resolve_keyed_by, enforce_single_match)
+    assert result == expected
+
+    # Results are cached separately for each value of enforce_single_match.
+    result = _resolve_multiple_matches(
+        resolver.resolve_keyed_by, not enforce_single_match
+    )
+    assert result != expected
+    assert resolver.misses == 2
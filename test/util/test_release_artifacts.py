@@ -0,0 +1,120 @@
+import pytest
+from taskgraph.task import Task
+
+from mozilla_taskgraph.util.release_artifacts import (
+    ReleaseArtifactsIndex,
+    get_release_artifacts_index,
+    release_artifact_names,
+)
+
+
+def test_release_artifacts_index():
+    index = ReleaseArtifactsIndex()
+    index.add("build-linux", ["public/build/target.tar.gz", "public/build/a.txt"])
+    index.add("build-mac", ["public/build/target.dmg", "public/build/a.txt"])
+    index.add("signing-mac", ["public/build/target.dmg"])
+
+    assert "public/build/target.tar.gz" in index
+    assert "public/build/missing" not in index
+    assert index.producers("public/build/a.txt") == ("build-linux", "build-mac")
+    assert index.producers("public/build/missing") == ()
+    assert index.producer("public/build/target.tar.gz") == "build-linux"
+    assert index.producer("public/build/missing") is None
+    assert index.producer("public/build/a.txt", labels={"build-mac"}) == "build-mac"
+    assert index.producer("public/build/a.txt", labels={"other"}) is None
+    assert index.artifacts("build-mac") == (
+        "public/build/target.dmg",
+        "public/build/a.txt",
+    )
+    assert index.artifacts("missing") == ()
+
+    with pytest.raises(Exception, match="Multiple tasks produce"):
+        index.producer("public/build/a.txt")
+
+
+def test_get_release_artifacts_index(make_transform_config):
+    config = make_transform_config(
+        kind_dependencies_tasks={
+            t.label: t
+            for t in (
+                Task(
+                    kind="build",
+                    label="build-linux",
+                    task={},
+                    attributes={
+                        "release-artifacts": [
+                            {
+                                "type": "file",
+                                "name": "public/build/target.tar.gz",
+                                "path": "artifacts/target.tar.gz",
+                            },
+                            {
+                                "type": "directory",
+                                "name": "public/build/dist",
+                                "path": "artifacts/dist",
+                                "patterns": ["*"],
+                            },
+                        ]
+                    },
+                ),
+                Task(
+                    kind="signing",
+                    label="signing-linux",
+                    task={},
+                    attributes={
+                        "release_artifacts": [
+                            "public/build/target.tar.gz",
+                            "public/build/target.tar.gz.asc",
+                        ]
+                    },
+                ),
+                Task(kind="other", label="other", attributes={}, task={}),
+            )
+        }
+    )
+    index = get_release_artifacts_index(config)
+    assert get_release_artifacts_index(config) is index
+    assert get_release_artifacts_index(make_transform_config()) is not index
+
+    assert index.artifacts("build-linux") == ("public/build/target.tar.gz",)
+    assert index.producer("public/build/target.tar.gz.asc") == "signing-linux"
+    assert index.producers("public/build/target.tar.gz") == (
+        "build-linux",
+        "signing-linux",
+    )
+    assert index.artifacts("other") == ()
+
+
+def test_release_artifact_names():
+    release_artifacts = [
+        {"type": "file", "name": "public/build/foo.txt", "path": "artifacts/foo.txt"},
+        {
+            "type": "directory",
+            "name": "public/build/dist",
+            "path": "artifacts/dist",
+            "patterns": ["*.zip", "*.zip.asc"],
+        },
+        {
+            "type": "directory",
+            "name": "public/build",
+            "path": "artifacts",
+            "patterns": ["*.json"],
+        },
+    ]
+    listing = [
+        "public/build/foo.txt",
+        "public/build/dist/a.zip",
+        "public/build/dist/a.zip.asc",
+        "public/build/dist/a.tar.gz",
+        "public/build/info.json",
+        "public/logs/live.log",
+    ]
+    names = release_artifact_names(release_artifacts, listing)
+    assert not isinstance(names, list)
+    assert list(names) == [
+        "public/build/foo.txt",
+        "public/build/dist/a.zip",
+        "public/build/dist/a.zip.asc",
+        "public/build/info.json",
+    ]
+    assert list(release_artifact_names(release_artifacts)) == ["public/build/foo.txt"]
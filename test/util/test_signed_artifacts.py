@@ -1,12 +1,17 @@
 import pytest
 
-from mozilla_taskgraph.util.signed_artifacts import get_signed_artifacts
+from mozilla_taskgraph.util import signed_artifacts
+from mozilla_taskgraph.util.signed_artifacts import (
+    get_signed_artifacts,
+    get_upstream_signed_artifacts,
+)
 
 
 @pytest.mark.parametrize(
     "input_file, formats, behavior, expected",
     [
         ("example.dmg", [], None, {"example.tar.gz": True, "example.pkg": False}),
+        ("example.dmg", [], "", {"example.tar.gz": True, "example.pkg": False}),
         ("example.dmg", [], "mac_sign", {"example.tar.gz": True, "example.pkg": False}),
         ("example.dmg", [], "other", {"example.tar.gz": True, "example.pkg": True}),
         ("example.zip", [], None, {"example.zip": True}),
@@ -20,3 +25,64 @@ def test_get_signed_artifacts(input_file, formats, behavior, expected):
             assert artifact in result
         else:
             assert artifact not in result
+
+
+def test_get_signed_artifacts_returns_copy():
+    result = get_signed_artifacts("example.zip", ["gcp_prod_autograph_gpg"])
+    result.add("foo")
+    assert get_signed_artifacts("example.zip", ["gcp_prod_autograph_gpg"]) == {
+        "example.zip",
+        "example.zip.asc",
+    }
+
+
+def test_get_upstream_signed_artifacts():
+    upstream_artifacts = [
+        {
+            "taskId": "abc",
+            "taskType": "build",
+            "paths": ["public/build/target.dmg", "public/build/target.zip"],
+            "formats": ["macapp", "gcp_prod_autograph_gpg"],
+        },
+        {
+            "taskId": "def",
+            "taskType": "build",
+            "paths": ["public/build/target.zip"],
+            "formats": ["autograph_authenticode"],
+        },
+    ]
+    expected = {
+        "public/build/target.tar.gz",
+        "public/build/target.dmg.asc",
+        "public/build/target.zip",
+        "public/build/target.zip.asc",
+    }
+    assert get_upstream_signed_artifacts(upstream_artifacts) == expected
+    assert get_upstream_signed_artifacts(upstream_artifacts, behavior="") == expected
+    assert get_upstream_signed_artifacts(upstream_artifacts, behavior="other") == (
+        expected | {"public/build/target.pkg"}
+    )
+
+    # The result can be modified without affecting later calls.
+    get_upstream_signed_artifacts(upstream_artifacts).add("foo")
+    assert get_upstream_signed_artifacts(upstream_artifacts) == expected
+
+
+def test_add_rules(monkeypatch):
+    monkeypatch.setattr(signed_artifacts, "EXTENSION_RULES", {})
+    monkeypatch.setattr(signed_artifacts, "FORMAT_SUFFIXES", {})
+    signed_artifacts._clear_caches()
+
+    assert get_signed_artifacts("example.msi", ["sigstore"]) == {"example.msi"}
+
+    signed_artifacts.add_extension_rule(".msi", ".exe", skip_behaviors=["nope"])
+    signed_artifacts.add_extension_rule(".msi", ".msix")
+    signed_artifacts.add_format_suffix("sigstore", ".sig")
+    assert get_signed_artifacts("example.msi", ["sigstore"]) == {
+        "example.exe",
+        "example.msix",
+        "example.msi.sig",
+    }
+    assert get_signed_artifacts("example.msi", [], behavior="nope") == {"example.msix"}
+    monkeypatch.undo()
+    signed_artifacts._clear_caches()
@@ -0,0 +1,55 @@
+from copy import deepcopy
+
+from mozilla_taskgraph.util.workertypes import (
+    invalidate_worker_implementations,
+    worker_implementation_stats,
+    worker_type_implementation,
+)
+
+
+def test_worker_type_implementation(make_graph_config):
+    graph_config = make_graph_config()
+    assert worker_implementation_stats(graph_config) == {
+        "hits": 0,
+        "misses": 0,
+        "hit_rate": 0.0,
+        "size": 0,
+    }
+
+    for _ in range(3):
+        assert worker_type_implementation(graph_config, "b-linux") == (
+            "generic-worker",
+            "linux",
+        )
+        assert worker_type_implementation(graph_config, "t-linux") == (
+            "docker-worker",
+            "linux",
+        )
+    assert worker_type_implementation(graph_config, "succeed") == ("succeed", None)
+
+    assert worker_implementation_stats(graph_config) == {
+        "hits": 4,
+        "misses": 3,
+        "hit_rate": 4 / 7,
+        "size": 3,
+    }
+
+
+def test_worker_type_implementation_invalidation(make_graph_config):
+    graph_config = make_graph_config()
+    assert worker_type_implementation(graph_config, "b-linux")[0] == "generic-worker"
+
+    # Replacing the aliases is detected automatically.
+    workers = graph_config._config["workers"] = deepcopy(graph_config["workers"])
+    workers["aliases"]["b-linux"]["implementation"] = "docker-worker"
+    assert worker_type_implementation(graph_config, "b-linux")[0] == "docker-worker"
+    assert worker_implementation_stats(graph_config)["misses"] == 1
+
+    # Modifying them in place requires an explicit invalidation.
+    workers["aliases"]["b-linux"]["implementation"] = "generic-worker"
+    assert worker_type_implementation(graph_config, "b-linux")[0] == "docker-worker"
+    invalidate_worker_implementations(graph_config)
+    assert worker_type_implementation(graph_config, "b-linux")[0] == "generic-worker"
+
+    invalidate_worker_implementations()
+    assert worker_implementation_stats(graph_config)["size"] == 0